@@ -0,0 +1 @@
+"""Benchmarks for the ``jobscope`` pipeline; run each with ``python -m benchmarks.<name>``."""
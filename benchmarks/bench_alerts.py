@@ -0,0 +1,84 @@
+"""Per-posting alert matching cost against a growing number of saved searches.
+
+    python -m benchmarks.bench_alerts --searches 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from jobscope.alerts import AlertEngine
+from jobscope.jobs import CITIES, COMPANIES, EXPERIENCES, ROLES, WORK_TYPES, generate_job_data
+from jobscope.persistence import SavedSearch
+from jobscope.search_index import JobSearchIndex, tokenize
+
+FILTER_CHOICES = {
+    'role': ['customer-success', 'scrum-master'],
+    'location': list(COMPANIES),
+    'workType': WORK_TYPES,
+    'experience': EXPERIENCES,
+}
+
+
+def saved_searches(count: int, seed: int = 5) -> list[SavedSearch]:
+    """Searches shaped like dashboard use: a word or two, a company or a city, plus filters."""
+    rng = random.Random(seed)
+    words = sorted({word for text in ROLES for word in tokenize(text)})
+    companies = [name for names in COMPANIES.values() for name in names]
+    cities = [city for names in CITIES.values() for city in names]
+    searches = []
+    for search_id in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            query = ' '.join(rng.sample(words, rng.randint(1, 2)))
+        elif kind < 0.5:
+            query = rng.choice(companies)
+        elif kind < 0.65:
+            query = rng.choice(cities)[:rng.randint(3, 6)]
+        else:
+            query = ''
+        filters = {key: rng.choice(values) for key, values in FILTER_CHOICES.items() if rng.random() < 0.4}
+        searches.append(SavedSearch(search_id, search_id % (count // 3 + 1), query, filters))
+    return searches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--searches', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--verify', type=int, default=20, help='postings checked against a full scan')
+    args = parser.parse_args()
+
+    jobs = generate_job_data(args.jobs, seed=11)
+    print(f'{"searches":>9} {"build s":>8} {"median ms":>10} {"p99 ms":>8} {"matches/job":>12} {"scan ms":>8}')
+    for count in args.searches:
+        searches = saved_searches(count)
+        start = time.perf_counter()
+        engine = AlertEngine(searches)
+        build = time.perf_counter() - start
+
+        samples, matched = [], 0
+        for job in jobs:
+            start = time.perf_counter()
+            matched += len(engine.match_ids(job))
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+
+        scan = []
+        for job in jobs[:args.verify]:
+            index = JobSearchIndex([job])
+            start = time.perf_counter()
+            expected = {search.id for search in searches if index.count(search.query, search.filters)}
+            scan.append(time.perf_counter() - start)
+            got = engine.match_ids(job)
+            assert len(got) == len(set(got)) and set(got) == expected, job['id']
+        print(f'{count:>9,} {build:>8.2f} {statistics.median(samples) * 1e3:>10.3f} '
+              f'{samples[int(len(samples) * 0.99)] * 1e3:>8.3f} {matched / len(jobs):>12.1f} '
+              f'{statistics.median(scan) * 1e3:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Analytics slices read from the cube versus a pandas groupby over every posting.
+
+    python -m benchmarks.bench_analytics --jobs 100000 1000000 --days 90
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from jobscope.analytics import AnalyticsCube
+from jobscope.jobs import generate_job_data
+from jobscope.salary import base_midpoints
+from jobscope.store import JobStore
+
+SLICES = [
+    ((), None),
+    (('country',), None),
+    (('platform', 'workType'), None),
+    (('week',), {'country': 'India'}),
+    (('role', 'experience'), {'workType': 'Remote'}),
+]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def _groupby(frame, salary, by, where) -> None:
+    """What the page did before: filter and aggregate the postings themselves."""
+    if where:
+        mask = True
+        for column, value in where.items():
+            mask = mask & (frame[column] == value)
+        frame, salary = frame[mask], salary[mask]
+    frame = frame.assign(salary=salary)
+    if by:
+        frame.groupby(list(by), observed=True).agg(
+            count=('id', 'size'), salary=('salary', 'mean'), rating=('rating', 'mean'),
+            p50=('salary', 'median'), p90=('salary', lambda values: values.quantile(0.9)))
+    else:
+        frame['salary'].quantile([0.25, 0.5, 0.75, 0.9])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--days', type=int, default=90, help='spread of posted dates')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(max(args.jobs), seed=15)
+    rng = random.Random(15)
+    today = date(2026, 10, 18)
+    for job in jobs:
+        job['postedDate'] = (today - timedelta(days=rng.randrange(args.days))).isoformat()
+
+    for size in args.jobs:
+        store = JobStore.from_jobs(jobs[:size])
+        start = time.perf_counter()
+        cube = AnalyticsCube.from_store(store)
+        built = time.perf_counter() - start
+        print(f'\n{size:,} postings: cube built in {built:.2f} s, {cube.cells:,} cells, '
+              f'{cube.memory_usage() / 2**20:.0f} MB')
+
+        frame = store.frame.copy()
+        frame['week'] = (frame['postedDate'] - frame['postedDate'].dt.weekday * timedelta(days=1)).dt.strftime('%Y-%m-%d')
+        salary = base_midpoints(frame)
+        print(f'{"slice":<52} {"cube ms":>8} {"groupby ms":>11}')
+        for by, where in SLICES:
+            label = f'by {",".join(by) or "-"} {where or ""}'
+            print(f'{label:<52} {_median_ms(lambda: cube.rollup(by, where), args.repeat):>8.2f} '
+                  f'{_median_ms(lambda: _groupby(frame, salary, by, where), args.repeat):>11.2f}')
+        print(f'{"trends (by country, with growth)":<52} {_median_ms(cube.trends, args.repeat):>8.2f}')
+
+        batch = generate_job_data(10_000, seed=16)
+        for job in batch:
+            job['postedDate'] = today.isoformat()
+        start = time.perf_counter()
+        cube.upsert(batch)
+        upserted = time.perf_counter() - start
+        start = time.perf_counter()
+        cube.expire(job['id'] for job in jobs[:10_000])
+        expired = time.perf_counter() - start
+        print(f'incremental: {upserted / len(batch) * 1e6:.1f} µs per upsert, '
+              f'{expired / 10_000 * 1e6:.1f} µs per expiry')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Concurrent dashboard sessions hitting a shared ``JobCache``.
+
+    python -m benchmarks.bench_cache --jobs 200000 --users 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jobscope.cache import JobCache
+from jobscope.jobs import COUNTRIES, EXPERIENCES, WORK_TYPES, generate_job_data
+from jobscope.store import JobStore
+
+QUERIES = ['', '', '', 'scrum', 'agile', 'customer', 'berlin', 'senior']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--clicks', type=int, default=40, help='filter interactions per user')
+    args = parser.parse_args()
+
+    jobs = generate_job_data(args.jobs, seed=5)
+    loads = []
+
+    def loader() -> JobStore:
+        loads.append(time.perf_counter())
+        return JobStore.from_jobs(jobs)
+
+    cache = JobCache(loader)
+    scans = []
+    scan_lock = threading.Lock()
+    original_filter = JobStore.filter
+
+    def counting_filter(self, *a, **kw):
+        with scan_lock:
+            scans.append(1)
+        return original_filter(self, *a, **kw)
+
+    JobStore.filter = counting_filter
+
+    def session(user: int) -> list[float]:
+        rng = random.Random(user)
+        latencies = []
+        for _ in range(args.clicks):
+            filters = {'location': rng.choice(COUNTRIES + ['all']),
+                       'workType': rng.choice(WORK_TYPES + ['all'] * 3),
+                       'experience': rng.choice(EXPERIENCES[:2] + ['all'] * 3)}
+            start = time.perf_counter()
+            cache.result_page(rng.choice(QUERIES), filters, sort_by='postedDate', limit=20)
+            cache.salary_summary()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.users) as pool:
+        latencies = [value for result in pool.map(session, range(args.users)) for value in result]
+    elapsed = time.perf_counter() - start
+    JobStore.filter = original_filter
+
+    warm_filters = {'location': 'India', 'workType': 'all', 'experience': 'all'}
+    cache.result_page('scrum', warm_filters, sort_by='postedDate', limit=20)
+    start = time.perf_counter()
+    cache.result_page('scrum', warm_filters, sort_by='postedDate', limit=20)
+    hit_s = time.perf_counter() - start
+
+    latencies.sort()
+    print(f'{args.users} users x {args.clicks} clicks over {args.jobs:,} jobs in {elapsed:.2f}s')
+    print(f'dataset loads: {len(loads)}   full-corpus filter scans: {len(scans)} of {len(latencies)} interactions')
+    print(f'latency p50 {statistics.median(latencies) * 1e3:.2f} ms   '
+          f'p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms   '
+          f'(uncontended cache hit {hit_s * 1e3:.2f} ms)')
+    for tier, stats in cache.stats().items():
+        print(f'{tier:<10} hits {stats.hits:>6}  misses {stats.misses:>5}  hit rate {stats.hit_rate:6.1%}  '
+              f'entries {stats.entries:>4}  {stats.bytes / 2**20:8.2f} MiB  evictions {stats.evictions}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Crawl throughput against the local fixture server.
+
+    python -m benchmarks.bench_crawl --latency 0.02 --workers 1 8 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.fixture_server import FixtureServer, record_fixtures
+from jobscope.scraper import CrawlEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated server latency per request (s)')
+    parser.add_argument('--throttle-every', type=int, default=50, help='answer every n-th request with 429')
+    parser.add_argument('--rate', type=float, default=0.0, help='per-platform requests/sec limit (0 = none)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f'recorded {record_fixtures(root)} fixture pages')
+        with FixtureServer(root, latency=args.latency, throttle_every=args.throttle_every) as server:
+            print(f'{"workers":>8} {"pages":>6} {"errors":>7} {"429s":>5} {"seconds":>8} {"pages/s":>8}')
+            for workers in args.workers:
+                with CrawlEngine(server.platforms(args.rate), max_workers=workers, backoff=0.01) as engine:
+                    pages = list(engine.crawl(engine.tasks()))
+                    stats = engine.stats
+                    assert len(pages) == stats.pages
+                    print(f'{workers:>8} {stats.pages:>6} {stats.errors:>7} {stats.throttled:>5} '
+                          f'{stats.elapsed:>8.2f} {stats.pages_per_second:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
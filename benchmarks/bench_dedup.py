@@ -0,0 +1,131 @@
+"""Precision/recall and throughput of ``jobscope.dedup`` on a labeled corpus.
+
+Originals come from the mock generator; a share of them is re-posted on
+other platforms. Every copy gets some of the rewrites the normalisers undo
+(abbreviated titles, ``(m/w/d)`` tags, legal suffixes on the company, a
+shortened location). A ``--hard-share`` of copies also gets one to three
+rewrites they cannot undo: a regional company name (``SAP Deutschland``),
+a team suffix on the title, experience in another language (``4-6
+Jahre``) or a reworded description. Those copies have to be found by text similarity.
+
+A copy is labeled with the original it was made from. Generated originals
+that share role, company, city, work type and experience also share their
+whole description, so nothing could tell them apart; they share a label.
+Originals that differ in any of those, such as a hybrid and a remote
+opening of the same role, are distinct and must stay apart.
+
+The run fails when pairwise precision or recall, or the recall on hard
+copies, falls below the ``--min-*`` bounds.
+
+    python -m benchmarks.bench_dedup --jobs 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from jobscope.dedup import THRESHOLD, cluster_labels
+from jobscope.jobs import PLATFORMS, Job, generate_job_data
+
+COMPANY_SUFFIXES = {
+    'India': ' Pvt Ltd', 'Singapore': ' Pte. Ltd.', 'Netherlands': ' B.V.', 'Germany': ' SE', 'France': ' SA',
+}
+REGIONAL_NAMES = {
+    'India': ' India', 'Singapore': ' Asia', 'Netherlands': ' Nederland', 'Germany': ' Deutschland', 'France': ' France',
+}
+YEARS = {'Germany': 'Jahre', 'France': 'ans', 'Netherlands': 'jaar'}
+TEAM_SUFFIXES = (' - Agile Teams', ' - Enterprise Accounts', ' - EMEA', ' (Contract)')
+
+
+def repost(job: Job, rng: random.Random, copy: int, hard: bool = False) -> Job:
+    platform = rng.choice([name for name in PLATFORMS if name != job['platform']])
+    title = job['title']
+    if rng.random() < 0.4:
+        title = title.replace('Senior ', 'Sr. ').replace('Manager', 'Mgr')
+    if job['country'] == 'Germany' and rng.random() < 0.5:
+        title += ' (m/w/d)'
+    company = job['company'] + (COMPANY_SUFFIXES[job['country']] if rng.random() < 0.4 else '')
+    location = job['location'].split(', ')[0] if rng.random() < 0.5 else job['location']
+    experience = job['experience']
+    description = job['description']
+    if rng.random() < 0.6:
+        description += f' Apply now via {platform}.'
+    rewrites = set(rng.sample(range(4), rng.randint(1, 3))) if hard else set()
+    if 0 in rewrites:
+        company = job['company'] + REGIONAL_NAMES[job['country']]
+    if 1 in rewrites:
+        title += rng.choice(TEAM_SUFFIXES)
+    if 2 in rewrites:
+        years = YEARS.get(job['country'], 'yrs')
+        description = description.replace(experience.lower(), experience.lower().replace('years', years))
+        experience = experience.replace('years', years)
+    if 3 in rewrites:
+        description = description.replace('We are looking for a skilled', 'Our client is hiring a skilled')
+    return dict(job, id=f'{job["id"]}-copy{copy}', platform=platform, title=title, company=company,
+                location=location, experience=experience, description=description,
+                applyLink=f'{job["applyLink"]}-{platform.lower()}')
+
+
+def labeled_corpus(originals: int, duplicate_share: float, hard_share: float,
+                   seed: int) -> tuple[list[Job], list[tuple], list[tuple[int, int]]]:
+    """Postings, their labels, and ``(original, copy)`` positions of the hard copies."""
+    rng = random.Random(seed)
+    jobs, labels, hard_copies = [], [], []
+    for job in generate_job_data(originals, seed=seed):
+        label = (job['title'], job['company'], job['location'], job['workType'], job['experience'])
+        original = len(jobs)
+        jobs.append(job)
+        labels.append(label)
+        if rng.random() < duplicate_share:
+            for copy in range(rng.randint(1, 3)):
+                hard = rng.random() < hard_share
+                if hard:
+                    hard_copies.append((original, len(jobs)))
+                jobs.append(repost(job, rng, copy, hard))
+                labels.append(label)
+    return jobs, labels, hard_copies
+
+
+def pair_scores(predicted, truth) -> tuple[float, float]:
+    """Pairwise precision and recall computed from cluster sizes."""
+    def pairs(counts) -> int:
+        return sum(n * (n - 1) // 2 for n in counts.values())
+    both = pairs(Counter(zip(predicted, truth)))
+    return both / max(1, pairs(Counter(predicted))), both / max(1, pairs(Counter(truth)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=20_000, help='original postings before re-posts')
+    parser.add_argument('--duplicate-share', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=3)
+    parser.add_argument('--hard-share', type=float, default=0.3)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--min-precision', type=float, default=0.99)
+    parser.add_argument('--min-recall', type=float, default=0.95)
+    args = parser.parse_args()
+
+    jobs, truth, hard_copies = labeled_corpus(args.jobs, args.duplicate_share, args.hard_share, args.seed)
+    start = time.perf_counter()
+    labels = cluster_labels(jobs, threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+    predicted = labels.tolist()
+    precision, recall = pair_scores(predicted, truth)
+    hard_recall = sum(predicted[original] == predicted[copy] for original, copy in hard_copies) \
+        / max(1, len(hard_copies))
+    print(f'{len(jobs):,} postings -> {len(set(predicted)):,} clusters '
+          f'({len(set(truth)):,} labeled) in {elapsed:.1f}s ({len(jobs) / elapsed:,.0f} postings/s)')
+    print(f'pairwise precision {precision:.4f}   recall {recall:.4f}   '
+          f'hard copies found {hard_recall:.4f} of {len(hard_copies):,}')
+    failed = [f'{name} {value:.4f} < {bound}' for name, value, bound in (
+        ('precision', precision, args.min_precision), ('recall', recall, args.min_recall),
+        ('hard-copy recall', hard_recall, args.min_recall)) if value < bound]
+    if failed:
+        raise SystemExit('dedup quality below bounds: ' + ', '.join(failed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Throughput and peak memory of streaming exports.
+
+    python -m benchmarks.bench_export --jobs 100000 1000000
+
+Peak RSS is reported as growth over the resident size before each export.
+On Linux the high-water mark is reset between runs through
+``/proc/self/clear_refs``, so every row is measured on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import tempfile
+
+from jobscope.export import COMPRESSIONS, FORMATS, export_filename, export_jobs
+from jobscope.jobs import generate_job_data
+from jobscope.store import JobStore
+
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _reset_peak() -> bool:
+    try:
+        with open('/proc/self/clear_refs', 'w') as handle:
+            handle.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_kb() -> int:
+    try:
+        return _status_kb('VmHWM')
+    except (OSError, KeyError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--query', default='')
+    parser.add_argument('--sort', default=None)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(max(args.jobs), seed=8)
+    print(f'{"postings":>10} {"format":<8} {"codec":<6} {"rows/s":>10} {"MB":>8} {"peak +MB":>9}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.jobs:
+            store = JobStore.from_jobs(jobs[:size])
+            for fmt in FORMATS:
+                for compression in COMPRESSIONS:
+                    path = os.path.join(tmp, export_filename('jobs', fmt, compression))
+                    exact = _reset_peak()
+                    before = _status_kb('VmRSS')
+                    stats = export_jobs(store, path, fmt, compression=compression,
+                                        search_query=args.query, sort=args.sort)
+                    growth = (_peak_kb() - before) / 1024
+                    print(f'{size:>10,} {fmt:<8} {compression or "-":<6} {stats.rows_per_second:>10,.0f} '
+                          f'{stats.bytes / 2**20:>8.1f} {growth:>8.1f}{"" if exact else "*"}')
+                    os.remove(path)
+            del store
+
+
+if __name__ == '__main__':
+    main()
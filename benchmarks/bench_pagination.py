@@ -0,0 +1,59 @@
+"""First-page latency of cursor pagination versus filter-then-sort.
+
+    python -m benchmarks.bench_pagination --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from jobscope.jobs import generate_job_data
+from jobscope.pagination import Paginator
+from jobscope.store import JobStore
+
+QUERIES = [
+    ('', {}),
+    ('scrum', {'location': 'India'}),
+    ('grab', {'workType': 'Remote', 'experience': '10+ years'}),
+]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(max(args.sizes), seed=21)
+    print(f'{"postings":>10} {"query":<60} {"order ms":>9} {"page 1 ms":>10} {"page 2 ms":>10} '
+          f'{"count ms":>9} {"full sort ms":>13}')
+    for size in args.sizes:
+        store = JobStore.from_jobs(jobs[:size])
+        paginator = Paginator(store)
+        start = time.perf_counter()
+        paginator.view('postedDate', True)
+        order_ms = (time.perf_counter() - start) * 1e3
+        for query, filters in QUERIES:
+            first = paginator.page(query, filters, limit=args.limit)
+            label = f'{query!r} {filters}'
+            print(f'{size:>10,} {label:<60} {order_ms:>9.1f} '
+                  f'{_median_ms(lambda: paginator.page(query, filters, limit=args.limit), args.repeat):>10.2f} '
+                  f'{_median_ms(lambda: paginator.page(query, filters, cursor=first.next_cursor, limit=args.limit), args.repeat):>10.2f} '
+                  f'{_median_ms(lambda: paginator.count(query, filters), args.repeat):>9.2f} '
+                  f'{_median_ms(lambda: store.filter(query, filters, sort_by="postedDate"), args.repeat):>13.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Parse throughput of ``ParseStage`` over recorded listing pages.
+
+    python -m benchmarks.bench_parse --pages 2000 --workers 0 1 2 4 8
+
+``0`` workers parses inline on the calling thread and is the baseline.
+Every run must produce the same postings as the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fixture_server import record_fixtures
+from jobscope.parse_stage import ParseStage
+from jobscope.parser import HTML_PARSER
+from jobscope.scraper import FetchTask, Page
+
+
+def fixture_pages(root: Path, count: int) -> list[Page]:
+    record_fixtures(root)
+    recorded = []
+    for path in sorted(root.rglob('*.html')):
+        platform, country = path.parts[-3], path.parts[-2]
+        task = FetchTask(platform, country, path.stem, path.as_uri())
+        recorded.append(Page(task, 200, path.read_text(encoding='utf-8')))
+    return list(itertools.islice(itertools.cycle(recorded), count))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4, 8])
+    parser.add_argument('--parsers', nargs='+', default=sorted({HTML_PARSER, 'html.parser'}))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = fixture_pages(Path(tmp), args.pages)
+    print(f'{len(pages)} pages, {os.cpu_count()} CPUs')
+    print(f'{"parser":<12} {"workers":>8} {"seconds":>8} {"pages/s":>9} {"speedup":>8}')
+    for html_parser in args.parsers:
+        baseline = expected = None
+        for workers in args.workers:
+            with ParseStage(workers, parser=html_parser) as stage:
+                start = time.perf_counter()
+                parsed = list(stage.run(iter(pages)))
+                elapsed = time.perf_counter() - start
+            ids = sorted(job['id'] for item in parsed for job in item.jobs)
+            expected = expected or ids
+            assert len(parsed) == len(pages) and ids == expected, f'{html_parser} x{workers} lost postings'
+            rate = len(pages) / elapsed
+            baseline = baseline or rate
+            print(f'{html_parser:<12} {workers:>8} {elapsed:>8.2f} {rate:>9.1f} {rate / baseline:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
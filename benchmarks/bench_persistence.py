@@ -0,0 +1,73 @@
+"""Per-user save/list latency of ``UserDataStore`` as the tables grow.
+
+    python -m benchmarks.bench_persistence --users 1000 --levels 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from jobscope.persistence import APPLICATION_STATUSES, UserDataStore
+
+
+def _median_us(fn, repeat: int = 200) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--batch', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserDataStore(str(Path(tmp) / 'users.db'))
+        with store.transaction():
+            users = [store.create_user(f'user{i}@example.com').id for i in range(args.users)]
+        probe = users[0]
+        total = 0
+        print(f'{"applications":>12} {"rows/s":>9} {"save us":>8} {"saved? us":>9} '
+              f'{"list us":>8} {"by status us":>12} {"track us":>9}')
+        for level in args.levels:
+            previous = total
+            start = time.perf_counter()
+            while total < level:
+                batch = min(args.batch, level - total)
+                store.track_applications(
+                    (rng.choice(users), f'job-{rng.randrange(10**7)}', rng.choice(APPLICATION_STATUSES),
+                     f'2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}', '')
+                    for _ in range(batch))
+                store.save_jobs(rng.choice(users), [f'job-{rng.randrange(10**7)}' for _ in range(batch // 10)])
+                total += batch
+            elapsed = time.perf_counter() - start
+            # Rows inserted in this step only, not the cumulative level.
+            rate = (total - previous) / elapsed if total > previous else 0
+            counter = iter(range(10**9))
+            print(f'{level:>12,} {rate:>9,.0f} '
+                  f'{_median_us(lambda: store.save_job(probe, f"probe-{next(counter)}")):>8.1f} '
+                  f'{_median_us(lambda: store.is_saved(probe, "probe-1")):>9.1f} '
+                  f'{_median_us(lambda: store.applications(probe, limit=20)):>8.1f} '
+                  f'{_median_us(lambda: store.applications(probe, "interviewing", limit=20)):>12.1f} '
+                  f'{_median_us(lambda: store.track_application(probe, "probe-job")):>9.1f}')
+        for sql in ('SELECT job_id FROM applications WHERE user_id = 1 ORDER BY applied_date DESC, id DESC LIMIT 20',
+                    "SELECT job_id FROM applications WHERE user_id = 1 AND status = 'offer' "
+                    'ORDER BY applied_date DESC, id DESC LIMIT 20',
+                    "SELECT 1 FROM saved_jobs WHERE user_id = 1 AND job_id = 'x'"):
+            print(f'{sql}\n    -> {"; ".join(store.query_plan(sql))}')
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Application-pipeline analytics: event ingest rate and funnel reads vs a scan.
+
+    python -m benchmarks.bench_pipeline --applications 200000 --users 2000
+
+Users track applications to generated postings over ``--days`` days, and
+each application then moves through interviewing to an offer, a
+rejection or a withdrawal. Status changes go through
+``UserDataStore.update_statuses`` in batches of ``--batch``, in date order.
+``PipelineAnalytics`` rebuilds its aggregates from the event log once, then
+keeps up with a final batch of changes through ``sync``.
+
+The query rows compare a funnel read from the aggregates with the scan a
+dashboard would otherwise run: every application joined to its posting
+and grouped. They check that both give the same counts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+from jobscope.jobs import generate_job_data, role_family
+from jobscope.persistence import UserDataStore
+from jobscope.pipeline import FUNNEL, PipelineAnalytics
+
+START = date(2024, 1, 1)
+
+
+def _median(fn, repeat: int) -> tuple[float, object]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def _progressions(rng: random.Random, ids: list[int], applied: list[date]) -> list[tuple[str, int, str]]:
+    """``(date, application_id, status)`` changes after each application was tracked."""
+    changes = []
+    for application_id, day in zip(ids, applied):
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        day += timedelta(days=rng.randint(1, 21))
+        if roll < 0.45:
+            changes.append((day.isoformat(), application_id, 'rejected' if roll < 0.4 else 'withdrawn'))
+            continue
+        changes.append((day.isoformat(), application_id, 'interviewing'))
+        day += timedelta(days=rng.randint(3, 45))
+        changes.append((day.isoformat(), application_id, 'offer' if roll > 0.8 else 'rejected'))
+    changes.sort()
+    return changes
+
+
+def _scan(store: UserDataStore, jobs: dict, company=None, role=None, country=None) -> dict:
+    """Current-status counts for a filter, from the applications table."""
+    counts = Counter()
+    for job_id, status in store._query('SELECT job_id, status FROM applications'):
+        job = jobs.get(job_id)
+        if company is not None and job['company'] != company:
+            continue
+        if role is not None and role_family(job['title']) != role:
+            continue
+        if country is not None and job['country'] != country:
+            continue
+        counts[status] += 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--applications', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--jobs', type=int, default=20_000)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--batch', type=int, default=1_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = {job['id']: job for job in generate_job_data(args.jobs, seed=args.seed)}
+    job_ids = list(jobs)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserDataStore(str(Path(tmp) / 'users.db'))
+        with store.transaction():
+            users = [store.create_user(f'user{i}@example.com').id for i in range(args.users)]
+        applied = sorted(START + timedelta(days=rng.randrange(args.days)) for _ in range(args.applications))
+        rows = [(rng.choice(users), rng.choice(job_ids), 'applied', day.isoformat(), '') for day in applied]
+
+        start = time.perf_counter()
+        ids = []
+        for offset in range(0, len(rows), args.batch):
+            ids += store.track_applications(rows[offset:offset + args.batch])
+        track_s = time.perf_counter() - start
+
+        changes = _progressions(rng, ids, applied)
+        tail = changes[-min(len(changes) // 10, 20_000):]
+        changes = changes[:len(changes) - len(tail)]
+        start = time.perf_counter()
+        for offset in range(0, len(changes), args.batch):
+            store.update_statuses([(application_id, status, at)
+                                   for at, application_id, status in changes[offset:offset + args.batch]])
+        update_s = time.perf_counter() - start
+
+        analytics = PipelineAnalytics(jobs.get)
+        start = time.perf_counter()
+        rebuilt = analytics.sync(store)
+        rebuild_s = time.perf_counter() - start
+
+        store.update_statuses([(application_id, status, at) for at, application_id, status in tail])
+        start = time.perf_counter()
+        followed = analytics.sync(store)
+        follow_s = time.perf_counter() - start
+
+        events = store.application_events()
+        replay = PipelineAnalytics(jobs.get)
+        start = time.perf_counter()
+        replay.ingest(events)
+        fold_s = time.perf_counter() - start
+
+        print(f'{args.applications:,} applications by {args.users:,} users over {args.days} days, '
+              f'{len(events):,} status events')
+        print(f'  track, {args.batch:,} per transaction      {len(rows) / track_s:>10,.0f} applications/s')
+        print(f'  update_statuses, {args.batch:,} per txn  {len(changes) / update_s:>10,.0f} events/s')
+        print(f'  sync from event 0                {rebuilt / rebuild_s:>10,.0f} events/s '
+              f'({rebuild_s:.2f} s)')
+        print(f'  sync of {followed:,} new events      {followed / follow_s:>10,.0f} events/s '
+              f'({follow_s * 1e3:.0f} ms)')
+        print(f'  ingest, events in memory         {len(events) / fold_s:>10,.0f} events/s')
+
+        sample = jobs[job_ids[0]]
+        filters = [
+            {},
+            {'company': sample['company']},
+            {'role': role_family(sample['title'])},
+            {'company': sample['company'], 'role': role_family(sample['title']), 'country': sample['country']},
+        ]
+        print(f'\n{"filter":<64} {"scan ms":>9} {"funnel us":>10} {"apps":>8} {"offer":>6}  check')
+        for where in filters:
+            scan_s, scanned = _median(lambda: _scan(store, jobs, **where), args.repeat)
+            read_s, funnel = _median(lambda: analytics.funnel(**where), args.repeat * 20)
+            same = all(funnel['current'][status] == scanned[status] for status in funnel['current'])
+            label = ', '.join(f'{key}={value}' for key, value in where.items()) or 'all'
+            offer = funnel['stages'][FUNNEL.index('offer')]['count']
+            print(f'{label:<64} {scan_s * 1e3:9.1f} {read_s * 1e6:10.1f} {funnel["applications"]:>8,} '
+                  f'{offer:>6,}  {"ok" if same else "MISMATCH"}')
+        breakdown_s, by_company = _median(lambda: analytics.breakdown('company'), args.repeat)
+        print(f'{"breakdown by company":<64} {"":>9} {breakdown_s * 1e6:10.1f} {len(by_company):>8,} companies')
+        stages = analytics.time_in_stage()
+        for status in ('applied', 'interviewing'):
+            times = stages[status]
+            print(f'  days in {status:<13} mean {times["meanDays"]:5.1f}  p50 {times["p50Days"]:5.1f}  '
+                  f'p90 {times["p90Days"]:5.1f}  ({times["count"]:,} left it)')
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Quota check latency and a many-thread consistency check of ``QuotaLimiter``.
+
+    python -m benchmarks.bench_quota --threads 32 --users 2000
+
+The hammer runs with a frozen clock so no tokens refill. Every user then
+has to end up with exactly their plan's limit accepted, and the flushed
+``searches_used`` has to equal the accepted count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+
+from jobscope.persistence import PLANS, UserDataStore
+from jobscope.quota import QuotaLimiter
+
+PLAN_MIX = ('free', 'free', 'free', 'premium', 'enterprise')
+
+
+def _latency(limiter: QuotaLimiter, users: list[tuple[int, str]], count: int) -> float:
+    picks = [random.choice(users) for _ in range(count)]
+    start = time.perf_counter()
+    for user_id, plan in picks:
+        limiter.acquire(user_id, plan)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--attempts', type=int, default=1500, help='checks per user across all threads')
+    args = parser.parse_args()
+
+    store = UserDataStore()
+    with store.transaction():
+        users = [(store.create_user(f'user{i}@example.com', plan).id, plan)
+                 for i, plan in zip(range(args.users), PLAN_MIX * args.users)]
+
+    print(f'single thread: {_latency(QuotaLimiter(), users, 200_000):.2f} us per check')
+
+    limiter = QuotaLimiter(store, clock=lambda: 0.0, flush_interval=0.05)
+    accepted = [0] * args.threads
+    barrier = threading.Barrier(args.threads)
+    work = [user for user in users for _ in range(args.attempts)]
+    random.Random(7).shuffle(work)
+
+    def hammer(index: int) -> None:
+        barrier.wait()
+        for user_id, plan in work[index::args.threads]:
+            accepted[index] += limiter.allow(user_id, plan)
+
+    with limiter:
+        threads = [threading.Thread(target=hammer, args=(i,)) for i in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    expected = {user_id: min(args.attempts, PLANS[plan] or args.attempts) for user_id, plan in users}
+    stored = dict(store._query('SELECT id, searches_used FROM users'))
+    assert sum(accepted) == sum(expected.values()), (sum(accepted), sum(expected.values()))
+    assert stored == expected, 'flushed searches_used differs from accepted checks'
+    print(f'{args.threads} threads: {len(work):,} checks in {elapsed:.2f} s '
+          f'({len(work) / elapsed:,.0f}/s, {elapsed / len(work) * 1e6:.2f} us each), '
+          f'{sum(accepted):,} accepted, store consistent')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""BM25 top-k latency with block-max pruning versus scoring every posting.
+
+    python -m benchmarks.bench_ranking --jobs 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from jobscope.jobs import generate_job_data
+from jobscope.ranking import BM25Index
+from jobscope.store import JobStore
+
+QUERIES = [
+    ('agile coach berlin hybrid', None),
+    ('scrum', None),
+    ('flipkart', {'experience': 'Entry Level'}),
+    ('grab remote senior', None),
+    ('customer success manager singapore', None),
+    ('senior scrum master remote amsterdam', {'workType': 'Remote'}),
+]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('-k', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(max(args.jobs), seed=4)
+    for size in args.jobs:
+        store = JobStore.from_jobs(jobs[:size])
+        start = time.perf_counter()
+        index = BM25Index(store)
+        print(f'\n{size:,} postings: index built in {time.perf_counter() - start:.1f} s, '
+              f'{index.memory_usage() / 2**20:.0f} MB, {len(index.vocabulary):,} terms')
+        print(f'{"query":<62} {"pruned ms":>10} {"exhaustive ms":>14}')
+        for query, filters in QUERIES:
+            pruned = index.search(query, args.k, filters)
+            exact = index.search_exhaustive(query, args.k, filters)
+            assert [round(score, 4) for _, score in pruned] == [round(score, 4) for _, score in exact], query
+            label = f'{query!r} {filters or ""}'
+            print(f'{label:<62} {_median_ms(lambda: index.search(query, args.k, filters), args.repeat):>10.2f} '
+                  f'{_median_ms(lambda: index.search_exhaustive(query, args.k, filters), args.repeat):>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Memory per posting and filter speed: job dicts vs ``JobRecords``.
+
+    python -m benchmarks.bench_records --jobs 200000
+
+Dict memory is what ``tracemalloc`` sees allocated while the postings are
+generated. Record memory is ``JobRecords.memory_usage``, both with the
+descriptions and apply links in memory and with them in a file. The
+filter rows compare the ``filteredJobs`` scan over dicts with
+``JobRecords.filter`` on the dashboard's queries, and check they agree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_search_index import QUERIES
+from jobscope.jobs import generate_job_data, matches_filters
+from jobscope.records import JobRecords
+
+
+def _median(fn, repeat: int) -> tuple[float, object]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    jobs = generate_job_data(args.jobs, seed=args.seed)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    records = JobRecords()
+    for job in jobs:
+        records.append(job)
+    build = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        spilled = JobRecords(os.path.join(tmp, 'text'))
+        for job in jobs:
+            spilled.append(job)
+        page = [spilled[row] for row in range(0, len(spilled), max(1, len(spilled) // 20))]
+        read_s, _ = _median(lambda: [record.to_dict() for record in page], args.repeat)
+        spilled_bytes = spilled.memory_usage()
+        spilled.close()
+
+    print(f'{args.jobs:,} postings, records built in {build:.2f} s')
+    print(f'  dicts                     {dict_bytes / args.jobs:8,.0f} B/posting')
+    print(f'  records, text in memory   {records.memory_usage() / args.jobs:8,.0f} B/posting')
+    print(f'  records, text in a file   {spilled_bytes / args.jobs:8,.0f} B/posting'
+          f'   ({len(page)} cards read back in {read_s * 1e3:.2f} ms)')
+
+    print(f'\n{"query":<16} {"filters":<58} {"dict ms":>9} {"records ms":>11} {"hits":>8} {"speedup":>8}')
+    for query, filters in QUERIES:
+        scan_s, scanned = _median(lambda: [row for row, job in enumerate(jobs)
+                                           if matches_filters(job, query, filters)], args.repeat)
+        filter_s, filtered = _median(lambda: records.filter(query, filters), args.repeat)
+        hits = f'{len(filtered)}' if filtered.tolist() == scanned else f'{len(filtered)}/{len(scanned)}'
+        print(f'{query!r:<16} {str(filters):<58} {scan_s * 1e3:9.2f} {filter_s * 1e3:11.2f} {hits:>8} '
+              f'{scan_s / filter_s:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
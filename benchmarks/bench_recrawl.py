@@ -0,0 +1,47 @@
+"""Cold crawl versus conditional warm refresh against the fixture server.
+
+    python -m benchmarks.bench_recrawl --latency 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.fixture_server import FixtureServer, record_fixtures
+from jobscope.crawl_state import CrawlState, IncrementalCrawler
+from jobscope.scraper import CrawlEngine
+
+
+def _report(label: str, result) -> None:
+    print(f'{label:<22} {result.pages:>6} {result.not_modified:>6} {result.unchanged:>9} '
+          f'{result.parsed:>7} {len(result.upserted):>9} {len(result.closed):>7} {result.elapsed:>8.2f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--jobs-per-page', type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'pages'
+        record_fixtures(root, args.jobs_per_page)
+        with FixtureServer(root, latency=args.latency) as server, \
+                CrawlEngine(server.platforms(), max_workers=args.workers) as engine:
+            crawler = IncrementalCrawler(engine, CrawlState(str(Path(tmp) / 'state.db')))
+            print(f'{"refresh":<22} {"pages":>6} {"304":>6} {"unchanged":>9} {"parsed":>7} {"upserted":>9} {"closed":>7} {"seconds":>8}')
+            cold = crawler.refresh()
+            _report('cold', cold)
+            warm = crawler.refresh()
+            _report('warm', warm)
+            record_fixtures(root, args.jobs_per_page, seed=2, platforms=['Xing'])
+            changed = crawler.refresh()
+            _report('warm, Xing re-posted', changed)
+            print(f'warm refresh took {warm.elapsed / cold.elapsed:.0%} of the cold crawl')
+
+
+if __name__ == '__main__':
+    main()
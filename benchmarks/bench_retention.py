@@ -0,0 +1,101 @@
+"""Memory and filter latency under a rolling retention window, versus keeping everything.
+
+    python -m benchmarks.bench_retention --days 180 --per-day 5000 --window 90 [--unbounded]
+
+RSS is only comparable across rows without ``--unbounded``, whose frames
+live in the same process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from jobscope.jobs import generate_job_data
+from jobscope.retention import RetentionStore
+from jobscope.store import JobStore, concat_frames, jobs_frame
+
+FILTERS = {'location': 'Germany', 'workType': 'Remote'}
+
+
+def _rss_mb() -> float:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _filter_ms(store: JobStore, repeat: int = 5) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store.filter('scrum', FILTERS, 'postedDate')
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--per-day', type=int, default=5000)
+    parser.add_argument('--window', type=int, default=90)
+    parser.add_argument('--close-rate', type=float, default=0.01, help='share of live postings closed per day')
+    parser.add_argument('--report-every', type=int, default=15)
+    parser.add_argument('--unbounded', action='store_true', help='also time filters over every posting ever seen')
+    args = parser.parse_args()
+
+    start_day = date(2026, 1, 1)
+    today = [start_day]
+    retention = RetentionStore(args.window, today=lambda: today[0])
+    unbounded = []  # one frame per day, never expired
+    rng = random.Random(16)
+    live: list[str] = []
+
+    print(f'{"day":>4} {"live":>8} {"parts":>5} {"RSS MB":>7} {"snapshot MB":>11} {"compact s":>9} '
+          f'{"filter ms":>9} {"all rows":>9} {"unbounded ms":>12}')
+    for day in range(args.days):
+        today[0] = start_day + timedelta(days=day)
+        jobs = generate_job_data(args.per_day, seed=day)
+        for job in jobs:
+            job['id'] = f'{day}-{job["id"]}'
+            job['postedDate'] = today[0].isoformat()
+        retention.ingest(jobs)
+        if args.unbounded:
+            unbounded.append(jobs_frame(jobs))
+        live.extend(job['id'] for job in jobs)
+        closed = rng.sample(live, int(len(live) * args.close_rate))
+        retention.close_postings(closed)
+        stats = retention.maintain()
+        live = retention.snapshot().frame['id'].tolist()
+
+        if (day + 1) % args.report_every == 0:
+            snapshot = retention.snapshot()
+            line = (f'{day + 1:>4} {len(snapshot):>8,} {len(retention.partitions):>5} {_rss_mb():>7.0f} '
+                    f'{snapshot.memory_usage() / 2**20:>11.0f} {stats.seconds if stats else 0:>9.2f} '
+                    f'{statistics.median(_filter_ms(snapshot)):>9.1f}')
+            if args.unbounded:
+                everything = JobStore(concat_frames(unbounded))
+                line += f' {len(everything):>9,} {statistics.median(_filter_ms(everything)):>12.1f}'
+            print(line)
+
+    # Readers during a compaction running on another thread.
+    idle = _filter_ms(retention.snapshot(), 20)
+    retention.close_postings(live[:1000])
+    compactor = threading.Thread(target=retention.compact)
+    busy = []
+    compactor.start()
+    while compactor.is_alive():
+        busy.extend(_filter_ms(retention.snapshot(), 1))
+    compactor.join()
+    print(f'\nfilter while idle: p50 {statistics.median(idle):.1f} ms, max {max(idle):.1f} ms')
+    print(f'filter during background compaction: {len(busy)} reads, p50 {statistics.median(busy):.1f} ms, '
+          f'max {max(busy):.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
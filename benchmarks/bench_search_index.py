@@ -0,0 +1,58 @@
+"""Compare ``JobSearchIndex`` with the ``filteredJobs`` linear scan.
+
+    python -m benchmarks.bench_search_index --jobs 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from jobscope.jobs import generate_job_data, matches_filters
+from jobscope.search_index import JobSearchIndex
+
+# Keystroke sequences typed into the search box, plus facet-only filters.
+QUERIES = [
+    ('a', {}),
+    ('ag', {}),
+    ('agile', {}),
+    ('agile coach', {}),
+    ('berlin', {}),
+    ('grab', {'workType': 'Remote'}),
+    ('', {'location': 'Germany', 'experience': '4-6 years'}),
+    ('', {'role': 'scrum-master', 'location': 'India', 'workType': 'Hybrid'}),
+]
+LEGACY_FIELDS = ('title', 'company', 'location')
+
+
+def _time(fn, repeat: int) -> tuple[float, int]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(args.jobs, seed=args.seed)
+    start = time.perf_counter()
+    index = JobSearchIndex(jobs)
+    print(f'indexed {len(index):,} jobs in {time.perf_counter() - start:.2f}s')
+    print(f'{"query":<16} {"filters":<58} {"scan ms":>9} {"index ms":>9} {"hits":>8} {"speedup":>8}')
+    for query, filters in QUERIES:
+        scan_s, scan_hits = _time(lambda: [job for job in jobs if matches_filters(job, query, filters)], args.repeat)
+        index_s, index_hits = _time(lambda: index.search(query, filters, fields=LEGACY_FIELDS), args.repeat)
+        hits = f'{index_hits}' if index_hits == scan_hits else f'{index_hits}/{scan_hits}'
+        print(f'{query!r:<16} {str(filters):<58} {scan_s * 1e3:9.2f} {index_s * 1e3:9.2f} {hits:>8} {scan_s / index_s:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""Memory of N serving workers sharing mapped segments vs each holding its own copy.
+
+    python -m benchmarks.bench_serving --size 100000 --workers 1 8
+
+For each worker count, fresh interpreters (spawned, like Streamlit
+workers) serve the same workload: every sort's first and second page, a
+filter per country, BM25 searches, the salary summary and cube trends.
+``private`` workers build their own store and indexes. ``shared`` workers
+attach to segments published by ``jobscope.serving``. ``idle`` workers only
+import the package, which is the floor every worker pays. Once every worker
+is warm, each reads its RSS, PSS and private bytes from
+``/proc/self/smaps_rollup``. PSS splits shared pages between the processes
+mapping them, so the sum of PSS is the memory the group really costs.
+
+Shared workers then keep querying while the parent publishes a new
+version. The run reports how long each worker took to swap, and fails if
+any worker saw a store that was not one of the two published versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+QUERIES = ('customer', 'engineer', 'senior manager', 'data', 'sales')
+MEMORY_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+
+
+def _memory_kb() -> dict[str, int]:
+    values = dict.fromkeys(MEMORY_FIELDS, 0)
+    try:
+        with open('/proc/self/smaps_rollup') as rollup:
+            for line in rollup:
+                name, _, rest = line.partition(':')
+                if name in values:
+                    values[name] = int(rest.split()[0])
+    except OSError:
+        import resource
+        values['Rss'] = values['Pss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return values
+
+
+def _workload(cache) -> int:
+    """One pass of dashboard requests; returns the store size it served."""
+    from jobscope.jobs import COUNTRIES
+    from jobscope.pagination import SORT_FIELDS
+
+    for sort in SORT_FIELDS:
+        first = cache.page(sort=sort, limit=20)
+        cache.page(sort=sort, cursor=first.next_cursor, limit=20)
+    for country in COUNTRIES:
+        cache.page(filters={'location': country}, limit=20)
+    for query in QUERIES:
+        cache.ranked_jobs(query, k=20)
+    cache.salary_summary()
+    cache.analytics_cube().trends()
+    return len(cache.store())
+
+
+def _worker(mode: str, directory: str, size: int, seed: int, today: str,
+            barrier, results, published) -> None:
+    from datetime import date
+
+    from jobscope.cache import JobCache
+    from jobscope.corpus import generate_corpus
+    from jobscope.serving import SegmentReader
+
+    start = time.perf_counter()
+    reader = None
+    if mode == 'idle':
+        rows = size
+    else:
+        if mode == 'shared':
+            reader = SegmentReader(directory)
+            cache = reader.cache
+        else:
+            store = generate_corpus(size, seed, date.fromisoformat(today))
+            cache = JobCache(loader=lambda: store)
+        rows = _workload(cache)
+    ready = time.perf_counter() - start
+    barrier.wait()
+    memory = _memory_kb()
+    barrier.wait()
+
+    swap, seen = None, {rows}
+    if reader is not None:
+        published.wait()
+        while reader.version < 2:
+            reader.refresh()
+            seen.add(_workload(cache))
+        swap = time.time()
+        seen.add(_workload(cache))
+    results.put({'ready': ready, 'memory': memory, 'swap': swap, 'seen': sorted(seen)})
+
+
+def _run(mode: str, workers: int, directory: str, args: argparse.Namespace, today: str) -> list[dict]:
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers + 1)
+    results = context.Queue()
+    published = context.Event()
+    processes = [context.Process(target=_worker, args=(mode, directory, args.size, args.seed, today,
+                                                       barrier, results, published))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    barrier.wait()
+    published_at = None
+    if mode == 'shared':
+        from jobscope.corpus import generate_corpus
+        from jobscope.serving import SegmentPublisher
+
+        store = generate_corpus(args.size + args.size // 10, args.seed + 1, args.today)
+        SegmentPublisher(directory).publish(store)
+        published_at = time.time()
+        published.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    for result in collected:
+        result['swap'] = result['swap'] - published_at if published_at is not None else None
+    return collected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=17)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    args = parser.parse_args()
+
+    from benchmarks.suite import TODAY
+    from jobscope.corpus import generate_corpus
+    from jobscope.serving import SegmentPublisher
+
+    args.today = TODAY
+    print(f'{"mode":<8} {"workers":>7} {"ready s":>8} {"RSS MiB":>9} {"PSS MiB":>9} {"private MiB":>12} '
+          f'{"swap ms":>8}')
+    for workers in args.workers:
+        for mode in ('idle', 'private', 'shared'):
+            with tempfile.TemporaryDirectory() as directory:
+                if mode == 'shared':
+                    segment = SegmentPublisher(directory).publish(generate_corpus(args.size, args.seed, TODAY))
+                    print(f'{"":<8} published {segment.rows:,} postings in {segment.seconds:.1f} s, '
+                          f'{os.path.getsize(segment.path) / 2**20:,.0f} MiB')
+                results = _run(mode, workers, directory, args, TODAY.isoformat())
+            expected = {args.size, args.size + args.size // 10}
+            torn = [result['seen'] for result in results if not set(result['seen']) <= expected]
+            if torn:
+                raise SystemExit(f'workers saw unpublished store sizes: {torn}')
+            total = {name: sum(result['memory'][name] for result in results) / 1024 for name in MEMORY_FIELDS}
+            swaps = [result['swap'] * 1e3 for result in results if result['swap'] is not None]
+            print(f'{mode:<8} {workers:>7} {statistics.median(r["ready"] for r in results):>8.1f} '
+                  f'{total["Rss"]:>9,.0f} {total["Pss"]:>9,.0f} '
+                  f'{total["Private_Clean"] + total["Private_Dirty"]:>12,.0f} '
+                  f'{max(swaps) if swaps else float("nan"):>8,.0f}')
+
+
+if __name__ == '__main__':
+    main()
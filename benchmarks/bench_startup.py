@@ -0,0 +1,117 @@
+"""Time to first dashboard in a fresh process: rebuilding everything vs loading a snapshot.
+
+    python -m benchmarks.bench_startup --size 1000000 --rounds 3
+
+The parent writes a snapshot of a seeded corpus with ``jobscope.snapshot``.
+It then starts fresh interpreters that each render the first dashboard:
+the first page of cards, the salary summary and the cube's country trends.
+The ``rebuild`` child generates the corpus and builds every index itself,
+which stands in for re-parsing the crawl. The ``snapshot`` child maps the
+file instead. Each child reports its own phases plus peak and current RSS;
+``wall`` is the parent's view, interpreter start-up included. The snapshot
+file stays in the page cache between runs, as it would across a restart.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ('import', 'load', 'first page', 'salary', 'trends')
+
+
+def _child(mode: str, path: str, size: int, seed: int, today: str) -> None:
+    started = time.perf_counter()
+    phases = {}
+
+    def lap(name: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        phases[name] = now - started
+        started = now
+
+    from jobscope.cache import JobCache
+    from jobscope.snapshot import load_cache
+    lap('import')
+    if mode == 'snapshot':
+        cache = load_cache(path)
+    else:
+        from datetime import date
+
+        from jobscope.corpus import generate_corpus
+        store = generate_corpus(size, seed, date.fromisoformat(today))
+        cache = JobCache(loader=lambda: store)
+        cache.store()
+    lap('load')
+    cache.page(limit=20)
+    lap('first page')
+    cache.salary_summary()
+    lap('salary')
+    cache.analytics_cube().trends()
+    lap('trends')
+
+    from benchmarks.suite import _status_kb
+    print(json.dumps({'phases': phases, 'peak_kb': _status_kb('VmHWM'), 'rss_kb': _status_kb('VmRSS')}))
+
+
+def _run(mode: str, path: str, args: argparse.Namespace, today: str) -> dict:
+    command = [sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode, '--path', path,
+               '--size', str(args.size), '--seed', str(args.seed), '--today', today]
+    start = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result['wall'] = time.perf_counter() - start
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=17)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--child', choices=('rebuild', 'snapshot'), help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    parser.add_argument('--today', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.path, args.size, args.seed, args.today)
+        return
+
+    from benchmarks.suite import TODAY
+    from jobscope.cache import JobCache
+    from jobscope.corpus import generate_corpus
+    from jobscope.snapshot import save_cache
+
+    store = generate_corpus(args.size, args.seed, TODAY)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.snap')
+        start = time.perf_counter()
+        manifest = save_cache(JobCache(loader=lambda: store), path)
+        print(f'{len(store):,} postings: snapshot built and written in {time.perf_counter() - start:.1f} s, '
+              f'{os.path.getsize(path) / 2**20:,.0f} MiB, components {", ".join(manifest["components"])}')
+        del store
+
+        results = {mode: [_run(mode, path, args, TODAY.isoformat()) for _ in range(rounds)]
+                   for mode, rounds in (('rebuild', 1), ('snapshot', args.rounds))}
+
+    print(f'\n{"phase":<11} {"rebuild ms":>11} {"snapshot ms":>12}')
+    for phase in PHASES + ('wall',):
+        row = []
+        for mode in ('rebuild', 'snapshot'):
+            values = [result['phases'][phase] if phase != 'wall' else result['wall'] for result in results[mode]]
+            row.append(statistics.median(values) * 1e3)
+        print(f'{phase:<11} {row[0]:>11,.0f} {row[1]:>12,.0f}')
+    for label, key in (('peak RSS', 'peak_kb'), ('RSS', 'rss_kb')):
+        rebuild, snapshot = (statistics.median(result[key] for result in results[mode]) / 1024
+                             for mode in ('rebuild', 'snapshot'))
+        print(f'{label + " MiB":<11} {rebuild:>11,.0f} {snapshot:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Memory and filter/sort cost of ``JobStore`` versus a list of job dicts.
+
+    python -m benchmarks.bench_store --jobs 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from jobscope.jobs import generate_job_data, matches_filters
+from jobscope.salary import SalaryInsights
+from jobscope.store import JobStore
+
+FILTERS = {'location': 'Germany', 'workType': 'Hybrid'}
+
+
+def list_memory(jobs: list[dict]) -> int:
+    """Bytes held by the list, its dicts and every distinct value object."""
+    seen: set[int] = set()
+    total = sys.getsizeof(jobs)
+    for job in jobs:
+        total += sys.getsizeof(job)
+        for value in job.values():
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    jobs = generate_job_data(args.jobs, seed=args.seed)
+    store, build_s = _timed(lambda: JobStore.from_jobs(jobs))
+    dict_bytes, store_bytes = list_memory(jobs), store.memory_usage()
+    print(f'{args.jobs:,} postings, store built in {build_s:.2f}s')
+    print(f'list of dicts : {dict_bytes / 2**20:9.1f} MiB  {dict_bytes / args.jobs:7.0f} B/posting')
+    print(f'JobStore      : {store_bytes / 2**20:9.1f} MiB  {store_bytes / args.jobs:7.0f} B/posting')
+    print(f'reduction     : {dict_bytes / store_bytes:9.1f}x')
+
+    scanned, scan_s = _timed(lambda: [job for job in jobs if matches_filters(job, 'scrum', FILTERS)])
+    filtered, filter_s = _timed(lambda: store.filter('scrum', FILTERS))
+    assert len(scanned) == len(filtered)
+    print(f'filter        : scan {scan_s * 1e3:8.1f} ms   store {filter_s * 1e3:8.1f} ms   ({len(filtered):,} hits)')
+    _, list_sort_s = _timed(lambda: sorted(jobs, key=lambda job: (job['rating'], job['id'])))
+    _, store_sort_s = _timed(lambda: store.sort(store.frame, 'rating', ascending=True))
+    print(f'sort by rating: list {list_sort_s * 1e3:8.1f} ms   store {store_sort_s * 1e3:8.1f} ms')
+    insights = SalaryInsights(store)
+    _, cold_s = _timed(insights.summary)
+    _, warm_s = _timed(insights.summary)
+    print(f'salary summary: cold {cold_s * 1e3:8.1f} ms   cached {warm_s * 1e3:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
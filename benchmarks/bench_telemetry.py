@@ -0,0 +1,92 @@
+"""Overhead of span recording and the sampling profiler on the suite's hot paths.
+
+    python -m benchmarks.bench_telemetry --size 100000 --rounds 7 [--profile out.folded]
+
+Each round runs every scenario with telemetry off, on, and on with the
+profiler sampling, in rotating order, and the medians are compared. On a
+busy machine that difference is noise-bound. So the estimated cost is
+also printed: spans recorded times the measured cost of one span, and the
+profiler's own sampling time, both as a share of the scenario's time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from benchmarks.suite import TODAY, Context, filter_, salary, save_track, search
+from jobscope import telemetry
+from jobscope.corpus import generate_corpus
+
+SCENARIOS = {'filter': filter_, 'search': search, 'salary': salary, 'save_track': save_track}
+MODES = ('off', 'on', 'profiled')
+
+
+def _span_ns(repeat: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with telemetry.span('bench.empty'):
+            pass
+    return (time.perf_counter() - start) / repeat * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--interval', type=float, default=telemetry.PROFILE_INTERVAL)
+    parser.add_argument('--profile', help='write the collapsed stacks here')
+    args = parser.parse_args()
+
+    telemetry.enable()
+    enabled_ns = _span_ns()
+    telemetry.disable()
+    disabled_ns = _span_ns()
+    span_ns = enabled_ns - disabled_ns
+    print(f'empty span: {enabled_ns:.0f} ns enabled, {disabled_ns:.0f} ns disabled')
+
+    store = generate_corpus(args.size, 17, TODAY)
+    profiler = telemetry.SamplingProfiler(args.interval)
+    seconds = {(name, mode): [] for name in SCENARIOS for mode in MODES}
+    spans = dict.fromkeys(SCENARIOS, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        context = Context(args.size, 17, args.repeat, store, tmp)
+        for round_ in range(args.rounds):
+            for offset in range(len(MODES)):
+                mode = MODES[(round_ + offset) % len(MODES)]
+                telemetry.TELEMETRY.enabled = mode != 'off'
+                if mode == 'profiled':
+                    profiler.start()
+                for name, scenario in SCENARIOS.items():
+                    context.tmp = tempfile.mkdtemp(dir=tmp)
+                    before = sum(entry.count for entry in telemetry.TELEMETRY.spans())
+                    start = time.perf_counter()
+                    scenario(context)
+                    seconds[name, mode].append(time.perf_counter() - start)
+                    if mode == 'on':
+                        spans[name] += sum(entry.count for entry in telemetry.TELEMETRY.spans()) - before
+                if mode == 'profiled':
+                    profiler.stop()
+    telemetry.enable()
+
+    print(f'\n{"scenario":<11} {"off ms":>9} {"on ms":>9} {"diff":>7} {"profiled ms":>12} {"diff":>7} '
+          f'{"spans/run":>10} {"est. cost":>9}')
+    for name in SCENARIOS:
+        off, on, profiled = (statistics.median(seconds[name, mode]) * 1e3 for mode in MODES)
+        per_run = spans[name] / args.rounds
+        print(f'{name:<11} {off:>9.1f} {on:>9.1f} {(on / off - 1) * 100:>6.1f}% {profiled:>12.1f} '
+              f'{(profiled / off - 1) * 100:>6.1f}% {per_run:>10,.0f} {per_run * span_ns / 1e6 / off:>8.2%}')
+    print(f'\nprofiler: {profiler.samples:,} samples in {profiler.elapsed:.1f} s, '
+          f'{profiler.overhead:.2%} of wall time spent sampling')
+    print('\nspans recorded:')
+    for entry in telemetry.TELEMETRY.spans()[:8]:
+        print(f'  {entry.name:<24} {entry.count:>8,} x  p50 {entry.p50 * 1e3:8.3f} ms  p99 {entry.p99 * 1e3:8.3f} ms')
+    if args.profile:
+        print(f'\n{profiler.write(args.profile)} distinct stacks written to {args.profile}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Local HTTP server that replays recorded listing pages for offline crawls.
+
+Pages live on disk as ``<root>/<platform>/<country>/<role-slug>.html`` and are
+served for ``/<platform>/jobs?q=<role>&country=<country>``. The server sends
+``ETag``/``Last-Modified`` and answers conditional requests with 304, and can
+add artificial latency or throttle every n-th request with a 429 so crawler
+behaviour can be exercised without touching the real platforms.
+
+    python -m benchmarks.fixture_server /tmp/jobscope-fixtures --record
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import random
+import threading
+import time
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from jobscope.jobs import COUNTRIES, ROLES, Job, make_job, slugify
+from jobscope.scraper import PLATFORMS, Platform
+
+JOB_CARD = '''<li class="job-card" data-job-id="{id}">
+  <h3 class="job-title">{title}</h3>
+  <span class="company">{company}</span>
+  <span class="location">{location}</span>
+  <span class="salary">{salary}</span>
+  <span class="work-type">{workType}</span>
+  <span class="experience">{experience}</span>
+  <span class="rating">{rating}</span>
+  <time class="posted" datetime="{postedDate}">{postedDate}</time>
+  <p class="description">{description}</p>
+  <a class="apply" href="{applyLink}">Apply on {platform}</a>
+</li>'''
+
+
+def render_listing_page(jobs: Sequence[Job], platform: str, country: str, role: str) -> str:
+    cards = '\n'.join(JOB_CARD.format(**{key: html.escape(str(value)) for key, value in job.items()}) for job in jobs)
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            f'<title>{html.escape(role)} jobs in {html.escape(country)} | {platform}</title></head>\n'
+            f'<body><ul class="job-list" data-platform="{platform}">\n{cards}\n</ul></body></html>\n')
+
+
+def fixture_path(root: Path, platform: str, country: str, role: str) -> Path:
+    return root / platform / country / f'{slugify(role)}.html'
+
+
+def record_fixtures(root: Path, jobs_per_page: int = 25, seed: int = 1,
+                    platforms: Optional[Sequence[str]] = None) -> int:
+    """Write one listing page per platform × country × role; return the page count."""
+    rng = random.Random(seed)
+    today = date.today()
+    pages = 0
+    for name in platforms or PLATFORMS:
+        platform = PLATFORMS[name]
+        for country in COUNTRIES:
+            if not platform.serves(country):
+                continue
+            for role in ROLES:
+                jobs = []
+                for _ in range(jobs_per_page):
+                    job = make_job(rng, 0, today, country=country, role=role, platform=name)
+                    job['id'] = f'{slugify(name)}-{job["applyLink"].rsplit("-", 1)[-1]}'
+                    jobs.append(job)
+                path = fixture_path(root, name, country, role)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(render_listing_page(jobs, name, country, role), encoding='utf-8')
+                pages += 1
+    return pages
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root: Path, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, throttle_every: int = 0, retry_after: float = 0.05):
+        super().__init__((host, port), FixtureHandler)
+        self.root = Path(root)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests_seen = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def platforms(self, requests_per_second: float = 0.0) -> dict[str, Platform]:
+        """``PLATFORMS`` rewritten to point at this server."""
+        return {name: Platform(name, f'{self.url}/{name}/jobs', requests_per_second, platform.countries)
+                for name, platform in PLATFORMS.items()}
+
+    def count_request(self) -> int:
+        with self._lock:
+            self.requests_seen += 1
+            return self.requests_seen
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: FixtureServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b'', headers: Optional[dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        seen = server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+        if server.throttle_every and seen % server.throttle_every == 0:
+            self._send(429, headers={'Retry-After': str(server.retry_after)})
+            return
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        platform = parts.path.strip('/').split('/')[0]
+        try:
+            path = fixture_path(server.root, platform, query['country'][0], query['q'][0])
+            body = path.read_bytes()
+        except (KeyError, OSError):
+            self._send(404)
+            return
+        mtime = path.stat().st_mtime
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        headers = {
+            'Content-Type': 'text/html; charset=utf-8',
+            'ETag': etag,
+            'Last-Modified': formatdate(mtime, usegmt=True),
+        }
+        if self._not_modified(etag, mtime):
+            with server._lock:
+                server.not_modified += 1
+            self._send(304, headers=headers)
+            return
+        self._send(200, body, headers)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Record and serve listing page fixtures.')
+    parser.add_argument('root', type=Path)
+    parser.add_argument('--record', action='store_true', help='write fresh fixture pages first')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+    if args.record:
+        print(f'recorded {record_fixtures(args.root)} pages under {args.root}')
+    server = FixtureServer(args.root, port=args.port, latency=args.latency)
+    print(f'serving {args.root} on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""End-to-end benchmark suite over a seeded synthetic corpus, with a regression gate.
+
+    python -m benchmarks.suite --size 1000000 --output results.json
+    python -m benchmarks.suite --size 100000 --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --size 100000 --write-baseline benchmarks/baseline.json
+
+Scenarios cover ingest, filter, search, salary aggregation, save/track and
+export, over a corpus from ``jobscope.corpus`` with a fixed seed. Each
+scenario reports p50/p95/p99 latency per operation, throughput (items per
+second) and peak RSS growth. Growth is measured against the resident set
+at the scenario's start, with the high-water mark reset through
+``/proc/self/clear_refs``. Results are written as JSON. Against a baseline
+file, a scenario regresses when its p95 or peak memory grows, or its
+throughput drops, by more than ``--tolerance``. The process then exits
+with status 1. A baseline taken at another ``--size`` is refused before
+anything runs, since latency and throughput both depend on the corpus size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Callable
+
+import numpy as np
+
+from jobscope.analytics import AnalyticsCube
+from jobscope.corpus import corpus_jobs, generate_corpus
+from jobscope.export import export_jobs
+from jobscope.persistence import UserDataStore
+from jobscope.ranking import BM25Index
+from jobscope.retention import RetentionStore
+from jobscope.salary import SalaryInsights
+from jobscope.store import JobStore
+
+TODAY = date(2026, 10, 18)
+FILTERS = [
+    ('', {}),
+    ('scrum', {}),
+    ('', {'location': 'India', 'workType': 'Remote'}),
+    ('berlin', {'role': 'scrum-master', 'experience': '4-6 years'}),
+    ('customer success', {'platform': 'LinkedIn'}),
+    ('zalando', {}),
+]
+QUERIES = ['agile coach berlin', 'scrum', 'senior customer success manager singapore', 'infosys remote',
+           'lead scrum master amsterdam hybrid']
+SLICES = [((), None), (('country',), None), (('platform', 'workType'), None), (('week',), {'country': 'India'})]
+# Peak-memory changes below this are noise, whatever the ratio.
+MEMORY_FLOOR_MB = 16.0
+
+
+@dataclass
+class Result:
+    operations: int
+    items: int
+    unit: str
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput: float
+    peak_mb: float
+
+
+@dataclass
+class Context:
+    size: int
+    seed: int
+    repeat: int
+    store: JobStore
+    tmp: str
+    cache: dict = field(default_factory=dict)
+
+
+def _status_kb(field_name: str) -> int:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field_name + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak() -> None:
+    try:
+        with open('/proc/self/clear_refs', 'w') as handle:
+            handle.write('5')
+    except OSError:
+        pass
+
+
+def _timed(operations: list[Callable[[], int]]) -> tuple[list[float], int]:
+    """Run each operation once; return per-operation seconds and items handled."""
+    samples, items = [], 0
+    for operation in operations:
+        start = time.perf_counter()
+        items += operation()
+        samples.append(time.perf_counter() - start)
+    return samples, items
+
+
+# Scenarios: each returns (per-operation seconds, items handled, unit).
+
+def ingest(context: Context) -> tuple[list[float], int, str]:
+    """Crawl batches of 5,000 posting dicts into a 90-day retention store, then compact."""
+    retention = RetentionStore(today=lambda: TODAY)
+    jobs = corpus_jobs(context.size, context.seed + 1, TODAY)
+    samples, items = [], 0
+    while True:
+        batch = [job for _, job in zip(range(5000), jobs)]
+        if not batch:
+            break
+        start = time.perf_counter()
+        items += retention.ingest(batch)
+        samples.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    retention.compact()
+    samples.append(time.perf_counter() - start)
+    return samples, items, 'postings'
+
+
+def filter_(context: Context) -> tuple[list[float], int, str]:
+    store = context.store
+    operations = [lambda query=query, filters=filters: len(store.filter(query, filters, 'postedDate'))
+                  for _ in range(context.repeat) for query, filters in FILTERS]
+    return (*_timed(operations), 'rows')
+
+
+def search(context: Context) -> tuple[list[float], int, str]:
+    """BM25 top-20; the index build is the first sample."""
+    start = time.perf_counter()
+    index = BM25Index(context.store)
+    build = time.perf_counter() - start
+    operations = [lambda query=query: len(index.search(query, 20))
+                  for _ in range(context.repeat * 4) for query in QUERIES]
+    samples, items = _timed(operations)
+    return [build] + samples, items, 'results'
+
+
+def salary(context: Context) -> tuple[list[float], int, str]:
+    """Uncached salary summaries, then analytics-cube slices."""
+    store = context.store
+    operations = [lambda: len(SalaryInsights(store).summary()['trends']) for _ in range(context.repeat)]
+    cube = AnalyticsCube.from_store(store)
+    operations += [lambda by=by, where=where: len(cube.rollup(by, where))
+                   for _ in range(context.repeat) for by, where in SLICES]
+    return (*_timed(operations), 'groups')
+
+
+def save_track(context: Context) -> tuple[list[float], int, str]:
+    """Save and track-application writes from 100 users against a file database."""
+    database = UserDataStore(os.path.join(context.tmp, 'users.db'))
+    try:
+        users = [database.create_user(f'user{index}@example.com').id for index in range(100)]
+        ids = context.store.frame['id']
+        rng = random.Random(context.seed)
+        operations = []
+        for index in range(context.repeat * 200):
+            user, job_id = rng.choice(users), str(ids.iloc[rng.randrange(len(ids))])
+            if index % 2:
+                operations.append(lambda user=user, job_id=job_id: int(database.save_job(user, job_id)) or 1)
+            else:
+                operations.append(lambda user=user, job_id=job_id: len([database.track_application(user, job_id)]))
+        return (*_timed(operations), 'writes')
+    finally:
+        database.close()
+
+
+def export(context: Context) -> tuple[list[float], int, str]:
+    path = os.path.join(context.tmp, 'export.csv')
+    operations = [lambda: export_jobs(context.store, path, 'csv', filters={'workType': 'Remote'}).rows
+                  for _ in range(max(context.repeat // 2, 1))]
+    return (*_timed(operations), 'rows')
+
+
+SCENARIOS = {
+    'ingest': ingest,
+    'filter': filter_,
+    'search': search,
+    'salary': salary,
+    'save_track': save_track,
+    'export': export,
+}
+
+
+def run(names: list[str], size: int, seed: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = generate_corpus(size, seed, TODAY)
+        results = {'corpus': {'seconds': round(time.perf_counter() - start, 3),
+                              'memory_mb': round(store.memory_usage() / 2**20, 1)}}
+        context = Context(size, seed, repeat, store, tmp)
+        for name in names:
+            gc.collect()
+            baseline_kb = _status_kb('VmRSS')
+            _reset_peak()
+            samples, items, unit = SCENARIOS[name](context)
+            peak_kb = _status_kb('VmHWM')
+            milliseconds = np.array(samples) * 1e3
+            total = float(np.sum(samples))
+            results[name] = asdict(Result(
+                operations=len(samples), items=items, unit=unit, seconds=round(total, 4),
+                p50_ms=round(float(np.percentile(milliseconds, 50)), 3),
+                p95_ms=round(float(np.percentile(milliseconds, 95)), 3),
+                p99_ms=round(float(np.percentile(milliseconds, 99)), 3),
+                throughput=round(items / total, 1) if total else 0.0,
+                peak_mb=round(max(peak_kb - baseline_kb, 0) / 1024, 1),
+            ))
+            print(f'{name:<11} {results[name]["p50_ms"]:>10.2f} {results[name]["p95_ms"]:>10.2f} '
+                  f'{results[name]["p99_ms"]:>10.2f} {results[name]["throughput"]:>14,.0f} {unit:<9}'
+                  f'{results[name]["peak_mb"]:>8.1f}', flush=True)
+    return {
+        'meta': {'size': size, 'seed': seed, 'repeat': repeat, 'python': platform.python_version(),
+                 'machine': platform.machine(), 'cpus': os.cpu_count(),
+                 'created': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline``, one line each."""
+    if current['meta']['size'] != baseline['meta']['size']:
+        raise ValueError(f'baseline was taken at size {baseline["meta"]["size"]:,}, '
+                         f'this run used {current["meta"]["size"]:,}')
+    regressions = []
+    print(f'\n{"scenario":<11} {"p95 ms":>18} {"throughput":>24} {"peak MB":>16}')
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or name == 'corpus':
+            continue
+        checks = [
+            ('p95', result['p95_ms'] > before['p95_ms'] * (1 + tolerance)),
+            ('throughput', result['throughput'] < before['throughput'] * (1 - tolerance)),
+            ('peak memory', result['peak_mb'] > max(before['peak_mb'] * (1 + tolerance),
+                                                    before['peak_mb'] + MEMORY_FLOOR_MB)),
+        ]
+        failed = [label for label, regressed in checks if regressed]
+        print(f'{name:<11} {before["p95_ms"]:>8.2f} -> {result["p95_ms"]:<8.2f}'
+              f'{before["throughput"]:>11,.0f} -> {result["throughput"]:<11,.0f}'
+              f'{before["peak_mb"]:>6.1f} -> {result["peak_mb"]:<6.1f} {"REGRESSED: " + ", ".join(failed) if failed else "ok"}')
+        regressions.extend(f'{name}: {label}' for label in failed)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=17)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--output', help='write the JSON results here')
+    parser.add_argument('--baseline', help='compare against this JSON results file')
+    parser.add_argument('--write-baseline', help='store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed relative change; runs on one shared CPU vary by up to 40%%')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline['meta']['size'] != args.size:
+            sys.exit(f'error: baseline {args.baseline} was taken at size {baseline["meta"]["size"]:,}, '
+                     f'not {args.size:,}; rerun with --size {baseline["meta"]["size"]}')
+
+    print(f'{"scenario":<11} {"p50 ms":>10} {"p95 ms":>10} {"p99 ms":>10} {"throughput":>14} {"":<9}{"peak MB":>8}')
+    current = run(args.scenarios, args.size, args.seed, args.repeat)
+    for path in (args.output, args.write_baseline):
+        if path:
+            with open(path, 'w') as handle:
+                json.dump(current, handle, indent=2)
+                handle.write('\n')
+    if baseline is not None:
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s): {"; ".join(regressions)}', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""JobScope data pipeline: job generation, search, storage and analytics.
+
+``streamlit_app.py`` holds the dashboard prototype; the modules in this
+package implement the Python side of the features it renders.
+"""
@@ -0,0 +1,185 @@
+"""Saved-search alerts matched against newly ingested postings.
+
+Re-running every saved search against the corpus after each crawl costs
+users times jobs. ``AlertEngine`` indexes the saved searches instead. Each
+search is a conjunction of conditions:
+
+* ``('t', token)`` for each query token but the last;
+* ``('p', prefix)`` for the last token, which matches as a prefix the same
+  way ``JobSearchIndex.match`` does;
+* ``('f', facet, value)`` for each active filter;
+* ``('s', range)`` for a ``salaryRange`` filter, which holds when the
+  posting's salary overlaps the range.
+
+A search is filed under one anchor condition, the one least likely to hold
+for a random posting: exact tokens first (longest first), then the prefix,
+then facets from the narrowest to the broadest, then salary ranges. A
+search with no conditions goes on a match-all list. For a new posting the
+engine builds the set of conditions the posting satisfies and looks those
+up as anchors.
+Each candidate is then confirmed with one frozenset subset test. Work
+therefore grows with the posting's size and the number of plausible
+subscribers, not with the total number of saved searches.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional
+
+from .jobs import Job
+from .persistence import SavedSearch, UserDataStore
+from .salary import SALARY_FILTER, in_salary_range, parse_salary, parse_salary_range
+from .search_index import FILTER_FACETS, TEXT_FIELDS, facet_value, tokenize
+
+# Facets in the order they are preferred as anchors, narrowest first.
+ANCHOR_FACETS = ('role', 'experience', 'country', 'platform', 'workType')
+
+Condition = tuple
+
+
+@dataclass(frozen=True)
+class Alert:
+    search: SavedSearch
+    job: Job
+
+
+def conditions(query: str = '', filters: Optional[Mapping[str, str]] = None) -> frozenset[Condition]:
+    """The conditions a posting has to satisfy to match a saved search."""
+    tokens = tokenize(query)
+    required: set[Condition] = {('t', token) for token in tokens[:-1]}
+    if tokens:
+        required.add(('p', tokens[-1]))
+    for key, value in (filters or {}).items():
+        facet = FILTER_FACETS.get(key)
+        if facet is not None and value != 'all':
+            required.add(('f', facet, value))
+        elif key == SALARY_FILTER and value != 'all':
+            parse_salary_range(value)
+            required.add(('s', value))
+    return frozenset(required)
+
+
+def _anchor_rank(condition: Condition) -> tuple:
+    kind = condition[0]
+    if kind == 't':
+        return 0, -len(condition[1])
+    if kind == 'p':
+        return 1, -len(condition[1])
+    if kind == 's':
+        return 3, condition[1]
+    return 2, ANCHOR_FACETS.index(condition[1])
+
+
+def anchor(required: frozenset[Condition]) -> Optional[Condition]:
+    return min(required, key=_anchor_rank) if required else None
+
+
+class AlertEngine:
+    """Reverse index from conditions to the saved searches anchored on them."""
+
+    def __init__(self, searches: Iterable[SavedSearch] = ()):
+        self._searches: dict[int, tuple[SavedSearch, frozenset[Condition], Optional[Condition]]] = {}
+        self._anchored: dict[Optional[Condition], dict[int, frozenset[Condition]]] = defaultdict(dict)
+        # Prefix lengths in use, so a posting only generates prefixes someone asked for.
+        self._prefix_lengths: dict[int, int] = defaultdict(int)
+        # Salary ranges in use: range -> [parsed bounds, searches using it].
+        self._salary_ranges: dict[str, list] = {}
+        self._lock = threading.Lock()
+        for search in searches:
+            self.add(search)
+
+    @classmethod
+    def from_store(cls, store: UserDataStore) -> 'AlertEngine':
+        return cls(store.saved_searches())
+
+    def __len__(self) -> int:
+        return len(self._searches)
+
+    def add(self, search: SavedSearch) -> None:
+        required = conditions(search.query, search.filters)
+        key = anchor(required)
+        with self._lock:
+            self._discard(search.id)
+            self._searches[search.id] = (search, required, key)
+            self._anchored[key][search.id] = required
+            for condition in required:
+                if condition[0] == 'p':
+                    self._prefix_lengths[len(condition[1])] += 1
+                elif condition[0] == 's':
+                    self._salary_ranges.setdefault(condition[1], [parse_salary_range(condition[1]), 0])[1] += 1
+
+    def remove(self, search_id: int) -> bool:
+        with self._lock:
+            return self._discard(search_id)
+
+    def _discard(self, search_id: int) -> bool:
+        entry = self._searches.pop(search_id, None)
+        if entry is None:
+            return False
+        _, required, key = entry
+        bucket = self._anchored[key]
+        del bucket[search_id]
+        if not bucket:
+            del self._anchored[key]
+        for condition in required:
+            if condition[0] == 'p':
+                length = len(condition[1])
+                self._prefix_lengths[length] -= 1
+                if not self._prefix_lengths[length]:
+                    del self._prefix_lengths[length]
+            elif condition[0] == 's':
+                in_use = self._salary_ranges[condition[1]]
+                in_use[1] -= 1
+                if not in_use[1]:
+                    del self._salary_ranges[condition[1]]
+        return True
+
+    def satisfied(self, job: Mapping[str, Any]) -> set[Condition]:
+        """Every indexable condition ``job`` satisfies."""
+        tokens = set()
+        for field in TEXT_FIELDS:
+            tokens.update(tokenize(job.get(field) or ''))
+        found: set[Condition] = {('t', token) for token in tokens}
+        lengths = sorted(self._prefix_lengths)
+        for token in tokens:
+            for length in lengths:
+                if length > len(token):
+                    break
+                found.add(('p', token[:length]))
+        for facet in ANCHOR_FACETS:
+            value = facet_value(job, facet)
+            if value is not None:
+                found.add(('f', facet, value))
+        if self._salary_ranges:
+            salary = parse_salary(job.get('salary'))
+            found.update(('s', value) for value, (bounds, _) in self._salary_ranges.items()
+                         if in_salary_range(salary, bounds))
+        return found
+
+    def match_ids(self, job: Mapping[str, Any]) -> list[int]:
+        """Ids of the saved searches ``job`` matches."""
+        with self._lock:
+            found = self.satisfied(job)
+            anchored = self._anchored
+            matched = list(anchored.get(None, ()))
+            for condition in found:
+                bucket = anchored.get(condition)
+                if bucket:
+                    matched.extend(search_id for search_id, required in bucket.items()
+                                   if len(required) == 1 or required <= found)
+        return matched
+
+    def match(self, job: Job) -> list[SavedSearch]:
+        searches = self._searches
+        return [entry[0] for entry in map(searches.get, self.match_ids(job)) if entry is not None]
+
+    def alerts(self, jobs: Iterable[Job]) -> dict[int, list[Alert]]:
+        """New-posting alerts grouped by user id."""
+        by_user: dict[int, list[Alert]] = defaultdict(list)
+        for job in jobs:
+            for search in self.match(job):
+                by_user[search.user_id].append(Alert(search, job))
+        return dict(by_user)
@@ -0,0 +1,455 @@
+"""Incrementally maintained rollups behind the Analytics page.
+
+``AnalyticsCube`` keeps one cell per combination of country, role family,
+work type, experience, platform and posted week. Each cell holds:
+
+* the posting count;
+* the count and sum of base-currency salary midpoints;
+* the count and sum of ratings;
+* a salary histogram over log-spaced buckets, ``SKETCH_GAMMA`` apart.
+
+Percentiles read from the histogram are within about 1% of the exact
+value. Because histogram counts can be subtracted, expiring a posting
+costs the same as adding one.
+
+Cells are rows of a column table: integer dimension codes, numpy measure
+arrays and a ``cells x SKETCH_BUCKETS`` histogram matrix. An upsert or
+expiry touches only the rows of the postings involved. Every slice,
+breakdown or week-over-week comparison is a masked, grouped reduction over
+the cell rows, so reads never touch postings and cost O(cells), not
+O(jobs).
+
+What each posting contributed is kept as columns after a bulk build and
+only turned into a per-id map on the first write, so building the cube, or
+loading it with ``snapshot_arrays``/``from_snapshot``, never creates a
+million Python objects.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from datetime import date, timedelta
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .jobs import Job, role_family
+from .salary import PERCENTILES, RATES, base_midpoints, parse_salary
+from .store import JobStore
+
+DIMENSIONS = ('country', 'role', 'workType', 'experience', 'platform', 'week')
+SKETCH_GAMMA = 1.02
+# Base-currency salaries outside [SKETCH_MIN, SKETCH_MAX] land in the end buckets.
+SKETCH_MIN = 1e3
+SKETCH_MAX = 1e7
+
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+_FIRST_BUCKET = math.ceil(math.log(SKETCH_MIN) / _LOG_GAMMA)
+SKETCH_BUCKETS = math.ceil(math.log(SKETCH_MAX) / _LOG_GAMMA) - _FIRST_BUCKET + 1
+
+
+def week_start(day: Optional[date]) -> Optional[str]:
+    """ISO date of the Monday starting ``day``'s week."""
+    if day is None:
+        return None
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _posted_day(job: Mapping[str, Any]) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(job.get('postedDate') or '')[:10])
+    except ValueError:
+        return None
+
+
+def salary_buckets(values: np.ndarray) -> np.ndarray:
+    """Histogram bucket per salary; ``-1`` where the salary is unknown."""
+    values = np.asarray(values, dtype='float64')
+    known = values > 0
+    buckets = np.full(values.shape, -1, dtype=np.int64)
+    raw = np.ceil(np.log(values[known]) / _LOG_GAMMA) - _FIRST_BUCKET
+    buckets[known] = np.clip(raw, 0, SKETCH_BUCKETS - 1)
+    return buckets
+
+
+def bucket_value(bucket: int) -> float:
+    """Representative value of a bucket, within ``SKETCH_GAMMA`` of its members."""
+    return 2 * SKETCH_GAMMA ** (bucket + _FIRST_BUCKET) / (1 + SKETCH_GAMMA)
+
+
+def format_growth(growth: Optional[float]) -> str:
+    """``0.08`` -> ``'+8%'``, as the dashboard shows it."""
+    return 'n/a' if growth is None else f'{growth:+.0%}'
+
+
+# What one posting added to its cell, kept so it can be taken back out:
+# (cell, base salary, histogram bucket, rating). Plain tuples, because a
+# million dataclass instances take seconds to build.
+Contribution = tuple[int, float, int, float]
+
+
+class AnalyticsCube:
+    """Count, salary and rating rollups over ``DIMENSIONS``, kept up to date per posting."""
+
+    def __init__(self, rates: Optional[Mapping[str, float]] = None, capacity: int = 1024):
+        self.rates = dict(RATES if rates is None else rates)
+        self._codes: list[dict[Any, int]] = [{} for _ in DIMENSIONS]
+        self._labels: list[list[Any]] = [[] for _ in DIMENSIONS]
+        self._cells: dict[tuple[int, ...], int] = {}
+        self._dims = np.zeros((capacity, len(DIMENSIONS)), dtype=np.int32)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._salary_count = np.zeros(capacity, dtype=np.int64)
+        self._salary_sum = np.zeros(capacity, dtype=np.float64)
+        self._rating_count = np.zeros(capacity, dtype=np.int64)
+        self._rating_sum = np.zeros(capacity, dtype=np.float64)
+        self._sketch = np.zeros((capacity, SKETCH_BUCKETS), dtype=np.int32)
+        self._postings: Optional[dict[str, Contribution]] = {}
+        # (ids, cells, salaries, buckets, ratings) in place of ``_postings``
+        # until the first write.
+        self._posting_columns: Optional[tuple] = None
+        # Histogram buckets ever used; reads only sum this band of the matrix.
+        self._low, self._high = SKETCH_BUCKETS, -1
+        # Latest posted day seen, as an ISO date; the clock for ``complete_week``.
+        self._latest: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        if self._postings is None:
+            return len(self._posting_columns[0])
+        return len(self._postings)
+
+    @property
+    def cells(self) -> int:
+        """Cells holding at least one posting."""
+        return int(np.count_nonzero(self._count[:len(self._cells)]))
+
+    def memory_usage(self) -> int:
+        arrays = (self._dims, self._count, self._salary_count, self._salary_sum, self._rating_count,
+                  self._rating_sum, self._sketch)
+        return sum(array.nbytes for array in arrays)
+
+    def copy(self) -> 'AnalyticsCube':
+        """An independent cube with the same rollups, to update without disturbing readers of this one."""
+        with self._lock:
+            cube = AnalyticsCube(self.rates, capacity=1)
+            cube._codes = [dict(codes) for codes in self._codes]
+            cube._labels = [list(labels) for labels in self._labels]
+            cube._cells = dict(self._cells)
+            for name in ('_dims', '_count', '_salary_count', '_salary_sum', '_rating_count', '_rating_sum', '_sketch'):
+                setattr(cube, name, getattr(self, name).copy())
+            # The columns are never written, only replaced by a dict on first use.
+            cube._postings = dict(self._postings) if self._postings is not None else None
+            cube._posting_columns = self._posting_columns
+            cube._low, cube._high, cube._latest = self._low, self._high, self._latest
+        return cube
+
+    # Building and maintenance
+
+    def _code(self, dimension: int, value: Any) -> int:
+        codes = self._codes[dimension]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._labels[dimension].append(value)
+        return code
+
+    def _cell(self, key: tuple[int, ...]) -> int:
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = len(self._cells)
+            if cell == len(self._count):
+                self._grow()
+            self._dims[cell] = key
+        return cell
+
+    def _grow(self) -> None:
+        for name in ('_dims', '_count', '_salary_count', '_salary_sum', '_rating_count', '_rating_sum', '_sketch'):
+            array = getattr(self, name)
+            grown = np.zeros((len(array) * 2, *array.shape[1:]), dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    @classmethod
+    def from_store(cls, store: JobStore, rates: Optional[Mapping[str, float]] = None) -> 'AnalyticsCube':
+        """Build every cell from the store's columns in one grouped pass."""
+        cube = cls(rates)
+        frame = store.frame
+        if not len(frame):
+            return cube
+        days = frame['postedDate'].to_numpy(dtype='datetime64[D]')
+        known_day = ~np.isnat(days)
+        weekday = (days.view('int64') + 3) % 7  # 1970-01-01 was a Thursday
+        monday = pd.Series(days - weekday.astype('timedelta64[D]')).dt.strftime('%Y-%m-%d')
+        columns = [frame[dimension] for dimension in DIMENSIONS[:-1]]
+        columns.append(monday.where(known_day, None))
+
+        # Dimension codes per row, then one cell per distinct code tuple.
+        row_codes = np.empty((len(frame), len(DIMENSIONS)), dtype=np.int32)
+        for index, column in enumerate(columns):
+            codes, uniques = pd.factorize(column.astype(object), use_na_sentinel=True)
+            labels = [cube._code(index, value) for value in uniques.tolist()]
+            missing = cube._code(index, None) if (codes < 0).any() else -1
+            row_codes[:, index] = np.append(np.array(labels, dtype=np.int32), missing)[codes]
+        radix = [len(labels) for labels in cube._labels]
+        distinct, cell_of_row = np.unique(np.ravel_multi_index(row_codes.T, radix), return_inverse=True)
+        keys = np.stack(np.unravel_index(distinct, radix), axis=1)
+        cells = np.array([cube._cell(tuple(key)) for key in keys.tolist()], dtype=np.int64)[cell_of_row.ravel()]
+
+        salary = base_midpoints(frame, cube.rates).to_numpy(dtype='float64')
+        buckets = salary_buckets(salary)
+        has_salary = buckets >= 0
+        salary = np.where(has_salary, salary, np.nan)
+        ratings = frame['rating'].to_numpy(dtype='float64')
+        has_rating = ~np.isnan(ratings)
+        size = len(cube._count)
+        cube._count += np.bincount(cells, minlength=size)
+        cube._salary_count += np.bincount(cells[has_salary], minlength=size)
+        cube._salary_sum += np.bincount(cells[has_salary], weights=salary[has_salary], minlength=size)
+        cube._rating_count += np.bincount(cells[has_rating], minlength=size)
+        cube._rating_sum += np.bincount(cells[has_rating], weights=ratings[has_rating], minlength=size)
+        np.add.at(cube._sketch, (cells[has_salary], buckets[has_salary]), 1)
+        if has_salary.any():
+            cube._low, cube._high = int(buckets[has_salary].min()), int(buckets[has_salary].max())
+        if known_day.any():
+            cube._latest = str(days[known_day].max())
+        cube._postings = None
+        cube._posting_columns = (frame['id'], cells, salary, buckets, ratings)
+        return cube
+
+    def _contributions(self) -> dict[str, Contribution]:
+        """Contribution per posting id, built from the columns on first use; caller holds the lock."""
+        if self._postings is None:
+            ids, cells, salary, buckets, ratings = self._posting_columns
+            ids = ids if isinstance(ids, list) else ids.tolist()
+            self._postings = dict(zip(ids, zip(cells.tolist(), salary.tolist(), buckets.tolist(), ratings.tolist())))
+            self._posting_columns = None
+        return self._postings
+
+    def snapshot_arrays(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        """JSON-able state and the arrays to rebuild this cube with ``from_snapshot``."""
+        with self._lock:
+            size = len(self._cells)
+            if self._postings is None:
+                ids, cells, salary, buckets, ratings = self._posting_columns
+            else:
+                ids = list(self._postings)
+                cells, salary, buckets, ratings = (np.array(column) for column in zip(*self._postings.values())) \
+                    if self._postings else (np.empty(0),) * 4
+            state = {'rates': self.rates, 'labels': [list(labels) for labels in self._labels],
+                     'low': self._low, 'high': self._high, 'latest': self._latest}
+            arrays = {
+                'dims': self._dims[:size], 'count': self._count[:size], 'salary_count': self._salary_count[:size],
+                'salary_sum': self._salary_sum[:size], 'rating_count': self._rating_count[:size],
+                'rating_sum': self._rating_sum[:size], 'sketch': self._sketch[:size],
+                'posting_ids': ids, 'posting_cells': np.asarray(cells, dtype=np.int64),
+                'posting_salary': np.asarray(salary, dtype=np.float64),
+                'posting_buckets': np.asarray(buckets, dtype=np.int64),
+                'posting_ratings': np.asarray(ratings, dtype=np.float64),
+            }
+        return state, arrays
+
+    @classmethod
+    def from_snapshot(cls, state: Mapping[str, Any], arrays: Mapping[str, Any]) -> 'AnalyticsCube':
+        """Rebuild a cube around the arrays ``snapshot_arrays`` produced, without copying them."""
+        cube = cls(state['rates'])
+        size = len(arrays['count'])
+        if not size:
+            return cube
+        cube._labels = [list(labels) for labels in state['labels']]
+        cube._codes = [{value: code for code, value in enumerate(labels)} for labels in cube._labels]
+        cube._cells = dict(zip(map(tuple, arrays['dims'].tolist()), range(size)))
+        for name in ('dims', 'count', 'salary_count', 'salary_sum', 'rating_count', 'rating_sum', 'sketch'):
+            setattr(cube, f'_{name}', arrays[name])
+        cube._low, cube._high = state['low'], state['high']
+        cube._latest = state.get('latest')
+        cube._postings = None
+        cube._posting_columns = tuple(arrays[name] for name in ('posting_ids', 'posting_cells', 'posting_salary',
+                                                               'posting_buckets', 'posting_ratings'))
+        return cube
+
+    def _contribution(self, job: Mapping[str, Any]) -> Contribution:
+        """The cell and measures of one job record; caller holds the lock."""
+        posted = _posted_day(job)
+        if posted is not None and (self._latest is None or posted.isoformat() > self._latest):
+            self._latest = posted.isoformat()
+        values = (job.get('country'), role_family(job.get('title') or ''), job.get('workType'),
+                  job.get('experience'), job.get('platform'), week_start(posted))
+        cell = self._cell(tuple(self._code(index, value) for index, value in enumerate(values)))
+        parsed = parse_salary(job.get('salary'))
+        rate = self.rates.get(parsed.currency, math.nan) if parsed.currency else math.nan
+        salary = (parsed.min + parsed.max) / 2 * rate
+        bucket = int(salary_buckets(np.array([salary]))[0])
+        rating = job.get('rating')
+        return (cell, salary if bucket >= 0 else math.nan, bucket, float(rating) if rating is not None else math.nan)
+
+    def _apply(self, contribution: Contribution, sign: int) -> None:
+        cell, salary, bucket, rating = contribution
+        self._count[cell] += sign
+        if bucket >= 0:
+            self._salary_count[cell] += sign
+            self._salary_sum[cell] += sign * salary
+            self._sketch[cell, bucket] += sign
+            self._low, self._high = min(self._low, bucket), max(self._high, bucket)
+        if rating == rating:
+            self._rating_count[cell] += sign
+            self._rating_sum[cell] += sign * rating
+
+    def upsert(self, jobs: Iterable[Job]) -> int:
+        """Add postings, replacing earlier versions with the same ``id``."""
+        written = 0
+        with self._lock:
+            postings = self._contributions()
+            for job in jobs:
+                contribution = self._contribution(job)
+                previous = postings.get(job['id'])
+                if previous is not None:
+                    self._apply(previous, -1)
+                self._apply(contribution, 1)
+                postings[job['id']] = contribution
+                written += 1
+        return written
+
+    def expire(self, job_ids: Iterable[str]) -> int:
+        """Take closed or expired postings out of every rollup."""
+        removed = 0
+        with self._lock:
+            postings = self._contributions()
+            for job_id in job_ids:
+                previous = postings.pop(job_id, None)
+                if previous is not None:
+                    self._apply(previous, -1)
+                    removed += 1
+        return removed
+
+    # Reads
+
+    def _select(self, where: Optional[Mapping[str, Any]]) -> np.ndarray:
+        """Row numbers of live cells matching ``where``; caller holds the lock."""
+        size = len(self._cells)
+        mask = self._count[:size] > 0
+        for dimension, value in (where or {}).items():
+            if value == 'all':
+                continue
+            index = DIMENSIONS.index(dimension)
+            code = self._codes[index].get(value)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= self._dims[:size, index] == code
+        return np.flatnonzero(mask)
+
+    def rollup(self, by: Sequence[str] = (), where: Optional[Mapping[str, Any]] = None,
+               percentiles: Sequence[float] = PERCENTILES) -> list[dict[str, Any]]:
+        """Cells matching ``where`` merged per distinct ``by`` value."""
+        for dimension in (*by, *(where or {})):
+            if dimension not in DIMENSIONS:
+                raise ValueError(f'unknown dimension {dimension!r}; expected one of {DIMENSIONS}')
+        columns = [DIMENSIONS.index(dimension) for dimension in by]
+        with self._lock:
+            rows = self._select(where)
+            if not len(rows):
+                return []
+            # One integer key per ``by`` combination (mixed radix over the code counts).
+            radix = [len(self._labels[column]) for column in columns]
+            combined = np.zeros(len(rows), dtype=np.int64)
+            for column, base in zip(columns, radix):
+                combined = combined * base + self._dims[rows, column]
+            distinct, group = np.unique(combined, return_inverse=True)
+            keys = np.stack(np.unravel_index(distinct, radix), axis=1) if columns else np.empty((1, 0), np.int64)
+            groups = len(keys)
+
+            def total(array: np.ndarray) -> np.ndarray:
+                return np.bincount(group, weights=array[rows], minlength=groups)
+
+            count, salary_count, salary_sum = total(self._count), total(self._salary_count), total(self._salary_sum)
+            rating_count, rating_sum = total(self._rating_count), total(self._rating_sum)
+            # Histograms are summed over contiguous runs of group-sorted rows;
+            # this is several times faster than np.add.at or reduceat on 2-D input.
+            order = np.argsort(group, kind='stable')
+            bounds = np.r_[np.searchsorted(group[order], np.arange(groups)), len(rows)]
+            first = min(self._low, self._high + 1)
+            sorted_sketch = self._sketch[rows[order], first:self._high + 1]
+            sketch = np.stack([sorted_sketch[low:high].sum(axis=0, dtype=np.int64)
+                               for low, high in zip(bounds[:-1], bounds[1:])])
+            labels = [[self._labels[column][code] for column, code in zip(columns, key)] for key in keys.tolist()]
+
+        cumulative = np.cumsum(sketch, axis=1)
+        result = []
+        for index, label in enumerate(labels):
+            row: dict[str, Any] = dict(zip(by, label))
+            row['count'] = int(count[index])
+            row['avgSalaryBase'] = round(float(salary_sum[index] / salary_count[index])) if salary_count[index] else None
+            for q in percentiles:
+                value = None
+                if salary_count[index]:
+                    bucket = first + int(np.searchsorted(cumulative[index], q * salary_count[index], side='left'))
+                    value = round(bucket_value(bucket))
+                row[f'p{int(q * 100)}'] = value
+            row['avgRating'] = round(float(rating_sum[index] / rating_count[index]), 2) if rating_count[index] else None
+            result.append(row)
+        return sorted(result, key=lambda row: tuple('' if row[d] is None else str(row[d]) for d in by))
+
+    def weeks(self) -> list[str]:
+        with self._lock:
+            live = self._select(None)
+            codes = np.unique(self._dims[live, DIMENSIONS.index('week')])
+            labels = self._labels[DIMENSIONS.index('week')]
+            return sorted(labels[code] for code in codes.tolist() if labels[code] is not None)
+
+    def weekly(self, by: Sequence[str] = (), where: Optional[Mapping[str, Any]] = None) -> list[dict[str, Any]]:
+        """Time series: ``rollup`` per posted week."""
+        return self.rollup(('week', *by), where)
+
+    def complete_week(self, as_of: Optional[date] = None) -> Optional[str]:
+        """Monday of the latest calendar week that had ended by ``as_of``.
+
+        ``as_of`` defaults to the latest posted day, so a cube of past
+        postings reads as of when they were collected.
+        """
+        if as_of is None:
+            with self._lock:
+                if self._latest is None:
+                    return None
+                as_of = date.fromisoformat(self._latest)
+        return week_start(as_of - timedelta(days=6))
+
+    def growth(self, by: str = 'country', week: Optional[str] = None,
+               where: Optional[Mapping[str, Any]] = None,
+               as_of: Optional[date] = None) -> dict[Any, dict[str, Any]]:
+        """Week-over-week change in postings and average salary per ``by`` value.
+
+        ``week`` is compared with the week before it. It defaults to
+        ``complete_week(as_of)``: the week in progress has had fewer days to
+        collect postings, so comparing it with a full week would read as a
+        drop.
+        """
+        week = week or self.complete_week(as_of)
+        if week is None:
+            return {}
+        previous = (date.fromisoformat(week) - timedelta(days=7)).isoformat()
+        current = {row[by]: row for row in self.rollup((by,), {**(where or {}), 'week': week})}
+        before = {row[by]: row for row in self.rollup((by,), {**(where or {}), 'week': previous})}
+        result = {}
+        for value in sorted(set(current) | set(before), key=str):
+            now, then = current.get(value, {}), before.get(value, {})
+            salary_now, salary_then = now.get('avgSalaryBase'), then.get('avgSalaryBase')
+            result[value] = {
+                'week': week,
+                'count': now.get('count', 0),
+                'previousCount': then.get('count', 0),
+                'growth': (now.get('count', 0) - then['count']) / then['count'] if then.get('count') else None,
+                'salaryGrowth': (salary_now - salary_then) / salary_then
+                if salary_now is not None and salary_then else None,
+            }
+        return result
+
+    def trends(self, week: Optional[str] = None, as_of: Optional[date] = None) -> list[dict[str, Any]]:
+        """Per-country rows for the Analytics page, with measured ``growth``."""
+        growth = self.growth('country', week, as_of=as_of)
+        rows = []
+        for row in self.rollup(('country',)):
+            change = growth.get(row['country'], {})
+            rows.append({**row, 'growth': format_growth(change.get('growth')),
+                         'salaryGrowth': format_growth(change.get('salaryGrowth'))})
+        return rows
@@ -0,0 +1,442 @@
+"""Caches for the dataset, filter results and analytics behind the dashboard.
+
+Streamlit re-runs the whole script on every widget interaction, so anything
+expensive has to be looked up rather than rebuilt. ``JobCache`` has three
+tiers:
+
+* the dataset (one ``JobStore``): loaded through ``loader`` and reloaded
+  when ``dataset_ttl`` runs out, until a store is published with ``swap``;
+* filter results per (query, filters, sort), held as row positions into the
+  store rather than copies of the rows;
+* analytics aggregates.
+
+Writes through ``upsert`` and ``expire`` never touch the store or cube
+that readers hold. They apply the batch to a copy of each and publish both
+with ``swap``, so a request keeps one consistent generation from start to
+finish. The cube is carried over incrementally, so the Analytics page
+keeps reading it instead of rebuilding it after every crawl batch. A
+swapped-in store is kept until the next swap or ``reload``; it is not
+replaced by the loader when ``dataset_ttl`` runs out, which would drop the
+writes.
+
+Each tier is an ``LRUCache`` with a TTL, a byte budget and hit/miss
+counters. Concurrent misses on the same key are computed once while the
+other callers wait (single flight), so fifty sessions clicking the same
+filter trigger one scan, not fifty. ``shared_job_cache`` hands every
+Streamlit session the same instance through ``st.cache_resource``.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .analytics import AnalyticsCube, format_growth
+from .jobs import Job, generate_job_data
+from .pagination import Paginator, ResultPage
+from .ranking import BM25Index
+from .salary import SalaryInsights
+from .store import JobStore
+from .telemetry import span, timed
+
+_MISSING = object()
+
+
+def sizeof(value: Any) -> int:
+    """Approximate bytes retained by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, JobStore):
+        return value.memory_usage()
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """Thread-safe LRU map with per-entry TTL and a total byte budget."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+                 sizer: Callable[[Any], int] = sizeof, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizer = sizer
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, threading.Event] = {}
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**asdict(self._stats))
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Return the live value for ``key`` or ``_MISSING``; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires, size = entry
+        if expires and expires <= self._clock():
+            del self._entries[key]
+            self._stats.expirations += 1
+            self._stats.entries -= 1
+            self._stats.bytes -= size
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self._stats.misses += 1
+                return default
+            self._stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = self._sizer(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires = self._clock() + ttl if ttl else 0.0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._stats.entries -= 1
+                self._stats.bytes -= old[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires, size)
+            self._stats.entries += 1
+            self._stats.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or (self.max_bytes is not None and self._stats.bytes > self.max_bytes)):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._stats.evictions += 1
+                self._stats.entries -= 1
+                self._stats.bytes -= evicted_size
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing it at most once across threads."""
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    self._stats.hits += 1
+                    return value
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._stats.misses += 1
+                    pending = self._inflight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                pending.wait()
+                continue
+            try:
+                value = compute()
+                self.put(key, value, ttl)
+                return value
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                pending.set()
+
+    def invalidate(self, key: Hashable = _MISSING) -> None:
+        """Drop ``key``, or every entry when called without one."""
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+                self._stats.entries = self._stats.bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._stats.entries -= 1
+                self._stats.bytes -= entry[2]
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key satisfies ``predicate``; return how many went."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                _, _, size = self._entries.pop(key)
+                self._stats.entries -= 1
+                self._stats.bytes -= size
+            return len(stale)
+
+
+def filter_key(search_query: str, filters: Optional[Mapping[str, str]]) -> tuple:
+    """Normalise a search box value and filter dict into a cache key."""
+    active = tuple(sorted((key, value) for key, value in (filters or {}).items() if value != 'all'))
+    return search_query.strip().lower(), active
+
+
+def key_generation(key: Hashable) -> Optional[int]:
+    """The dataset generation a ``JobCache`` result or analytics key was derived from."""
+    if not isinstance(key, tuple) or len(key) < 2:
+        return None
+    version = key[1]
+    if isinstance(version, tuple) and version:
+        version = version[0]
+    return version if isinstance(version, int) else None
+
+
+def default_loader() -> JobStore:
+    return JobStore.from_jobs(generate_job_data())
+
+
+class JobCache:
+    """Dataset, result and analytics tiers for the dashboard.
+
+    ``dataset_ttl`` applies only to stores that came from ``loader``. Once
+    a store is published through ``swap`` (and so after any ``upsert`` or
+    ``expire``), it pins the dataset tier: it stays until the next ``swap``
+    or an explicit ``reload``, which goes back to ``loader`` and drops the
+    published writes.
+
+    A ``read_only`` cache only changes through ``swap``; ``upsert`` and
+    ``expire`` raise ``RuntimeError``.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], JobStore] = default_loader,
+        *,
+        dataset_ttl: Optional[float] = 15 * 60,
+        result_entries: int = 1024,
+        result_bytes: int = 64 * 2**20,
+        result_ttl: Optional[float] = 5 * 60,
+        analytics_entries: int = 64,
+        analytics_ttl: Optional[float] = 15 * 60,
+        read_only: bool = False,
+    ):
+        self.loader = loader
+        self.read_only = read_only
+        self.dataset = LRUCache(max_entries=1, ttl=dataset_ttl)
+        self.results = LRUCache(max_entries=result_entries, max_bytes=result_bytes, ttl=result_ttl)
+        self.analytics = LRUCache(max_entries=analytics_entries, ttl=analytics_ttl)
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        # Serialises swaps, and each write's read-copy-swap against them.
+        self._write_lock = threading.RLock()
+
+    def _load(self) -> tuple[int, JobStore]:
+        store = self.loader()
+        with self._generation_lock:
+            self._generation += 1
+            return self._generation, store
+
+    def _dataset(self) -> tuple[int, JobStore]:
+        return self.dataset.get_or_compute('dataset', self._load)
+
+    def store(self) -> JobStore:
+        return self._dataset()[1]
+
+    def reload(self) -> JobStore:
+        """Drop the dataset so the next read reloads it; derived tiers follow."""
+        self.dataset.invalidate()
+        return self.store()
+
+    def swap(self, store: JobStore, warm: tuple[str, ...] = ('paginator', 'cube'),
+             built: Optional[Mapping[str, Any]] = None) -> None:
+        """Publish ``store`` as the dataset, building the ``warm`` analytics first.
+
+        Readers keep the previous dataset and its derived entries until the
+        swap, so a compaction (see ``jobscope.retention``) never makes them
+        wait on a rebuild. ``warm`` names from ``paginator``, ``cube``,
+        ``bm25`` and ``salary``. ``built`` supplies entries that already
+        exist for ``store`` by the same names, plus ``salary-summary``; a
+        snapshot load (see ``jobscope.snapshot``) passes its restored indexes
+        this way. Entries derived from earlier datasets are dropped once
+        ``store`` is published, so a replaced store (and the snapshot file it
+        maps) is released when the last request using it finishes.
+
+        The published store does not expire; ``dataset_ttl`` no longer
+        applies until ``reload``.
+        """
+        with self._write_lock:
+            self._swap(store, warm, built)
+
+    def _swap(self, store: JobStore, warm: tuple[str, ...], built: Optional[Mapping[str, Any]]) -> None:
+        with self._generation_lock:
+            self._generation += 1
+            generation = self._generation
+        builders = {
+            'paginator': (('paginator', generation), Paginator),
+            'cube': (('cube', generation), AnalyticsCube.from_store),
+            'bm25': (('bm25', (generation, store.version)), BM25Index),
+            'salary': (('salary', generation), SalaryInsights),
+            'salary-summary': (('salary-summary', (generation, store.version)), None),
+        }
+        for name, value in (built or {}).items():
+            self.analytics.put(builders[name][0], value)
+        for name in warm:
+            key, build = builders[name]
+            self.analytics.put(key, build(store))
+        # ttl=0: no expiry, so the loader cannot replace what was published.
+        self.dataset.put('dataset', (generation, store), ttl=0)
+
+        def stale(key: Hashable) -> bool:
+            derived = key_generation(key)
+            return derived is not None and derived < generation
+
+        self.results.discard(stale)
+        self.analytics.discard(stale)
+
+    def _version(self) -> tuple[tuple[int, int], JobStore]:
+        generation, store = self._dataset()
+        return (generation, store.version), store
+
+    def result_rows(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+                    sort_by: Optional[str] = None, ascending: bool = False) -> np.ndarray:
+        """Row positions in ``store().frame`` matching the query, in display order."""
+        version, store = self._version()
+
+        def compute() -> np.ndarray:
+            frame = store.filter(search_query, filters, sort_by, ascending)
+            return store.frame.index.get_indexer(frame.index).astype(np.int32)
+
+        key = ('rows', version, filter_key(search_query, filters), sort_by, ascending)
+        return self.results.get_or_compute(key, compute)
+
+    def result_page(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+                    sort_by: Optional[str] = None, ascending: bool = False,
+                    offset: int = 0, limit: int = 50) -> tuple[list[Job], int]:
+        """One page of matching jobs plus the total match count."""
+        rows = self.result_rows(search_query, filters, sort_by, ascending)
+        store = self.store()
+        return store.to_jobs(store.frame.iloc[rows[offset:offset + limit]]), len(rows)
+
+    def paginator(self) -> Paginator:
+        version, store = self._version()
+        return self.analytics.get_or_compute(('paginator', version[0]), lambda: Paginator(store))
+
+    def page(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+             sort: str = 'postedDate', descending: bool = True, cursor: Optional[str] = None,
+             limit: int = 20) -> ResultPage:
+        """A cursor page of results, with the match count cached per filter set."""
+        version, _ = self._version()
+        paginator = self.paginator()
+        result = paginator.page(search_query, filters, sort, descending, cursor, limit)
+        result.total = self.results.get_or_compute(('count', version, filter_key(search_query, filters)),
+                                                   lambda: paginator.count(search_query, filters))
+        return result
+
+    def bm25(self) -> BM25Index:
+        version, store = self._version()
+        return self.analytics.get_or_compute(('bm25', version), lambda: BM25Index(store))
+
+    def ranked_jobs(self, search_query: str, filters: Optional[Mapping[str, str]] = None, k: int = 20) -> list[Job]:
+        """The ``k`` most relevant postings for the search box, best first."""
+        return self.bm25().jobs(search_query, k, filters)
+
+    def analytics_cube(self) -> AnalyticsCube:
+        """Rollups for the Analytics page, kept current by ``upsert`` and ``expire``."""
+        version, store = self._version()
+        return self.analytics.get_or_compute(('cube', version[0]), lambda: AnalyticsCube.from_store(store))
+
+    def _write(self, apply: Callable[[JobStore, AnalyticsCube], int]) -> int:
+        """Apply a write to copies of the store and cube and publish them."""
+        if self.read_only:
+            raise RuntimeError('this JobCache is read-only; writes belong to the process that publishes its data')
+        with self._write_lock:
+            cube = self.analytics_cube().copy()
+            current = self.store()
+            store = JobStore(current.frame)
+            store.version = current.version
+            changed = apply(store, cube)
+            if changed:
+                self._swap(store, ('paginator',), {'cube': cube})
+            return changed
+
+    def upsert(self, jobs: list[Job]) -> int:
+        """Write postings and fold them into the cube, as a new dataset generation."""
+        def apply(store: JobStore, cube: AnalyticsCube) -> int:
+            cube.upsert(jobs)
+            return store.upsert(jobs)
+
+        with span('index.upsert'):
+            return self._write(apply)
+
+    def expire(self, job_ids: list[str]) -> int:
+        """Remove closed postings from the store and the cube, as a new dataset generation."""
+        job_ids = list(job_ids)
+
+        def apply(store: JobStore, cube: AnalyticsCube) -> int:
+            cube.expire(job_ids)
+            return store.remove(job_ids)
+
+        with span('index.expire'):
+            return self._write(apply)
+
+    def salary_insights(self) -> SalaryInsights:
+        version, store = self._version()
+        return self.analytics.get_or_compute(('salary', version[0]), lambda: SalaryInsights(store))
+
+    @timed('salary.insights')
+    def salary_summary(self) -> dict[str, Any]:
+        """``getSalaryInsights``, with each country's measured week-over-week ``growth``."""
+        version, _ = self._version()
+
+        def compute() -> dict[str, Any]:
+            summary = self.salary_insights().summary()
+            growth = self.analytics_cube().growth('country')
+            trends = [{**entry, 'growth': format_growth(growth.get(entry['country'], {}).get('growth'))}
+                      for entry in summary['trends']]
+            return {**summary, 'trends': trends}
+
+        return self.analytics.get_or_compute(('salary-summary', version), compute)
+
+    def stats(self) -> dict[str, CacheStats]:
+        return {'dataset': self.dataset.stats, 'results': self.results.stats, 'analytics': self.analytics.stats}
+
+
+_shared_factory: Optional[Callable[[], JobCache]] = None
+
+
+def shared_job_cache() -> JobCache:
+    """The process-wide ``JobCache`` shared by every Streamlit session."""
+    global _shared_factory
+    if _shared_factory is None:
+        import streamlit as st
+
+        @st.cache_resource(show_spinner=False)
+        def create_job_cache() -> JobCache:
+            return JobCache()
+
+        _shared_factory = create_job_cache
+    return _shared_factory()
@@ -0,0 +1,232 @@
+"""Seeded synthetic corpora at production scale.
+
+``generate_job_data`` builds one dict per posting with uniform choices. That
+is fine for the dashboard's 50 mock jobs, but at millions of rows it is
+slow and the data is unrealistically flat. ``corpus_frames`` draws postings
+column-wise with numpy from the same vocabularies (``jobscope.jobs``) and
+the platform coverage of ``jobscope.scraper``, and emits frames already in
+the ``JobStore`` layout, ``chunk_rows`` at a time. Ten million postings
+stream through in bounded memory.
+
+The skew follows what the dashboard sees in practice:
+
+* countries, roles and platforms have fixed popularity weights;
+* companies and cities within a country follow a Zipf law, so a few
+  employers post most of the jobs;
+* salary bands follow experience, with one band of noise either way;
+* each company has its own base rating that postings scatter around;
+* posting dates decay exponentially with age over ``days`` and dip at
+  weekends.
+
+The same ``seed`` and arguments always give the same corpus, chunk by
+chunk, independent of ``chunk_rows``. Each chunk has its own generator,
+seeded from ``(seed, chunk index)`` over ``CHUNK_ROWS``-sized slices.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .jobs import CITIES, COMPANIES, COUNTRIES, EXPERIENCES, PLATFORMS, ROLES, SALARY_RANGES, WORK_TYPES, Job, \
+    role_family, slugify
+from .salary import salary_columns
+from .scraper import PLATFORMS as PLATFORM_SITES
+from .store import JOB_COLUMNS, TEXT_DTYPE, JobStore, concat_frames
+
+CHUNK_ROWS = 1 << 18
+
+COUNTRY_WEIGHTS = {'India': 0.34, 'Germany': 0.22, 'Netherlands': 0.14, 'France': 0.16, 'Singapore': 0.14}
+ROLE_WEIGHTS = (0.22, 0.08, 0.07, 0.03, 0.06, 0.26, 0.1, 0.09, 0.05, 0.04)
+PLATFORM_WEIGHTS = {'LinkedIn': 0.34, 'Indeed': 0.26, 'Glassdoor': 0.12, 'JobsDB': 0.3, 'MyCareersFuture': 0.35,
+                    'Xing': 0.25, 'StepStone': 0.2}
+WORK_TYPE_WEIGHTS = (0.22, 0.48, 0.3)
+EXPERIENCE_WEIGHTS = (0.14, 0.26, 0.3, 0.2, 0.1)
+COMPANY_ZIPF = 1.1
+CITY_ZIPF = 1.0
+WEEKEND_SHARE = 0.35
+DAYS = 90
+
+
+def _zipf(size: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _normalised(weights) -> np.ndarray:
+    weights = np.asarray(weights, dtype='float64')
+    return weights / weights.sum()
+
+
+class _Vocabulary:
+    """Flattened choice tables shared by every chunk."""
+
+    def __init__(self):
+        self.countries = COUNTRIES
+        self.country_p = _normalised([COUNTRY_WEIGHTS[country] for country in COUNTRIES])
+        # Companies, cities and salary bands are flattened across countries;
+        # a country's options are a contiguous run with Zipf weights.
+        self.companies = [company for country in COUNTRIES for company in COMPANIES[country]]
+        self.company_start = np.cumsum([0] + [len(COMPANIES[country]) for country in COUNTRIES])
+        self.company_cdf = [np.cumsum(_zipf(len(COMPANIES[country]), COMPANY_ZIPF)) for country in COUNTRIES]
+        self.locations = [f'{city}, {country}' for country in COUNTRIES for city in CITIES[country]]
+        self.city_start = np.cumsum([0] + [len(CITIES[country]) for country in COUNTRIES])
+        self.city_cdf = [np.cumsum(_zipf(len(CITIES[country]), CITY_ZIPF)) for country in COUNTRIES]
+        self.salaries = [band for country in COUNTRIES for band in SALARY_RANGES[country]]
+        self.salary_start = np.array([index * len(SALARY_RANGES[COUNTRIES[0]]) for index in range(len(COUNTRIES))])
+        self.platform_p = [
+            _normalised([PLATFORM_WEIGHTS[name] if PLATFORM_SITES[name].serves(country) else 0.0
+                         for name in PLATFORMS])
+            for country in COUNTRIES
+        ]
+        self.role_p = _normalised(ROLE_WEIGHTS)
+        self.work_type_p = _normalised(WORK_TYPE_WEIGHTS)
+        self.experience_p = _normalised(EXPERIENCE_WEIGHTS)
+        self.company_rating = np.random.default_rng(0).normal(4.0, 0.3, len(self.companies))
+
+
+_VOCABULARY: Optional[_Vocabulary] = None
+
+
+def _vocabulary() -> _Vocabulary:
+    global _VOCABULARY
+    if _VOCABULARY is None:
+        _VOCABULARY = _Vocabulary()
+    return _VOCABULARY
+
+
+def _pick_within(rng: np.random.Generator, country: np.ndarray, starts: np.ndarray, cdfs: list) -> np.ndarray:
+    """Per-row Zipf pick among the country's run of options."""
+    draws = rng.random(len(country))
+    picked = np.empty(len(country), dtype=np.int64)
+    for index, cdf in enumerate(cdfs):
+        rows = country == index
+        picked[rows] = starts[index] + np.minimum(np.searchsorted(cdf, draws[rows]), len(cdf) - 1)
+    return picked
+
+
+def _pick_by_country(rng: np.random.Generator, country: np.ndarray, probabilities: list) -> np.ndarray:
+    picked = np.empty(len(country), dtype=np.int64)
+    for index, p in enumerate(probabilities):
+        rows = np.flatnonzero(country == index)
+        picked[rows] = rng.choice(len(p), size=len(rows), p=p)
+    return picked
+
+
+def _categorical(codes: np.ndarray, values: list) -> pd.Categorical:
+    """Categorical over the values that occur, in first-seen vocabulary order."""
+    used = np.flatnonzero(np.bincount(codes, minlength=len(values)))
+    remap = np.full(len(values), -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    return pd.Categorical.from_codes(remap[codes], categories=[values[index] for index in used])
+
+
+def _base36(numbers: np.ndarray, width: int = 9) -> np.ndarray:
+    digits = np.frombuffer(b'0123456789abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)
+    out = np.empty((len(numbers), width), dtype=np.uint8)
+    for position in range(width - 1, -1, -1):
+        out[:, position] = digits[numbers % 36]
+        numbers = numbers // 36
+    return out.view(f'S{width}').ravel().astype(str)
+
+
+def _posting_ages(days: int, today: date) -> np.ndarray:
+    """Probability of each age in days: exponential decay with weekend dips."""
+    ages = np.arange(days)
+    weekday = np.array([(today - timedelta(days=int(age))).weekday() for age in ages])
+    weights = np.exp(-ages / max(days / 3, 1)) * np.where(weekday >= 5, WEEKEND_SHARE, 1.0)
+    return weights / weights.sum()
+
+
+def _chunk(rng: np.random.Generator, start: int, rows: int, today: date, age_p: np.ndarray) -> pd.DataFrame:
+    vocabulary = _vocabulary()
+    country = rng.choice(len(COUNTRIES), size=rows, p=vocabulary.country_p)
+    company = _pick_within(rng, country, vocabulary.company_start, vocabulary.company_cdf)
+    location = _pick_within(rng, country, vocabulary.city_start, vocabulary.city_cdf)
+    role = rng.choice(len(ROLES), size=rows, p=vocabulary.role_p)
+    work_type = rng.choice(len(WORK_TYPES), size=rows, p=vocabulary.work_type_p)
+    experience = rng.choice(len(EXPERIENCES), size=rows, p=vocabulary.experience_p)
+    band = np.clip(experience + rng.integers(-1, 2, size=rows), 0, len(SALARY_RANGES[COUNTRIES[0]]) - 1)
+    salary = vocabulary.salary_start[country] + band
+    platform = _pick_by_country(rng, country, vocabulary.platform_p)
+    rating = np.clip(np.round(vocabulary.company_rating[company] + rng.normal(0, 0.3, rows), 1), 3.0, 5.0)
+    age = rng.choice(len(age_p), size=rows, p=age_p)
+    seconds = rng.integers(0, 86400, size=rows)
+    posted = (np.datetime64(today, 's') - age.astype('timedelta64[D]').astype('timedelta64[s]')
+              + seconds.astype('timedelta64[s]'))
+    suffix = _base36(rng.integers(0, 36 ** 9, size=rows, dtype=np.int64))
+
+    # Descriptions repeat per (role, work type, location, experience), so
+    # they are rendered once per combination and stored as a categorical.
+    combination = ((role * len(WORK_TYPES) + work_type) * len(vocabulary.locations) + location) \
+        * len(EXPERIENCES) + experience
+    distinct, combination_code = np.unique(combination, return_inverse=True)
+    descriptions = []
+    for value in distinct.tolist():
+        rest, experience_index = divmod(value, len(EXPERIENCES))
+        rest, location_index = divmod(rest, len(vocabulary.locations))
+        role_index, work_index = divmod(rest, len(WORK_TYPES))
+        title, work, city = ROLES[role_index], WORK_TYPES[work_index], vocabulary.locations[location_index]
+        focus = ('customer success and relationship management' if 'Customer' in title
+                 else 'agile methodologies and team coaching')
+        descriptions.append(
+            f'We are looking for a skilled {title} to join our {work.lower()} team in {city.split(", ")[0]}. '
+            f'The ideal candidate should have {EXPERIENCES[experience_index].lower()} of experience '
+            f'and be passionate about {focus}.'
+        )
+
+    def text(codes: np.ndarray, values: list[str]) -> pd.Series:
+        return pd.Series(pd.Categorical.from_codes(codes, categories=values)).astype(TEXT_DTYPE)
+
+    links = (text(platform, [f'https://{name.lower().replace(" ", "", 1)}.com/jobs/' for name in PLATFORMS])
+             + text(company, [slugify(name) + '-' for name in vocabulary.companies])
+             + text(role, [slugify(title) + '-' for title in ROLES])
+             + pd.Series(suffix, dtype=TEXT_DTYPE))
+    ids = 'job-' + pd.Series(np.arange(start + 1, start + rows + 1)).astype(TEXT_DTYPE)
+
+    frame = pd.DataFrame({
+        'id': ids,
+        'title': _categorical(role, ROLES),
+        'company': _categorical(company, vocabulary.companies),
+        'location': _categorical(location, vocabulary.locations),
+        'country': _categorical(country, COUNTRIES),
+        'workType': _categorical(work_type, WORK_TYPES),
+        'experience': _categorical(experience, EXPERIENCES),
+        'salary': _categorical(salary, vocabulary.salaries),
+        'platform': _categorical(platform, PLATFORMS),
+        'rating': rating.astype('float32'),
+        'postedDate': posted,
+        'description': pd.Categorical.from_codes(combination_code.ravel(), categories=descriptions),
+        'applyLink': links,
+    }, columns=list(JOB_COLUMNS))
+    families = [role_family(title) for title in ROLES]
+    frame['role'] = pd.Categorical([families[index] for index in role.tolist()]) if rows else \
+        pd.Categorical([], categories=sorted({family for family in families if family}))
+    return frame.join(salary_columns(frame['salary']))
+
+
+def corpus_frames(count: int, seed: int = 0, today: Optional[date] = None, days: int = DAYS,
+                  chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """``count`` postings in ``JobStore`` layout, at most ``chunk_rows`` per frame."""
+    today = today or date.today()
+    age_p = _posting_ages(days, today)
+    for start in range(0, count, CHUNK_ROWS):
+        rng = np.random.default_rng([seed, start // CHUNK_ROWS])
+        frame = _chunk(rng, start, min(CHUNK_ROWS, count - start), today, age_p)
+        for low in range(0, len(frame), chunk_rows):
+            yield frame.iloc[low:low + chunk_rows].reset_index(drop=True)
+
+
+def generate_corpus(count: int, seed: int = 0, today: Optional[date] = None, days: int = DAYS) -> JobStore:
+    """A ``JobStore`` of ``count`` synthetic postings."""
+    return JobStore(concat_frames(list(corpus_frames(count, seed, today, days))))
+
+
+def corpus_jobs(count: int, seed: int = 0, today: Optional[date] = None, days: int = DAYS,
+                chunk_rows: int = 65536) -> Iterator[Job]:
+    """The same postings as job dicts, for APIs that take records."""
+    for frame in corpus_frames(count, seed, today, days, chunk_rows):
+        yield from JobStore.to_jobs(frame)
@@ -0,0 +1,299 @@
+"""Persistent crawl state and incremental re-crawls.
+
+``CrawlState`` remembers, per listing page, the ``ETag``/``Last-Modified``
+validators and a hash of the body, and per posting a hash of its parsed
+record. ``IncrementalCrawler`` uses it so a refresh sends conditional
+requests, skips pages the server reports (or that hash) as unchanged without
+parsing them, and hands only new or changed postings to the caller.
+Closures are decided per platform once the whole crawl is through: a
+posting that was on a re-parsed page last time is closed only if no page
+of its platform lists it now, so one that moved to another page (listings
+reorder between crawls) stays open. Closed postings are forgotten, so they
+count as new if they reappear. A changed page's posting hashes are saved
+after its postings have been upserted, and its validators only after the
+refresh's closures have been reported, so a failure part-way leaves the
+page to be re-parsed by the next refresh rather than skipped.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from .jobs import Job
+from .parser import parse_listing_page
+from .parse_stage import ParseStage
+from .scraper import CrawlEngine, FetchTask, Page
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    job_id TEXT PRIMARY KEY,
+    page_url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_page ON postings (page_url);
+'''
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def job_hash(job: Mapping[str, Any]) -> str:
+    return content_hash(json.dumps(job, sort_keys=True, ensure_ascii=False))
+
+
+@dataclass(frozen=True)
+class PageState:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    fetched_at: float
+
+
+class CrawlState:
+    """SQLite-backed record of what the last crawl saw.
+
+    Calls are serialised on one lock, so a parse stage's feeder thread and
+    the consumer can share an instance.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._db.commit()
+
+    def page(self, url: str) -> Optional[PageState]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, etag, last_modified, content_hash, fetched_at FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+        return PageState(*row) if row else None
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        state = self.page(url)
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                headers['If-Modified-Since'] = state.last_modified
+        return headers
+
+    def record_page(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: str) -> None:
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO pages (url, etag, last_modified, content_hash, fetched_at) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, '
+                'content_hash = excluded.content_hash, fetched_at = excluded.fetched_at',
+                (url, etag, last_modified, body_hash, time.time()),
+            )
+
+    def touch_page(self, url: str) -> None:
+        with self._lock:
+            self._db.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+
+    def posting_hashes(self, job_ids: Iterable[str]) -> dict[str, str]:
+        job_ids = list(job_ids)
+        hashes = {}
+        # Stay well under SQLite's bound-parameter limit.
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            with self._lock:
+                rows = self._db.execute(
+                    f'SELECT job_id, content_hash FROM postings WHERE job_id IN ({",".join("?" * len(chunk))})',
+                    chunk,
+                ).fetchall()
+            hashes.update(rows)
+        return hashes
+
+    def record_postings(self, page_url: str, postings: Iterable[tuple[str, str]]) -> None:
+        now = time.time()
+        rows = [(job_id, page_url, digest, now) for job_id, digest in postings]
+        with self._lock:
+            self._db.executemany(
+                'INSERT INTO postings (job_id, page_url, content_hash, seen_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (job_id) DO UPDATE SET page_url = excluded.page_url, '
+                'content_hash = excluded.content_hash, seen_at = excluded.seen_at',
+                rows,
+            )
+
+    def forget_postings(self, job_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._db.executemany('DELETE FROM postings WHERE job_id = ?', [(job_id,) for job_id in job_ids])
+
+    def page_postings(self, page_url: str) -> set[str]:
+        with self._lock:
+            rows = self._db.execute('SELECT job_id FROM postings WHERE page_url = ?', (page_url,)).fetchall()
+        return {row[0] for row in rows}
+
+
+@dataclass
+class RefreshResult:
+    pages: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    parsed: int = 0
+    errors: int = 0
+    upserted: list[Job] = field(default_factory=list)
+    closed: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+@dataclass
+class PageChanges:
+    """What one parsed page changed, pending ``IncrementalCrawler.record_postings``.
+
+    ``removed`` lists postings the page had last time and lacks now; they
+    are closure candidates until the rest of the platform has been seen.
+    """
+
+    page: Page
+    hashes: dict[str, str]
+    changed: list[Job]
+    removed: list[str]
+
+
+class IncrementalCrawler:
+    """Re-crawl through ``engine``, only surfacing postings that changed."""
+
+    def __init__(self, engine: CrawlEngine, state: CrawlState,
+                 parse: Callable[[str, Optional[str]], list[Job]] = parse_listing_page):
+        self.engine = engine
+        self.state = state
+        self.parse = parse
+
+    def conditional_tasks(self, tasks: Iterable[FetchTask]) -> list[FetchTask]:
+        return [dataclasses.replace(task, headers={**task.headers, **self.state.conditional_headers(task.url)})
+                for task in tasks]
+
+    def check_page(self, page: Page, result: RefreshResult) -> bool:
+        """``True`` when the page needs parsing.
+
+        Validators of a changed page are not saved here but by
+        ``record_page``, once the refresh has applied its changes.
+        """
+        result.pages += 1
+        url = page.task.url
+        if page.status == 304:
+            result.not_modified += 1
+            self.state.touch_page(url)
+            return False
+        if not page.ok:
+            result.errors += 1
+            return False
+        previous = self.state.page(url)
+        if previous is not None and previous.content_hash == content_hash(page.text):
+            self.state.record_page(url, page.headers.get('ETag'), page.headers.get('Last-Modified'),
+                                   previous.content_hash)
+            result.unchanged += 1
+            return False
+        result.parsed += 1
+        return True
+
+    def changed_postings(self, page: Page, jobs: list[Job]) -> PageChanges:
+        """Compare a parsed page's postings with the crawl state, without recording them."""
+        hashes = {job['id']: job_hash(job) for job in jobs}
+        known = self.state.posting_hashes(hashes)
+        return PageChanges(
+            page=page,
+            hashes=hashes,
+            changed=[job for job in jobs if known.get(job['id']) != hashes[job['id']]],
+            removed=sorted(self.state.page_postings(page.task.url) - hashes.keys()),
+        )
+
+    def record_postings(self, changes: PageChanges) -> None:
+        """Save a page's posting hashes once its changed postings have been upserted."""
+        self.state.record_postings(changes.page.task.url, changes.hashes.items())
+
+    def record_page(self, page: Page) -> None:
+        """Save a parsed page's validators once the refresh's closures have been reported."""
+        self.state.record_page(page.task.url, page.headers.get('ETag'), page.headers.get('Last-Modified'),
+                               content_hash(page.text))
+
+    def handle_page(self, page: Page, result: RefreshResult) -> Optional[PageChanges]:
+        """Parse one fetched page if it changed; ``None`` when it did not."""
+        if not self.check_page(page, result):
+            return None
+        return self.changed_postings(page, self.parse(page.text, page.task.platform))
+
+    def refresh(self, tasks: Optional[Iterable[FetchTask]] = None,
+                upsert: Optional[Callable[[Job], Any]] = None,
+                parse_stage: Optional[ParseStage] = None,
+                close: Optional[Callable[[list[str]], Any]] = None) -> RefreshResult:
+        """Crawl ``tasks`` (default: every listing page) and upsert changed postings.
+
+        With a ``parse_stage``, changed pages are parsed on its process pool
+        while fetching continues. ``close`` receives the ids of postings
+        that disappeared, one platform at a time after the crawl (e.g.
+        ``RetentionStore.close_postings``).
+        """
+        started = time.perf_counter()
+        result = RefreshResult()
+        tasks = self.engine.tasks() if tasks is None else tasks
+        pages = self.engine.crawl(self.conditional_tasks(tasks))
+        if parse_stage is None:
+            batches = (self.handle_page(page, result) for page in pages)
+        else:
+            parsed = parse_stage.run(page for page in pages if self.check_page(page, result))
+            batches = (self.changed_postings(item.page, item.jobs) for item in parsed)
+        parsed_pages: list[Page] = []
+        # Per platform: ids gone from their page last time, and every id listed now.
+        removed: dict[Optional[str], set[str]] = {}
+        listed: dict[Optional[str], set[str]] = {}
+        try:
+            for changes in batches:
+                if changes is None:
+                    continue
+                if upsert is not None:
+                    for job in changes.changed:
+                        upsert(job)
+                # Only now: if an upsert fails, the page still reads as
+                # changed next time and is parsed again.
+                self.record_postings(changes)
+                result.upserted.extend(changes.changed)
+                platform = changes.page.task.platform
+                removed.setdefault(platform, set()).update(changes.removed)
+                listed.setdefault(platform, set()).update(changes.hashes)
+                parsed_pages.append(changes.page)
+            for platform, candidates in removed.items():
+                closed = sorted(candidates - listed[platform])
+                if not closed:
+                    continue
+                if close is not None:
+                    close(closed)
+                self.state.forget_postings(closed)
+                result.closed.extend(closed)
+            for page in parsed_pages:
+                self.record_page(page)
+        finally:
+            self.state.commit()
+        result.elapsed = time.perf_counter() - started
+        return result
@@ -0,0 +1,314 @@
+"""Cross-platform near-duplicate detection with MinHash and LSH banding.
+
+The same role at the same company is usually posted on several platforms
+with different links, reworded titles (``Sr.`` for ``Senior``, ``(m/w/d)``
+or team suffixes), a regional company name and boilerplate added to the
+description. Each posting is reduced to word bigram shingles of its
+title, company, city and description, and those shingles to a MinHash
+signature.
+
+Signatures are cut into bands, and candidates come from band collisions
+alone. Templated postings share most of their text, so buckets can be
+large. Within a band, postings are therefore sorted by the band's hash and
+then by their normalised fields, in one of the ``BUCKET_ORDERS``. Each
+posting is paired with the ``window`` postings before it that share the
+band hash. This bounds the work at postings x bands x window,
+and copies, including prefix variants such as ``SAP`` and ``SAP
+Deutschland``, still sort next to each other. The fields only order a
+bucket; they never put two postings in one.
+
+A candidate pair is accepted when its estimated Jaccard similarity reaches
+``threshold`` and its structured fields are ``compatible``. That check only
+rejects clear conflicts, never missing or reworded values. ``SAP`` and ``SAP
+Deutschland`` or ``Scrum Master`` and ``Scrum Master - Agile Teams`` pass,
+because one value's words contain the other's. ``4-6 years`` and ``4-6
+Jahre`` pass on their numbers. A hybrid and a remote opening fail, and so
+do ``Scrum Master`` and ``Senior Scrum Master``. Their templated
+descriptions differ by a word or two, so text similarity alone cannot tell
+them apart. Accepted pairs are merged into clusters with a vectorized
+connected-components pass.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .jobs import Job
+from .telemetry import timed
+
+NUM_PERM = 64
+BANDS = 32
+THRESHOLD = 0.5
+WINDOW = 4
+SHINGLE_SIZE = 2
+SIGNATURE_CHUNK = 8192
+PAIR_CHUNK = 1 << 18
+
+_WORD_RE = re.compile(r'\w+')
+_GENDER_TAG_RE = re.compile(r'\((?:[mwfdx]\s*/\s*)+[mwfdx]\)|\b[mwf]/[mwf]/[dx]\b', re.IGNORECASE)
+_ABBREVIATIONS = {'sr': 'senior', 'jr': 'junior', 'mgr': 'manager', 'assoc': 'associate', 'dir': 'director'}
+_COMPANY_SUFFIXES = frozenset({
+    'ag', 'bv', 'co', 'corp', 'corporation', 'gmbh', 'inc', 'limited', 'llc', 'ltd', 'nv', 'plc',
+    'pte', 'pvt', 'sa', 'sas', 'se',
+})
+# Title words that make two otherwise matching titles different roles.
+SENIORITY = frozenset({'associate', 'chief', 'director', 'head', 'intern', 'junior', 'lead', 'principal',
+                       'senior', 'staff'})
+FIELDS = ('company', 'title', 'city', 'workType', 'experience')
+# Field orders postings are sorted by within a band bucket, alternating
+# between bands. The fields copies rarely reword lead, so a copy's variant
+# company or title only moves it within a run of otherwise equal postings.
+BUCKET_ORDERS = (('workType', 'experience', 'city', 'company', 'title'),
+                 ('workType', 'experience', 'city', 'title', 'company'))
+_NUMBER_RE = re.compile(r'\d+\+?')
+_LOW32 = np.uint64(0xFFFFFFFF)
+
+
+def _words(text: Optional[str]) -> list[str]:
+    return _WORD_RE.findall((text or '').casefold())
+
+
+def normalize_title(title: Optional[str]) -> str:
+    words = _words(_GENDER_TAG_RE.sub(' ', title or ''))
+    return ' '.join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def normalize_company(company: Optional[str]) -> str:
+    words = _words((company or '').replace('.', ''))
+    while len(words) > 1 and words[-1] in _COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def normalize_city(location: Optional[str]) -> str:
+    return ' '.join(_words((location or '').split(',')[0]))
+
+
+def normalize_work_type(work_type: Optional[str]) -> str:
+    return ''.join(_words(work_type))
+
+
+def normalize_experience(experience: Optional[str]) -> str:
+    """The numbers of an experience range, so ``4-6 years`` matches ``4-6 Jahre``; else its words."""
+    numbers = _NUMBER_RE.findall(experience or '')
+    return '-'.join(numbers) if numbers else ' '.join(_words(experience))
+
+
+def field_values(job: Mapping[str, Any]) -> tuple[str, ...]:
+    """Normalised ``FIELDS`` of a posting."""
+    return (normalize_company(job.get('company')), normalize_title(job.get('title')),
+            normalize_city(job.get('location')), normalize_work_type(job.get('workType')),
+            normalize_experience(job.get('experience')))
+
+
+def _contained(left: str, right: str) -> bool:
+    """Every word of one value appears in the other."""
+    left_words, right_words = set(left.split()), set(right.split())
+    return left_words <= right_words or right_words <= left_words
+
+
+def field_compatible(field: str, left: str, right: str) -> bool:
+    """Whether two normalised values of ``field`` could describe the same opening."""
+    if not left or not right or left == right:
+        return True
+    if field in ('workType', 'experience'):
+        return False
+    if field == 'title' and SENIORITY.intersection(left.split()) != SENIORITY.intersection(right.split()):
+        return False
+    return _contained(left, right)
+
+
+def compatible(left: Mapping[str, Any], right: Mapping[str, Any]) -> bool:
+    """The structured-field check a candidate pair must pass, for one pair of postings."""
+    return all(field_compatible(field, a, b) for field, a, b in zip(FIELDS, field_values(left), field_values(right)))
+
+
+def shingle_hashes(job: Mapping[str, Any], size: int = SHINGLE_SIZE) -> list[int]:
+    """CRC32 hashes of the posting's word shingles (deduplicated)."""
+    words = (normalize_title(job.get('title')).split() + ['|'] + normalize_company(job.get('company')).split()
+             + ['|'] + normalize_city(job.get('location')).split()
+             + ['|'] + [_ABBREVIATIONS.get(word, word) for word in _words(job.get('description'))])
+    if len(words) < size:
+        grams = [' '.join(words)]
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return list({zlib.crc32(gram.encode('utf-8')) for gram in grams})
+
+
+class MinHasher:
+    """Vectorized MinHash using multiply-shift hashing on 64-bit words."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, shingle_sets: Sequence[Sequence[int]], chunk_shingles: int = 1 << 18) -> np.ndarray:
+        """``(len(shingle_sets), num_perm)`` uint32 signatures."""
+        out = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(shingle_sets):
+            end, total = start, 0
+            while end < len(shingle_sets) and (end == start or total < chunk_shingles):
+                total += max(1, len(shingle_sets[end]))
+                end += 1
+            chunk = [hashes or [0] for hashes in shingle_sets[start:end]]
+            lengths = np.fromiter((len(hashes) for hashes in chunk), dtype=np.int64, count=len(chunk))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            values = np.fromiter((value for hashes in chunk for value in hashes), dtype=np.uint64,
+                                 count=int(lengths.sum()))
+            with np.errstate(over='ignore'):
+                hashed = (values[:, None] * self._a + self._b) >> np.uint64(32)
+            out[start:end] = np.minimum.reduceat(hashed & _LOW32, offsets, axis=0)
+            start = end
+        return out
+
+
+def _band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """One 64-bit hash per (posting, band)."""
+    rows = signatures.shape[1] // bands
+    banded = signatures[:, :rows * bands].reshape(len(signatures), bands, rows).astype(np.uint64)
+    keys = np.zeros(banded.shape[:2], dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for row in range(rows):
+            keys = (keys ^ banded[:, :, row]) * np.uint64(0x100000001B3)
+    return keys
+
+
+def _connected_components(count: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Smallest member index of each node's component."""
+    labels = np.arange(count, dtype=np.int64)
+    if not len(left):
+        return labels
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        before = labels.copy()
+        np.minimum.at(labels, labels[left], low)
+        np.minimum.at(labels, labels[right], low)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, before):
+            return labels
+
+
+def _sorted_unique(values: np.ndarray, presorted: bool = False) -> np.ndarray:
+    if not presorted:
+        values = np.sort(values)
+    return values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+
+
+def _field_codes(jobs: Sequence[Mapping[str, Any]]) -> tuple[np.ndarray, list[list[str]]]:
+    """``(postings, len(FIELDS))`` codes of the normalised fields, and the value of each code."""
+    codes = np.empty((len(jobs), len(FIELDS)), dtype=np.int64)
+    lookups: list[dict[str, int]] = [{} for _ in FIELDS]
+    for row, values in enumerate(map(field_values, jobs)):
+        codes[row] = [lookup.setdefault(value, len(lookup)) for lookup, value in zip(lookups, values)]
+    return codes, [list(lookup) for lookup in lookups]
+
+
+def _compatible_pairs(codes: np.ndarray, labels: list[list[str]], left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """``field_compatible`` over every field of each pair, evaluated once per distinct value pair."""
+    keep = np.ones(len(left), dtype=bool)
+    for index, field in enumerate(FIELDS):
+        values = labels[index]
+        pairs, inverse = np.unique(codes[left, index] * len(values) + codes[right, index], return_inverse=True)
+        verdict = np.fromiter((field_compatible(field, values[a], values[b])
+                               for a, b in zip(*np.divmod(pairs, len(values)))),
+                              dtype=bool, count=len(pairs))
+        keep &= verdict[inverse]
+    return keep
+
+
+@timed('dedup.cluster')
+def cluster_labels(jobs: Sequence[Mapping[str, Any]], *, threshold: float = THRESHOLD,
+                   num_perm: int = NUM_PERM, bands: int = BANDS, window: int = WINDOW,
+                   seed: int = 1) -> np.ndarray:
+    """Cluster label per posting; duplicates share the index of their first member."""
+    count = len(jobs)
+    if not count:
+        return np.empty(0, dtype=np.int64)
+    hasher = MinHasher(num_perm, seed)
+    # Shingle lists are far larger than signatures, so only one chunk of
+    # them is alive at a time.
+    signatures = np.concatenate([
+        hasher.signatures([shingle_hashes(job) for job in jobs[start:start + SIGNATURE_CHUNK]])
+        for start in range(0, count, SIGNATURE_CHUNK)
+    ])
+    keys = _band_keys(signatures, bands)
+    codes, labels = _field_codes(jobs)
+    # Rank of each posting's normalised value per field, so a prefix variant
+    # (``sap``, ``sap deutschland``) sorts next to the value it extends.
+    ranks = np.stack([np.argsort(np.argsort(np.array(values, dtype=object)))[codes[:, index]]
+                      for index, values in enumerate(labels)], axis=1)
+
+    # Candidate pairs as ``low * count + high``, deduplicated across bands.
+    candidates = np.empty(0, dtype=np.int64)
+    for band in range(bands):
+        fields = BUCKET_ORDERS[band % len(BUCKET_ORDERS)]
+        order = np.lexsort((*(ranks[:, FIELDS.index(field)] for field in reversed(fields)), keys[:, band]))
+        band_keys = keys[order, band]
+        found = []
+        for offset in range(1, min(window, count - 1) + 1):
+            same = band_keys[offset:] == band_keys[:-offset]
+            later, earlier = order[offset:][same], order[:-offset][same]
+            found.append(np.minimum(later, earlier) * count + np.maximum(later, earlier))
+        if found:
+            # Both runs are sorted, so the stable (merge) sort is linear.
+            merged = np.sort(np.concatenate((candidates, _sorted_unique(np.concatenate(found)))), kind='stable')
+            candidates = _sorted_unique(merged, presorted=True)
+    if not len(candidates):
+        return np.arange(count, dtype=np.int64)
+    left, right = np.divmod(candidates, count)
+    agree = np.concatenate([
+        (signatures[left[start:start + PAIR_CHUNK]] == signatures[right[start:start + PAIR_CHUNK]]).mean(axis=1)
+        >= threshold
+        for start in range(0, len(left), PAIR_CHUNK)
+    ])
+    left, right = left[agree], right[agree]
+    accepted = _compatible_pairs(codes, labels, left, right)
+    return _connected_components(count, left[accepted], right[accepted])
+
+
+@dataclass
+class DuplicateCluster:
+    canonical: Job
+    members: list[Job]
+
+    @property
+    def sources(self) -> list[dict[str, Any]]:
+        return [{'id': job.get('id'), 'platform': job.get('platform'), 'applyLink': job.get('applyLink')}
+                for job in self.members]
+
+
+def _completeness(job: Mapping[str, Any]) -> tuple:
+    filled = sum(1 for value in job.values() if value not in (None, ''))
+    return -filled, -len(job.get('description') or ''), job.get('postedDate') or '', str(job.get('id'))
+
+
+def clusters(jobs: Iterable[Job], **options) -> list[DuplicateCluster]:
+    """Group postings into duplicate clusters, first-seen order."""
+    jobs = list(jobs)
+    labels = cluster_labels(jobs, **options)
+    grouped: dict[int, list[Job]] = {}
+    for job, label in zip(jobs, labels.tolist()):
+        grouped.setdefault(label, []).append(job)
+    return [DuplicateCluster(min(members, key=_completeness), members) for members in grouped.values()]
+
+
+def dedupe(jobs: Iterable[Job], **options) -> list[Job]:
+    """One canonical posting per cluster, with ``sources`` listing every copy."""
+    canonical = []
+    for cluster in clusters(jobs, **options):
+        job = dict(cluster.canonical)
+        job['sources'] = cluster.sources
+        canonical.append(job)
+    return canonical
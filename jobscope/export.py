@@ -0,0 +1,189 @@
+"""Streaming bulk export of filtered results to CSV, JSONL or Parquet.
+
+Exports walk the store in fixed-size row chunks, in storage order or
+along a ``Paginator`` sort order. Each chunk goes through the compiled row
+predicate, is written and is then dropped. Memory is bounded by
+``chunk_rows`` and does not depend on the size of the result.
+CSV is written by pyarrow's streaming CSV writer and JSONL by pandas, both
+into an optionally compressed byte stream (gzip from the standard library,
+zstd from pyarrow's codecs). Parquet is written one row group per chunk
+with the codec applied inside the file.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .pagination import Paginator
+from .store import JOB_COLUMNS, JobStore
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+EXPORT_COLUMNS = JOB_COLUMNS + ('salaryMin', 'salaryMax', 'salaryCurrency')
+CHUNK_ROWS = 65536
+JSON_SLICE_ROWS = 4096
+
+_SUFFIXES = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+@dataclass
+class ExportStats:
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def export_filename(stem: str, fmt: str, compression: Optional[str] = None) -> str:
+    """``jobs.csv.gz``-style name; Parquet compresses inside the file."""
+    suffix = _SUFFIXES[fmt]
+    if compression and fmt != 'parquet':
+        suffix += _SUFFIXES[compression]
+    return stem + suffix
+
+
+def iter_chunks(store: JobStore, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+                sort: Optional[str] = None, descending: bool = True,
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Matching rows as frames of at most ``chunk_rows`` input rows each."""
+    frame = store.frame
+    order = Paginator(store).view(sort, descending).order if sort else None
+    predicate = store.row_predicate(search_query, filters)
+    for start in range(0, len(frame), chunk_rows):
+        if order is None:
+            rows = np.arange(start, min(start + chunk_rows, len(frame)))
+        else:
+            rows = order[start:start + chunk_rows]
+        rows = rows[predicate(rows)]
+        if len(rows):
+            yield frame.iloc[rows][list(EXPORT_COLUMNS)]
+
+
+def _open_stream(path: Union[str, os.PathLike], compression: Optional[str]) -> BinaryIO:
+    if compression is None:
+        return open(path, 'wb')
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        import pyarrow as pa
+        return pa.CompressedOutputStream(str(path), 'zstd')
+    raise ValueError(f'unknown compression {compression!r}; expected one of {COMPRESSIONS}')
+
+
+def _plain_schema(schema):
+    """``schema`` with dictionary columns as plain values and dates as dates.
+
+    Categoricals arrive as dictionary arrays that carry every category in
+    the store; writers get plain values and encode each chunk themselves.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        elif field.name == 'postedDate':
+            field = field.with_type(pa.date32())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _tables(chunks: Iterator[pd.DataFrame]) -> Iterator:
+    import pyarrow as pa
+
+    schema = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        schema = schema or _plain_schema(table.schema).remove_metadata()
+        yield table.cast(schema)
+
+
+def _write_csv(chunks: Iterator[pd.DataFrame], stream: BinaryIO) -> int:
+    import pyarrow.csv as csv
+
+    rows, writer = 0, None
+    for table in _tables(chunks):
+        if writer is None:
+            writer = csv.CSVWriter(stream, table.schema)
+        writer.write_table(table)
+        rows += table.num_rows
+    if writer is not None:
+        writer.close()
+    else:
+        stream.write((','.join(f'"{column}"' for column in EXPORT_COLUMNS) + '\n').encode('utf-8'))
+    return rows
+
+
+def _write_jsonl(chunks: Iterator[pd.DataFrame], stream: BinaryIO) -> int:
+    rows = 0
+    for chunk in chunks:
+        # to_json builds the whole text of its input, so feed it slices.
+        for start in range(0, len(chunk), JSON_SLICE_ROWS):
+            part = chunk.iloc[start:start + JSON_SLICE_ROWS].copy(deep=False)
+            part['postedDate'] = part['postedDate'].dt.strftime('%Y-%m-%d')
+            part['rating'] = part['rating'].astype('float64').round(1)
+            text = part.to_json(None, orient='records', lines=True, force_ascii=False)
+            stream.write(text.encode('utf-8'))
+            if not text.endswith('\n'):
+                stream.write(b'\n')
+        rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks: Iterator[pd.DataFrame], path: Union[str, os.PathLike], compression: Optional[str]) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, writer = 0, None
+    try:
+        for table in _tables(chunks):
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), table.schema, compression=compression or 'none')
+            writer.write_table(table)
+            rows += table.num_rows
+        if writer is None:
+            empty = pa.Table.from_pandas(pd.DataFrame(columns=list(EXPORT_COLUMNS)), preserve_index=False)
+            writer = pq.ParquetWriter(str(path), empty.schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_jobs(store: JobStore, path: Union[str, os.PathLike], fmt: str = 'csv', *,
+                compression: Optional[str] = None, search_query: str = '',
+                filters: Optional[Mapping[str, str]] = None, sort: Optional[str] = None,
+                descending: bool = True, chunk_rows: int = CHUNK_ROWS) -> ExportStats:
+    """Write the filtered result set to ``path`` chunk by chunk."""
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown export format {fmt!r}; expected one of {FORMATS}')
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'unknown compression {compression!r}; expected one of {COMPRESSIONS}')
+    start = time.perf_counter()
+    chunks = iter_chunks(store, search_query, filters, sort, descending, chunk_rows)
+    if fmt == 'parquet':
+        rows = _write_parquet(chunks, path, compression)
+    else:
+        with _open_stream(path, compression) as stream:
+            rows = _write_csv(chunks, stream) if fmt == 'csv' else _write_jsonl(chunks, stream)
+    return ExportStats(rows, os.path.getsize(path), time.perf_counter() - start)
+
+
+def export_bytes(store: JobStore, fmt: str = 'csv', **options) -> bytes:
+    """A small export held in memory, e.g. for ``st.download_button``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, export_filename('jobs', fmt, options.get('compression')))
+        export_jobs(store, path, fmt, **options)
+        with open(path, 'rb') as handle:
+            return handle.read()
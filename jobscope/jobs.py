@@ -0,0 +1,160 @@
+"""Job vocabularies, the mock job generator and the dashboard filter predicate.
+
+These are direct ports of ``generateJobData`` and ``filteredJobs`` from
+``streamlit_app.py``. Job records are plain dicts that keep the same
+camelCase keys as the dashboard (``workType``, ``postedDate``, ``applyLink``).
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import string
+from datetime import date, timedelta
+from typing import Any, Mapping, Optional
+
+from .salary import SALARY_FILTER, in_salary_range, parse_salary, parse_salary_range
+
+Job = dict[str, Any]
+
+ROLES = [
+    'Customer Success Manager',
+    'Senior Customer Success Manager',
+    'Customer Success Specialist',
+    'Customer Success Director',
+    'Customer Success Associate',
+    'Scrum Master',
+    'Senior Scrum Master',
+    'Agile Coach',
+    'Scrum Project Manager',
+    'Lead Scrum Master',
+]
+
+COMPANIES = {
+    'India': ['Infosys', 'TCS', 'Wipro', 'HCL Technologies', 'Flipkart', 'Zomato', 'Paytm', 'Swiggy', 'Freshworks', "Byju's"],
+    'Singapore': ['Grab', 'Sea Limited', 'DBS Bank', 'Singtel', 'Shopee', 'Gojek', 'Revolut', 'PropertyGuru', 'Carousell', 'Stripe'],
+    'Netherlands': ['Booking.com', 'Adyen', 'Philips', 'ING', 'ASML', 'Takeaway.com', 'Coolblue', 'Exact', 'TomTom', 'Randstad'],
+    'Germany': ['SAP', 'Siemens', 'Allianz', 'BMW', 'Mercedes-Benz', 'Zalando', 'Delivery Hero', 'N26', 'Rocket Internet', 'AUTO1'],
+    'France': ['Airbus', 'Thales', 'Atos', 'Capgemini', 'Orange', 'BlaBlaCar', 'Criteo', 'Dassault Systèmes', 'Murex', 'Datadog'],
+}
+
+CITIES = {
+    'India': ['Bangalore', 'Mumbai', 'Delhi', 'Hyderabad', 'Chennai', 'Pune'],
+    'Singapore': ['Singapore'],
+    'Netherlands': ['Amsterdam', 'Rotterdam', 'Utrecht', 'The Hague'],
+    'Germany': ['Berlin', 'Munich', 'Frankfurt', 'Hamburg', 'Cologne'],
+    'France': ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nice'],
+}
+
+SALARY_RANGES = {
+    'India': ['₹15,00,000 - ₹25,00,000', '₹25,00,000 - ₹40,00,000', '₹40,00,000 - ₹60,00,000', '₹60,00,000 - ₹80,00,000', '₹80,00,000 - ₹1,20,00,000'],
+    'Singapore': ['S$80,000 - S$120,000', 'S$120,000 - S$160,000', 'S$160,000 - S$200,000', 'S$200,000 - S$250,000', 'S$250,000 - S$300,000'],
+    'Netherlands': ['€60,000 - €80,000', '€80,000 - €100,000', '€100,000 - €120,000', '€120,000 - €150,000', '€150,000 - €180,000'],
+    'Germany': ['€65,000 - €85,000', '€85,000 - €110,000', '€110,000 - €130,000', '€130,000 - €160,000', '€160,000 - €200,000'],
+    'France': ['€55,000 - €75,000', '€75,000 - €95,000', '€95,000 - €115,000', '€115,000 - €140,000', '€140,000 - €170,000'],
+}
+
+WORK_TYPES = ['Remote', 'Hybrid', 'On-site']
+EXPERIENCES = ['Entry Level', '2-3 years', '4-6 years', '7-10 years', '10+ years']
+PLATFORMS = ['LinkedIn', 'Indeed', 'Glassdoor', 'JobsDB', 'MyCareersFuture', 'Xing', 'StepStone']
+COUNTRIES = list(COMPANIES)
+
+DEFAULT_FILTERS = {
+    'role': 'all',
+    'location': 'all',
+    'workType': 'all',
+    'experience': 'all',
+    'salaryRange': 'all',
+}
+
+_SLUG_RE = re.compile(r'[^a-z0-9]')
+_BASE36 = string.digits + string.ascii_lowercase
+
+
+def slugify(text: str) -> str:
+    return _SLUG_RE.sub('-', text.lower())
+
+
+def role_family(title: str) -> Optional[str]:
+    """Return the dashboard role filter value ``title`` falls under, if any."""
+    lowered = title.lower()
+    if 'customer' in lowered:
+        return 'customer-success'
+    if 'scrum' in lowered or 'agile' in lowered:
+        return 'scrum-master'
+    return None
+
+
+def make_job(
+    rng: random.Random,
+    index: int,
+    today: date,
+    *,
+    country: Optional[str] = None,
+    role: Optional[str] = None,
+    platform: Optional[str] = None,
+) -> Job:
+    """Build one job record the same way ``generateJobData`` does."""
+    country = country or rng.choice(COUNTRIES)
+    city = rng.choice(CITIES[country])
+    company = rng.choice(COMPANIES[country])
+    role = role or rng.choice(ROLES)
+    work_type = rng.choice(WORK_TYPES)
+    experience = rng.choice(EXPERIENCES)
+    salary = rng.choice(SALARY_RANGES[country])
+    platform = platform or rng.choice(PLATFORMS)
+    rating = round(rng.random() * 2 + 3, 1)
+    posted = today - timedelta(days=rng.random() * 7)
+    focus = ('customer success and relationship management' if 'Customer' in role
+             else 'agile methodologies and team coaching')
+    suffix = ''.join(rng.choice(_BASE36) for _ in range(9))
+    return {
+        'id': f'job-{index + 1}',
+        'title': role,
+        'company': company,
+        'location': f'{city}, {country}',
+        'country': country,
+        'workType': work_type,
+        'experience': experience,
+        'salary': salary,
+        'platform': platform,
+        'rating': rating,
+        'postedDate': posted.isoformat(),
+        'description': (
+            f'We are looking for a skilled {role} to join our {work_type.lower()} team in {city}. '
+            f'The ideal candidate should have {experience.lower()} of experience and be passionate about {focus}.'
+        ),
+        'applyLink': f'https://{platform.lower().replace(" ", "", 1)}.com/jobs/{slugify(company)}-{slugify(role)}-{suffix}',
+    }
+
+
+def generate_job_data(count: int = 50, seed: Optional[int] = None, today: Optional[date] = None) -> list[Job]:
+    """Return ``count`` mock postings; pass ``seed`` for a reproducible list."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    return [make_job(rng, i, today) for i in range(count)]
+
+
+def matches_filters(job: Mapping[str, Any], search_query: str = '', filters: Optional[Mapping[str, str]] = None) -> bool:
+    """The ``filteredJobs`` predicate: substring search plus facet filters.
+
+    ``salaryRange`` is applied too (see ``jobscope.salary.parse_salary_range``);
+    ``filteredJobs`` declares it but never reads it.
+    """
+    filters = filters or DEFAULT_FILTERS
+    query = search_query.lower()
+    matches_search = (query in job['title'].lower()
+                      or query in job['company'].lower()
+                      or query in job['location'].lower())
+    role = filters.get('role', 'all')
+    matches_role = role == 'all' or role_family(job['title']) == role
+    location = filters.get('location', 'all')
+    work_type = filters.get('workType', 'all')
+    experience = filters.get('experience', 'all')
+    salary_range = filters.get(SALARY_FILTER, 'all')
+    return (matches_search and matches_role
+            and (location == 'all' or job['country'] == location)
+            and (work_type == 'all' or job['workType'] == work_type)
+            and (experience == 'all' or job['experience'] == experience)
+            and (salary_range == 'all'
+                 or in_salary_range(parse_salary(job.get('salary')), parse_salary_range(salary_range))))
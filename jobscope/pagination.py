@@ -0,0 +1,185 @@
+"""Cursor-based pages over the filtered, sorted job list.
+
+The dashboard only shows one page of cards at a time, so nothing should
+filter and sort the whole corpus before the first card can render. For
+each sort key ``Paginator`` builds a total order over the store once per
+store version: key first, job id second, missing keys last. A page then
+walks that order from the cursor position in growing chunks, tests each
+chunk against the compiled row predicate and stops when the page is full.
+First-page latency depends on the page size and the query's selectivity,
+not on the corpus size.
+
+Cursors are opaque strings holding the last row's sort key and job id, so
+they stay valid when postings are added or removed between requests.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import functools
+import itertools
+import json
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .jobs import Job
+from .salary import base_midpoints
+from .store import TEXT_DTYPE, JobStore
+
+SORT_FIELDS = ('postedDate', 'rating', 'salary')
+FIRST_CHUNK = 256
+MAX_CHUNK = 1 << 16
+
+
+@dataclass(frozen=True)
+class SortedView:
+    order: np.ndarray        # row positions in display order
+    keys: np.ndarray         # directional sort key per position, ascending
+    id_ranks: np.ndarray     # rank of each position's job id, ascending within equal keys
+    row_ids: Any             # the store's id column, in row order
+    sorted_ids: Any = None   # every job id sorted, when loaded with the view
+
+    @functools.cached_property
+    def ids(self) -> Any:
+        """Every job id, sorted; maps a cursor id to its rank.
+
+        Only cursors need it, so it is built on the first one rather than
+        with the view. A view loaded from a snapshot brings its own, which
+        stays in the shared mapping instead of becoming per-process objects.
+        """
+        if self.sorted_ids is not None:
+            return self.sorted_ids
+        ids = np.empty(int(self.id_ranks.max()) + 1 if len(self.id_ranks) else 0, dtype=object)
+        ids[self.id_ranks] = np.asarray(self.row_ids.take(self.order), dtype=object)
+        return ids
+
+
+@dataclass
+class ResultPage:
+    jobs: list[Job]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+
+
+def encode_cursor(sort: str, descending: bool, key: float, job_id: str) -> str:
+    payload = json.dumps([sort, descending, None if math.isinf(key) else key, job_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[str, bool, float, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort, descending, key, job_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f'malformed cursor {cursor!r}') from exc
+    return sort, bool(descending), math.inf if key is None else float(key), str(job_id)
+
+
+def sort_key(frame: pd.DataFrame, sort: str) -> np.ndarray:
+    """Raw float64 sort key column for ``sort``; NaN where unknown."""
+    if sort == 'postedDate':
+        posted = frame['postedDate']
+        values = posted.to_numpy(dtype='datetime64[s]').astype('int64').astype('float64')
+        values[posted.isna().to_numpy()] = np.nan
+        return values
+    if sort == 'rating':
+        return frame['rating'].to_numpy(dtype='float64', copy=True)
+    if sort == 'salary':
+        return base_midpoints(frame).to_numpy(dtype='float64')
+    raise ValueError(f'cannot sort by {sort!r}; expected one of {SORT_FIELDS}')
+
+
+class Paginator:
+    """Lazily produced, cursor-addressed result pages over a ``JobStore``."""
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._views: dict[tuple[int, str, bool], SortedView] = {}
+        self._lock = threading.Lock()
+
+    def view(self, sort: str = 'postedDate', descending: bool = True) -> SortedView:
+        """The total order for ``sort``, built once per store version."""
+        cache_key = (self.store.version, sort, descending)
+        with self._lock:
+            view = self._views.get(cache_key)
+            if view is None:
+                self._views = {key: value for key, value in self._views.items() if key[0] == self.store.version}
+                view = self._views[cache_key] = self._build_view(sort, descending)
+            return view
+
+    def add_view(self, sort: str, descending: bool, view: SortedView) -> None:
+        """Install a view built elsewhere (see ``jobscope.snapshot``) for the current store version."""
+        with self._lock:
+            self._views[self.store.version, sort, descending] = view
+
+    def _build_view(self, sort: str, descending: bool) -> SortedView:
+        frame = self.store.frame
+        keys = -sort_key(frame, sort) if descending else sort_key(frame, sort).copy()
+        keys[np.isnan(keys)] = np.inf
+        ranks, _ = pd.factorize(frame['id'].astype(TEXT_DTYPE), sort=True)
+        order = np.lexsort((ranks, keys))
+        return SortedView(order, keys[order], ranks[order], frame['id'])
+
+    def _start(self, view: SortedView, key: float, job_id: str) -> int:
+        """Position of the first row strictly after ``(key, job_id)``."""
+        low = int(np.searchsorted(view.keys, key, side='left'))
+        high = int(np.searchsorted(view.keys, key, side='right'))
+        rank = bisect.bisect_left(view.ids, job_id)
+        side = 'right' if rank < len(view.ids) and view.ids[rank] == job_id else 'left'
+        return low + int(np.searchsorted(view.id_ranks[low:high], rank, side=side))
+
+    def iter_rows(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+                  sort: str = 'postedDate', descending: bool = True,
+                  cursor: Optional[str] = None) -> Iterator[int]:
+        """Matching row positions in display order, starting after ``cursor``."""
+        view = self.view(sort, descending)
+        position = 0
+        if cursor is not None:
+            cursor_sort, cursor_descending, key, job_id = decode_cursor(cursor)
+            if (cursor_sort, cursor_descending) != (sort, descending):
+                raise ValueError('cursor belongs to a different sort order')
+            position = self._start(view, key, job_id)
+        predicate = self.store.row_predicate(search_query, filters)
+        chunk = FIRST_CHUNK
+        while position < len(view.order):
+            rows = view.order[position:position + chunk]
+            yield from rows[predicate(rows)].tolist()
+            position += chunk
+            chunk = min(chunk * 2, MAX_CHUNK)
+
+    def iter_jobs(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+                  sort: str = 'postedDate', descending: bool = True, batch: int = 256) -> Iterator[Job]:
+        """Every matching job in display order, converted ``batch`` rows at a time."""
+        frame = self.store.frame
+        rows = self.iter_rows(search_query, filters, sort, descending)
+        while True:
+            chunk = list(itertools.islice(rows, batch))
+            if not chunk:
+                return
+            yield from JobStore.to_jobs(frame.iloc[chunk])
+
+    def count(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None) -> int:
+        """Number of matches, counted on the row mask without building rows."""
+        return int(np.count_nonzero(self.store.row_predicate(search_query, filters)()))
+
+    def page(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+             sort: str = 'postedDate', descending: bool = True, cursor: Optional[str] = None,
+             limit: int = 20, with_total: bool = False) -> ResultPage:
+        rows = list(itertools.islice(self.iter_rows(search_query, filters, sort, descending, cursor), limit + 1))
+        more = len(rows) > limit
+        rows = rows[:limit]
+        frame = self.store.frame
+        jobs = JobStore.to_jobs(frame.iloc[rows])
+        next_cursor = None
+        if more:
+            key = sort_key(frame.iloc[rows[-1:]], sort)[0]
+            key = -key if descending else key
+            next_cursor = encode_cursor(sort, descending, math.inf if math.isnan(key) else float(key), jobs[-1]['id'])
+        total = self.count(search_query, filters) if with_total else None
+        return ResultPage(jobs, next_cursor, total)
@@ -0,0 +1,176 @@
+"""Parallel parsing of fetched pages on a process pool.
+
+Fetching is I/O-bound and runs on the crawler's threads. Building job
+records from HTML is CPU-bound and holds the GIL, so ``ParseStage`` moves
+it to worker processes. Pages from the crawler pass through a bounded
+queue, which back-pressures fetching when parsing falls behind. They are
+shipped to the pool in small batches, and only ``(html, platform)`` goes
+out. What comes back is plain ``RECORD_FIELDS`` tuples, never soup objects,
+so both directions pickle cheaply. With ``workers=0`` pages are parsed
+inline in the calling thread.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from .jobs import Job
+from .parser import HTML_PARSER, parse_listing_records, record_to_job
+from .scraper import Page
+from .telemetry import count, observe, span
+
+QUEUE_PAGES = 64
+BATCH_PAGES = 4
+POLL_SECONDS = 0.01
+
+_DONE = object()
+
+
+@dataclass
+class ParsedPage:
+    page: Page
+    jobs: list[Job]
+
+
+def _parse_batch(batch: list[tuple[str, Optional[str]]], parser: str) -> tuple[list[list[tuple]], float]:
+    """Records per page, plus the seconds the worker spent parsing them."""
+    start = time.perf_counter()
+    return [parse_listing_records(text, platform, parser) for text, platform in batch], time.perf_counter() - start
+
+
+class ParseStage:
+    """Fan pages out to a process pool behind a bounded queue.
+
+    Used as a context manager, one pool serves every ``run`` until exit;
+    otherwise each ``run`` opens its own and shuts it down when it ends.
+    """
+
+    def __init__(self, workers: Optional[int] = None, *, queue_pages: int = QUEUE_PAGES,
+                 batch_pages: int = BATCH_PAGES, parser: str = HTML_PARSER):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_pages = queue_pages
+        self.batch_pages = batch_pages
+        self.parser = parser
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParseStage':
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _feed(self, pages: Iterable[Page], inbox: queue.Queue, stop: threading.Event) -> None:
+        try:
+            for page in pages:
+                while not stop.is_set():
+                    try:
+                        inbox.put(page, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as exc:  # surfaced to the consumer
+            inbox.put(exc)
+        finally:
+            inbox.put(_DONE)
+
+    def _next_batch(self, inbox: queue.Queue, held: list, block: bool) -> Any:
+        """Up to ``batch_pages`` queued pages, ``None`` if none are ready, or ``_DONE``.
+
+        ``held`` carries an end marker or feeder error seen mid-batch over to
+        the next call.
+        """
+        batch: list[Page] = []
+        while len(batch) < self.batch_pages:
+            if held:
+                item = held.pop()
+            else:
+                try:
+                    item = inbox.get(block=block and not batch)
+                except queue.Empty:
+                    break
+            if item is _DONE or isinstance(item, BaseException):
+                if batch:
+                    held.append(item)
+                    break
+                if item is _DONE:
+                    return _DONE
+                raise item
+            batch.append(item)
+        return batch or None
+
+    def run(self, pages: Iterable[Page]) -> Iterator[ParsedPage]:
+        """Parse successful pages, yielding them in completion order."""
+        pages = (page for page in pages if page.ok)
+        if not self.workers:
+            for page in pages:
+                with span('parse.page'):
+                    records = parse_listing_records(page.text, page.task.platform, self.parser)
+                count('parse.pages')
+                count('parse.jobs', len(records))
+                yield ParsedPage(page, [record_to_job(record) for record in records])
+            return
+        # A pool opened here, rather than by ``with``, is shut down when the run ends.
+        owns_pool = self._pool is None
+        self.__enter__()
+        inbox: queue.Queue = queue.Queue(self.queue_pages)
+        stop = threading.Event()
+        feeder = threading.Thread(target=self._feed, args=(pages, inbox, stop), name='parse-feed', daemon=True)
+        feeder.start()
+        pending: deque[tuple[Future, list[Page]]] = deque()
+        held: list = []
+        limit = 2 * self.workers
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < limit:
+                    # Only block on the queue when nothing is being parsed.
+                    batch = self._next_batch(inbox, held, block=not pending)
+                    if batch is _DONE:
+                        exhausted = True
+                    elif batch is None:
+                        break
+                    else:
+                        payload = [(page.text, page.task.platform) for page in batch]
+                        pending.append((self._pool.submit(_parse_batch, payload, self.parser), batch))
+                if not pending:
+                    return
+                timeout = None if exhausted or len(pending) >= limit else POLL_SECONDS
+                done, _ = wait([future for future, _ in pending], timeout, FIRST_COMPLETED)
+                for entry in [entry for entry in pending if entry[0] in done]:
+                    pending.remove(entry)
+                    future, batch = entry
+                    parsed, seconds = future.result()
+                    # Worker time only: queueing and pickling are not parse cost.
+                    for _ in batch:
+                        observe('parse.page', seconds / len(batch))
+                    count('parse.pages', len(batch))
+                    count('parse.jobs', sum(len(records) for records in parsed))
+                    for page, records in zip(batch, parsed):
+                        yield ParsedPage(page, [record_to_job(record) for record in records])
+        finally:
+            stop.set()
+            for future, _ in pending:
+                future.cancel()
+            while feeder.is_alive():
+                try:
+                    inbox.get_nowait()
+                except queue.Empty:
+                    feeder.join(0.05)
+            if owns_pool:
+                self.close()
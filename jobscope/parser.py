@@ -0,0 +1,80 @@
+"""Extract job records from listing page HTML.
+
+BeautifulSoup runs on ``lxml`` when it is installed and falls back to the
+standard library's ``html.parser`` otherwise. Both are imported on the first
+parse rather than with this module. ``parse_listing_records``
+returns plain tuples in ``RECORD_FIELDS`` order, which is what the process
+pool in ``jobscope.parse_stage`` ships between processes.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import Any, Optional
+
+from .jobs import Job
+
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# Job record key -> CSS class of the element holding its text.
+CARD_FIELDS = {
+    'title': 'job-title',
+    'company': 'company',
+    'location': 'location',
+    'salary': 'salary',
+    'workType': 'work-type',
+    'experience': 'experience',
+    'description': 'description',
+}
+
+RECORD_FIELDS = ('id', *CARD_FIELDS, 'country', 'platform', 'rating', 'postedDate', 'applyLink')
+
+
+def _first_by_class(card) -> dict[str, Any]:
+    """First descendant of ``card`` carrying each class, in document order.
+
+    One walk over the card instead of a ``find`` per field.
+    """
+    found: dict[str, Any] = {}
+    for element in card.find_all(True):
+        if element.name == 'time':
+            found.setdefault('<time>', element)
+        for css_class in element.get('class') or ():
+            found.setdefault(css_class, element)
+    return found
+
+
+def parse_listing_records(html: str, platform: Optional[str] = None,
+                          parser: str = HTML_PARSER) -> list[tuple]:
+    """One ``RECORD_FIELDS`` tuple per ``li.job-card`` in ``html``."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, parser)
+    if platform is None:
+        job_list = soup.find(class_='job-list')
+        platform = job_list.get('data-platform', '') if job_list is not None else ''
+    records = []
+    for card in soup.find_all('li', class_='job-card'):
+        found = _first_by_class(card)
+        fields = [found[css_class].get_text(strip=True) if css_class in found else ''
+                  for css_class in CARD_FIELDS.values()]
+        location = fields[2]
+        try:
+            rating = float(found['rating'].get_text(strip=True) if 'rating' in found else '')
+        except ValueError:
+            rating = None
+        posted = found.get('<time>')
+        link = found.get('apply')
+        apply_link = link.get('href', '') if link is not None and link.name == 'a' else ''
+        records.append((card.get('data-job-id', '') or apply_link, *fields, location.rsplit(', ', 1)[-1],
+                        platform, rating, posted.get('datetime', '') if posted is not None else '', apply_link))
+    return records
+
+
+def record_to_job(record: tuple) -> Job:
+    return dict(zip(RECORD_FIELDS, record))
+
+
+def parse_listing_page(html: str, platform: Optional[str] = None, parser: str = HTML_PARSER) -> list[Job]:
+    """Return one job record per ``li.job-card`` in ``html``."""
+    return [record_to_job(record) for record in parse_listing_records(html, platform, parser)]
@@ -0,0 +1,450 @@
+"""SQLite persistence for users, saved jobs and tracked applications.
+
+Saved jobs and applications reference postings by ``job_id`` instead of
+embedding a copy of the job. ``(user_id, job_id)`` is the primary key of
+``saved_jobs``. Applications are indexed on ``(user_id, job_id)``,
+``(user_id, status, applied_date)`` and ``(user_id, applied_date)``, so
+saving, de-duplicating and listing are B-tree lookups whose cost depends on
+the user's own rows, not on the table size. The database runs in WAL mode, so dashboard reads don't block
+writers, and the bulk methods write a whole batch in one transaction.
+
+Every status an application takes, starting with the one it was tracked
+with, is also appended to ``application_events``. Rows there are never
+updated, so ``application_events(after=...)`` can be tailed by event id;
+``jobscope.pipeline`` builds its funnels that way.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+from .telemetry import TELEMETRY
+
+# Statements take a few to tens of microseconds and timing one costs about
+# one, so a random TIMING_SHARE of transactions and queries is timed. The
+# quantiles stay unbiased; the histogram counts are a sample.
+TIMING_SHARE = 1 / 8
+_TRANSACTIONS = TELEMETRY.histogram('persistence.transaction')
+_QUERIES = TELEMETRY.histogram('persistence.query')
+
+# Searches per day for each subscription, as set by handleLogin/handleRegister.
+PLANS = {
+    'free': 10,
+    'premium': 1000,
+    'enterprise': None,
+}
+
+APPLICATION_STATUSES = ('applied', 'interviewing', 'offer', 'rejected', 'withdrawn')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    subscription TEXT NOT NULL DEFAULT 'free',
+    searches_used INTEGER NOT NULL DEFAULT 0,
+    join_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS saved_jobs (
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    job_id TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, job_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    job_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    applied_date TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS applications_user_job ON applications (user_id, job_id);
+CREATE INDEX IF NOT EXISTS applications_user_status_date ON applications (user_id, status, applied_date);
+CREATE INDEX IF NOT EXISTS applications_user_date ON applications (user_id, applied_date);
+CREATE TABLE IF NOT EXISTS application_events (
+    id INTEGER PRIMARY KEY,
+    application_id INTEGER NOT NULL REFERENCES applications (id),
+    status TEXT NOT NULL,
+    at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS application_events_application ON application_events (application_id, id);
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    query TEXT NOT NULL DEFAULT '',
+    filters TEXT NOT NULL DEFAULT '{}',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS saved_searches_user ON saved_searches (user_id);
+CREATE TABLE IF NOT EXISTS search_quotas (
+    user_id INTEGER PRIMARY KEY REFERENCES users (id),
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+'''
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+@dataclass(frozen=True)
+class User:
+    id: int
+    email: str
+    subscription: str
+    searches_used: int
+    join_date: str
+
+    @property
+    def search_limit(self) -> Optional[int]:
+        return PLANS.get(self.subscription)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The ``user`` object shape the dashboard renders."""
+        return {
+            'email': self.email,
+            'subscription': self.subscription,
+            'searchesUsed': self.searches_used,
+            'searchLimit': self.search_limit,
+            'joinDate': self.join_date,
+        }
+
+
+@dataclass(frozen=True)
+class Application:
+    id: int
+    user_id: int
+    job_id: str
+    status: str
+    applied_date: str
+    notes: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'id': f'app-{self.id}',
+            'jobId': self.job_id,
+            'status': self.status,
+            'appliedDate': self.applied_date,
+            'notes': self.notes,
+        }
+
+
+@dataclass(frozen=True)
+class ApplicationEvent:
+    id: int
+    application_id: int
+    job_id: str
+    status: str
+    at: str
+
+
+@dataclass(frozen=True)
+class SavedSearch:
+    id: int
+    user_id: int
+    query: str
+    filters: Mapping[str, str]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'id': self.id, 'searchQuery': self.query, 'filters': dict(self.filters)}
+
+
+def _active_filters(filters: Optional[Mapping[str, str]]) -> dict[str, str]:
+    return {key: value for key, value in sorted((filters or {}).items()) if value != 'all'}
+
+
+class UserDataStore:
+    """Users, saved jobs and applications in one SQLite database."""
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('PRAGMA foreign_keys=ON')
+        self._db.executescript(SCHEMA)
+        self._depth = 0
+        self._backfill_events()
+
+    def _backfill_events(self) -> None:
+        """Give applications tracked before the event log one event for their current status."""
+        with self.transaction() as db:
+            if db.execute('SELECT 1 FROM application_events LIMIT 1').fetchone() is None:
+                db.execute('INSERT INTO application_events (application_id, status, at) '
+                           'SELECT id, status, applied_date FROM applications ORDER BY id')
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one transaction; nested blocks join the outer one."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._db
+                finally:
+                    self._depth -= 1
+                return
+            timed = TELEMETRY.sampled(TIMING_SHARE)
+            start = time.perf_counter() if timed else 0.0
+            self._db.execute('BEGIN IMMEDIATE')
+            self._depth = 1
+            try:
+                yield self._db
+            except BaseException:
+                self._depth = 0
+                self._db.execute('ROLLBACK')
+                raise
+            self._depth = 0
+            self._db.execute('COMMIT')
+            if timed:
+                _TRANSACTIONS.observe(time.perf_counter() - start)
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> list[tuple]:
+        with self._lock:
+            if not TELEMETRY.sampled(TIMING_SHARE):
+                return self._db.execute(sql, tuple(params)).fetchall()
+            start = time.perf_counter()
+            rows = self._db.execute(sql, tuple(params)).fetchall()
+            _QUERIES.observe(time.perf_counter() - start)
+            return rows
+
+    # Users
+
+    def create_user(self, email: str, subscription: str = 'free', join_date: Optional[str] = None) -> User:
+        if subscription not in PLANS:
+            raise ValueError(f'unknown subscription {subscription!r}')
+        with self.transaction() as db:
+            db.execute('INSERT INTO users (email, subscription, join_date) VALUES (?, ?, ?)',
+                       (email, subscription, join_date or date.today().isoformat()))
+        return self.get_user(email)
+
+    def get_user(self, email: str) -> Optional[User]:
+        rows = self._query('SELECT id, email, subscription, searches_used, join_date FROM users WHERE email = ?',
+                           (email,))
+        return User(*rows[0]) if rows else None
+
+    def get_or_create_user(self, email: str, subscription: str = 'free') -> User:
+        return self.get_user(email) or self.create_user(email, subscription)
+
+    def set_subscription(self, user_id: int, subscription: str) -> None:
+        if subscription not in PLANS:
+            raise ValueError(f'unknown subscription {subscription!r}')
+        with self.transaction() as db:
+            db.execute('UPDATE users SET subscription = ? WHERE id = ?', (subscription, user_id))
+
+    def add_searches(self, counts: Iterable[tuple[int, int]]) -> None:
+        """Add ``(user_id, searches)`` increments in one batch."""
+        with self.transaction() as db:
+            db.executemany('UPDATE users SET searches_used = searches_used + ? WHERE id = ?',
+                           [(searches, user_id) for user_id, searches in counts])
+
+    def search_quota(self, user_id: int) -> Optional[tuple[float, float]]:
+        """The user's shared quota bucket as ``(tokens, updated)``, if one was saved."""
+        rows = self._query('SELECT tokens, updated FROM search_quotas WHERE user_id = ?', (user_id,))
+        return rows[0] if rows else None
+
+    def spend_searches(self, spends: Iterable[tuple[int, int, Optional[float], float]],
+                       now: float) -> dict[int, float]:
+        """Take ``(user_id, searches, capacity, rate)`` spends out of the shared buckets.
+
+        Each bucket is refilled up to ``now`` first; one without a row starts
+        full, and a ``None`` capacity (unlimited plan) has no bucket. All
+        searches are added to ``searches_used`` in the same transaction.
+        Returns the new levels, which go negative when workers together
+        accepted more than was left.
+        """
+        spends = list(spends)
+        levels = {}
+        with self.transaction() as db:
+            for user_id, searches, capacity, rate in spends:
+                if capacity is None:
+                    continue
+                row = db.execute('SELECT tokens, updated FROM search_quotas WHERE user_id = ?',
+                                 (user_id,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                levels[user_id] = tokens - searches
+            db.executemany('INSERT INTO search_quotas (user_id, tokens, updated) VALUES (?, ?, ?) '
+                           'ON CONFLICT (user_id) DO UPDATE SET tokens = excluded.tokens, '
+                           'updated = max(updated, excluded.updated)',
+                           [(user_id, tokens, now) for user_id, tokens in levels.items()])
+            self.add_searches((user_id, searches) for user_id, searches, _, _ in spends)
+        return levels
+
+    # Saved jobs
+
+    def save_job(self, user_id: int, job_id: str) -> bool:
+        """Save ``job_id`` for the user; ``False`` if it was already saved."""
+        with self.transaction() as db:
+            return db.execute('INSERT OR IGNORE INTO saved_jobs (user_id, job_id, saved_at) VALUES (?, ?, ?)',
+                              (user_id, job_id, _now())).rowcount == 1
+
+    def save_jobs(self, user_id: int, job_ids: Iterable[str]) -> None:
+        now = _now()
+        with self.transaction() as db:
+            db.executemany('INSERT OR IGNORE INTO saved_jobs (user_id, job_id, saved_at) VALUES (?, ?, ?)',
+                           [(user_id, job_id, now) for job_id in job_ids])
+
+    def unsave_job(self, user_id: int, job_id: str) -> bool:
+        with self.transaction() as db:
+            return db.execute('DELETE FROM saved_jobs WHERE user_id = ? AND job_id = ?',
+                              (user_id, job_id)).rowcount == 1
+
+    def is_saved(self, user_id: int, job_id: str) -> bool:
+        return bool(self._query('SELECT 1 FROM saved_jobs WHERE user_id = ? AND job_id = ?', (user_id, job_id)))
+
+    def saved_job_ids(self, user_id: int, limit: int = 50, after: Optional[str] = None) -> list[str]:
+        """Saved job ids in ``job_id`` order, ``limit`` at a time after ``after``."""
+        rows = self._query('SELECT job_id FROM saved_jobs WHERE user_id = ? AND job_id > ? ORDER BY job_id LIMIT ?',
+                           (user_id, after or '', limit))
+        return [row[0] for row in rows]
+
+    def saved_count(self, user_id: int) -> int:
+        return self._query('SELECT count(*) FROM saved_jobs WHERE user_id = ?', (user_id,))[0][0]
+
+    # Applications
+
+    def track_application(self, user_id: int, job_id: str, status: str = 'applied',
+                          applied_date: Optional[str] = None, notes: str = '') -> int:
+        return self.track_applications([(user_id, job_id, status, applied_date, notes)])[0]
+
+    def track_applications(self, rows: Iterable[tuple]) -> list[int]:
+        """Insert ``(user_id, job_id, status, applied_date, notes)`` rows in one transaction."""
+        today = date.today().isoformat()
+        ids = []
+        with self.transaction() as db:
+            for user_id, job_id, status, applied_date, notes in rows:
+                if status not in APPLICATION_STATUSES:
+                    raise ValueError(f'unknown application status {status!r}')
+                applied_date = applied_date or today
+                cursor = db.execute(
+                    'INSERT INTO applications (user_id, job_id, status, applied_date, notes) VALUES (?, ?, ?, ?, ?)',
+                    (user_id, job_id, status, applied_date, notes or ''))
+                ids.append(cursor.lastrowid)
+                db.execute('INSERT INTO application_events (application_id, status, at) VALUES (?, ?, ?)',
+                           (cursor.lastrowid, status, applied_date))
+        return ids
+
+    def update_application(self, application_id: int, status: Optional[str] = None,
+                           notes: Optional[str] = None, at: Optional[str] = None) -> bool:
+        """Change the status and/or notes; a status change is logged as of ``at`` (default now)."""
+        if status is not None and status not in APPLICATION_STATUSES:
+            raise ValueError(f'unknown application status {status!r}')
+        with self.transaction() as db:
+            found = db.execute('UPDATE applications SET notes = coalesce(?, notes) WHERE id = ?',
+                               (notes, application_id)).rowcount == 1
+            if found and status is not None:
+                self.update_statuses([(application_id, status, at)])
+            return found
+
+    def update_statuses(self, changes: Iterable[tuple[int, str, Optional[str]]]) -> int:
+        """Apply ``(application_id, status, at)`` changes in one transaction.
+
+        Returns how many changed an application's status; a change to the
+        status it already has, or to an unknown application, is skipped
+        and not logged.
+        """
+        now = None
+        changed = 0
+        with self.transaction() as db:
+            for application_id, status, at in changes:
+                if status not in APPLICATION_STATUSES:
+                    raise ValueError(f'unknown application status {status!r}')
+                if not db.execute('UPDATE applications SET status = ? WHERE id = ? AND status != ?',
+                                  (status, application_id, status)).rowcount:
+                    continue
+                if at is None:
+                    now = now or _now()
+                db.execute('INSERT INTO application_events (application_id, status, at) VALUES (?, ?, ?)',
+                           (application_id, status, at or now))
+                changed += 1
+        return changed
+
+    def get_application(self, application_id: int) -> Optional[Application]:
+        rows = self._query('SELECT id, user_id, job_id, status, applied_date, notes FROM applications WHERE id = ?',
+                           (application_id,))
+        return Application(*rows[0]) if rows else None
+
+    def applications_for_job(self, user_id: int, job_id: str) -> list[Application]:
+        rows = self._query('SELECT id, user_id, job_id, status, applied_date, notes FROM applications '
+                           'WHERE user_id = ? AND job_id = ?', (user_id, job_id))
+        return [Application(*row) for row in rows]
+
+    def applications(self, user_id: int, status: Optional[str] = None, limit: int = 50,
+                     before: Optional[str] = None) -> list[Application]:
+        """Most recent applications first; pass ``status`` to use the status index."""
+        sql = 'SELECT id, user_id, job_id, status, applied_date, notes FROM applications WHERE user_id = ?'
+        params: list[Any] = [user_id]
+        if status is not None:
+            sql += ' AND status = ?'
+            params.append(status)
+        if before is not None:
+            sql += ' AND applied_date < ?'
+            params.append(before)
+        sql += ' ORDER BY applied_date DESC, id DESC LIMIT ?'
+        params.append(limit)
+        return [Application(*row) for row in self._query(sql, params)]
+
+    def application_events(self, after: int = 0, limit: Optional[int] = None,
+                           application_id: Optional[int] = None) -> list[ApplicationEvent]:
+        """Logged status events with ids above ``after``, oldest first.
+
+        Pass the last id seen as ``after`` to read only what was appended
+        since, or ``application_id`` for one application's history.
+        """
+        sql = ('SELECT e.id, e.application_id, a.job_id, e.status, e.at FROM application_events e '
+               'JOIN applications a ON a.id = e.application_id WHERE e.id > ?')
+        params: list[Any] = [after]
+        if application_id is not None:
+            sql += ' AND e.application_id = ?'
+            params.append(application_id)
+        sql += ' ORDER BY e.id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [ApplicationEvent(*row) for row in self._query(sql, params)]
+
+    def application_count(self, user_id: int, status: Optional[str] = None) -> int:
+        if status is None:
+            return self._query('SELECT count(*) FROM applications WHERE user_id = ?', (user_id,))[0][0]
+        return self._query('SELECT count(*) FROM applications WHERE user_id = ? AND status = ?',
+                           (user_id, status))[0][0]
+
+    # Saved searches
+
+    def save_search(self, user_id: int, query: str = '', filters: Optional[Mapping[str, str]] = None) -> SavedSearch:
+        """Store a search box value and filter set for alerts."""
+        active = _active_filters(filters)
+        with self.transaction() as db:
+            search_id = db.execute('INSERT INTO saved_searches (user_id, query, filters, created_at) VALUES (?, ?, ?, ?)',
+                                   (user_id, query, json.dumps(active), _now())).lastrowid
+        return SavedSearch(search_id, user_id, query, active)
+
+    def delete_search(self, search_id: int) -> bool:
+        with self.transaction() as db:
+            return db.execute('DELETE FROM saved_searches WHERE id = ?', (search_id,)).rowcount == 1
+
+    def saved_searches(self, user_id: Optional[int] = None) -> list[SavedSearch]:
+        """One user's saved searches, or everyone's when ``user_id`` is omitted."""
+        sql = 'SELECT id, user_id, query, filters FROM saved_searches'
+        params: tuple = ()
+        if user_id is not None:
+            sql += ' WHERE user_id = ?'
+            params = (user_id,)
+        return [SavedSearch(search_id, owner, query, json.loads(filters))
+                for search_id, owner, query, filters in self._query(sql + ' ORDER BY id', params)]
+
+    def query_plan(self, sql: str, params: Iterable[Any] = ()) -> list[str]:
+        return [row[-1] for row in self._query(f'EXPLAIN QUERY PLAN {sql}', params)]
@@ -0,0 +1,249 @@
+"""Recruiting-pipeline analytics over the application status log.
+
+``UserDataStore`` appends every status an application takes to
+``application_events``. ``PipelineAnalytics`` folds those events into
+running aggregates as they arrive, so the dashboard's funnel and
+time-in-stage panels are lookups rather than scans over the applications.
+
+Aggregates are kept per cell for every combination of company, role family
+and country, including the partial ones ("all roles at Grab in
+Singapore", "everything in India", the overall total), so one event updates
+eight cells and any filter combination is one dict lookup. Each cell
+holds:
+
+* ``reached`` – applications that got at least as far as each ``FUNNEL``
+  stage. The funnel is monotone, so an application tracked straight as
+  ``offer`` has also reached ``interviewing``;
+* ``current`` – applications in each status right now;
+* time-in-stage per status: a count, a sum of days and a histogram over
+  ``STAGE_BUCKETS``, filled when an application leaves that status.
+
+Per application only its status, when it entered it, the stages it reached
+and its eight cells are kept, and each posting's cells are looked up once.
+``sync`` tails the log by event id, so keeping up costs work proportional
+to the new events. Rebuilding is a replay of the log from event 0.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from .jobs import role_family
+from .persistence import APPLICATION_STATUSES, ApplicationEvent, UserDataStore
+from .telemetry import count, span
+
+FUNNEL = ('applied', 'interviewing', 'offer')
+DIMENSIONS = ('company', 'role', 'country')
+# Upper bounds, in days, of the time-in-stage histogram buckets.
+STAGE_BUCKETS = (1, 2, 3, 5, 7, 10, 14, 21, 30, 45, 60, 90, math.inf)
+# Every subset of DIMENSIONS, as a mask over them.
+GROUPINGS = tuple(itertools.product((False, True), repeat=len(DIMENSIONS)))
+
+_STATUS = {status: index for index, status in enumerate(APPLICATION_STATUSES)}
+# Funnel stages each status implies having reached, as a bit mask.
+_REACHES = {status: (1 << FUNNEL.index(status) + 1) - 1 if status in FUNNEL else 1
+            for status in APPLICATION_STATUSES}
+# Funnel stage indexes set in each mask.
+_STAGES = tuple(tuple(stage for stage in range(len(FUNNEL)) if mask >> stage & 1)
+                for mask in range(1 << len(FUNNEL)))
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def event_day(at: str) -> float:
+    """Days since 1970-01-01 (UTC) for an ISO date or timestamp."""
+    if len(at) == 10:
+        return date.fromisoformat(at).toordinal() - _EPOCH
+    moment = datetime.fromisoformat(at)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() / 86400
+
+
+def _bucket(days: float) -> int:
+    for index, bound in enumerate(STAGE_BUCKETS):
+        if days <= bound:
+            return index
+    return len(STAGE_BUCKETS) - 1
+
+
+class _Cell:
+    __slots__ = ('applications', 'reached', 'current', 'stage_count', 'stage_days', 'stage_buckets')
+
+    def __init__(self):
+        self.applications = 0
+        self.reached = [0] * len(FUNNEL)
+        self.current = [0] * len(APPLICATION_STATUSES)
+        self.stage_count = [0] * len(APPLICATION_STATUSES)
+        self.stage_days = [0.0] * len(APPLICATION_STATUSES)
+        self.stage_buckets = [[0] * len(STAGE_BUCKETS) for _ in APPLICATION_STATUSES]
+
+
+class PipelineAnalytics:
+    """Funnel and time-in-stage aggregates, maintained one status event at a time.
+
+    ``jobs`` looks a posting up by id (``JobSearchIndex.get`` or a dict's
+    ``get``) to place an application by company, role and country; without
+    it, or for postings it does not know, those are ``None``.
+    """
+
+    def __init__(self, jobs: Optional[Callable[[str], Optional[Mapping[str, Any]]]] = None):
+        self.jobs = jobs
+        # Last event id folded in; ``sync`` continues after it.
+        self.last_event = 0
+        self._groups: dict[tuple[bool, ...], dict[tuple, _Cell]] = {grouping: {} for grouping in GROUPINGS}
+        # application id -> [status index, day it entered it, reached mask, cells]
+        self._applications: dict[int, list] = {}
+        # job id -> its cells; a posting's company, role and country don't change.
+        self._job_cells: dict[str, tuple[_Cell, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._applications)
+
+    def dimensions(self, job_id: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
+        job = self.jobs(job_id) if self.jobs is not None else None
+        if job is None:
+            return None, None, None
+        return job.get('company'), role_family(job.get('title') or ''), job.get('country')
+
+    def _cells(self, job_id: str) -> tuple[_Cell, ...]:
+        cells = self._job_cells.get(job_id)
+        if cells is not None:
+            return cells
+        values = self.dimensions(job_id)
+        cells = []
+        for grouping, cells_by_key in self._groups.items():
+            key = tuple(value for value, grouped in zip(values, grouping) if grouped)
+            cell = cells_by_key.get(key)
+            if cell is None:
+                cell = cells_by_key[key] = _Cell()
+            cells.append(cell)
+        cells = self._job_cells[job_id] = tuple(cells)
+        return cells
+
+    def _record(self, application_id: int, job_id: str, status: str, at: str) -> None:
+        new = _STATUS[status]
+        day = event_day(at)
+        state = self._applications.get(application_id)
+        if state is None:
+            cells = self._cells(job_id)
+            reached = _REACHES[status]
+            self._applications[application_id] = [new, day, reached, cells]
+            stages = _STAGES[reached]
+            for cell in cells:
+                cell.applications += 1
+                cell.current[new] += 1
+                for stage in stages:
+                    cell.reached[stage] += 1
+            return
+        old, entered, reached, cells = state
+        if new == old:
+            return
+        days = max(0.0, day - entered)
+        bucket = _bucket(days)
+        gained = _REACHES[status] & ~reached
+        stages = _STAGES[gained]
+        for cell in cells:
+            cell.current[old] -= 1
+            cell.current[new] += 1
+            cell.stage_count[old] += 1
+            cell.stage_days[old] += days
+            cell.stage_buckets[old][bucket] += 1
+            for stage in stages:
+                cell.reached[stage] += 1
+        state[0], state[1], state[2] = new, max(day, entered), reached | gained
+
+    def ingest(self, events: Iterable[ApplicationEvent]) -> int:
+        """Fold in logged events in id order; returns how many were new.
+
+        The event log is the only way in: ``last_event`` then always says
+        what has been folded, so events already seen are skipped rather
+        than counted twice.
+        """
+        folded = 0
+        with self._lock:
+            for event in events:
+                if event.id <= self.last_event:
+                    continue
+                self._record(event.application_id, event.job_id, event.status, event.at)
+                self.last_event = event.id
+                folded += 1
+        count('pipeline.events', folded)
+        return folded
+
+    def sync(self, store: UserDataStore, batch: int = 50_000) -> int:
+        """Fold in everything logged since the last sync."""
+        folded = 0
+        with span('pipeline.sync'):
+            while True:
+                events = store.application_events(after=self.last_event, limit=batch)
+                folded += self.ingest(events)
+                if len(events) < batch:
+                    return folded
+
+    def _cell(self, company: Optional[str], role: Optional[str], country: Optional[str]) -> Optional[_Cell]:
+        values = (company, role, country)
+        grouping = tuple(value is not None for value in values)
+        return self._groups[grouping].get(tuple(value for value in values if value is not None))
+
+    @staticmethod
+    def _funnel(cell: Optional[_Cell]) -> dict[str, Any]:
+        cell = cell or _Cell()
+        stages = []
+        for index, stage in enumerate(FUNNEL):
+            previous = cell.reached[index - 1] if index else cell.applications
+            reached = cell.reached[index]
+            stages.append({'stage': stage, 'count': reached,
+                           'conversion': reached / previous if previous else None})
+        return {'applications': cell.applications, 'stages': stages,
+                'current': dict(zip(APPLICATION_STATUSES, cell.current))}
+
+    def funnel(self, company: Optional[str] = None, role: Optional[str] = None,
+               country: Optional[str] = None) -> dict[str, Any]:
+        """Stage counts and step conversion for one filter combination; ``None`` means all."""
+        with self._lock:
+            return self._funnel(self._cell(company, role, country))
+
+    def time_in_stage(self, company: Optional[str] = None, role: Optional[str] = None,
+                      country: Optional[str] = None) -> dict[str, dict[str, Any]]:
+        """Days spent in each status by applications that have left it."""
+        with self._lock:
+            cell = self._cell(company, role, country) or _Cell()
+            result = {}
+            for index, status in enumerate(APPLICATION_STATUSES):
+                total = cell.stage_count[index]
+                result[status] = {
+                    'count': total,
+                    'meanDays': cell.stage_days[index] / total if total else None,
+                    'p50Days': _bucket_quantile(cell.stage_buckets[index], 0.5),
+                    'p90Days': _bucket_quantile(cell.stage_buckets[index], 0.9),
+                }
+            return result
+
+    def breakdown(self, dimension: str) -> dict[Any, dict[str, Any]]:
+        """``funnel`` for every value of one dimension; costs one entry per value."""
+        grouping = tuple(name == dimension for name in DIMENSIONS)
+        with self._lock:
+            return {key[0]: self._funnel(cell) for key, cell in self._groups[grouping].items()}
+
+
+def _bucket_quantile(buckets: list[int], q: float) -> Optional[float]:
+    """The ``q`` quantile of a ``STAGE_BUCKETS`` histogram, interpolated within its bucket."""
+    total = sum(buckets)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for index, bucket_count in enumerate(buckets):
+        if bucket_count and seen + bucket_count >= target:
+            low = STAGE_BUCKETS[index - 1] if index else 0.0
+            high = STAGE_BUCKETS[index]
+            if math.isinf(high):
+                return low
+            return low + (high - low) * (target - seen) / bucket_count
+        seen += bucket_count
+    return STAGE_BUCKETS[-2]
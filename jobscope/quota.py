@@ -0,0 +1,210 @@
+"""Per-user search quotas enforced with in-process token buckets.
+
+Each user gets a bucket that holds at most the plan's daily search limit
+and refills continuously at ``limit / period`` tokens per second, so a free
+user gets 10 searches a day with no midnight reset stampede. Enterprise
+(``None``) is unlimited but still counted.
+
+Buckets live in memory, spread over lock stripes keyed by user id. A check
+takes one uncontended stripe lock and does a few float operations, so it
+only waits on SQLite the first time this process sees a user, to load
+their saved bucket. Accepted searches are tallied per stripe and written
+to ``UserDataStore.spend_searches`` in one batch by ``flush``, either on
+demand or from a background thread every ``flush_interval`` seconds.
+
+The store keeps one shared bucket per user, so quotas survive restarts and
+several workers on one database share a single allowance. ``flush`` takes
+this worker's spends out of the shared bucket and then lowers its own
+buckets to what is left there, so between flushes a worker can over-grant
+by at most what other workers accepted since. Levels carry their wall-clock
+time, which is why ``clock`` defaults to ``time.time``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Optional
+
+from .persistence import PLANS, UserDataStore
+from .telemetry import count
+
+DAY = 24 * 60 * 60
+STRIPES = 64
+
+
+@dataclass
+class Bucket:
+    tokens: float
+    updated: float
+    capacity: float
+    rate: float
+
+
+@dataclass(frozen=True)
+class QuotaDecision:
+    allowed: bool
+    remaining: Optional[int]  # None when the plan is unlimited
+    retry_after: float = 0.0
+
+
+@dataclass
+class _Stripe:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    buckets: dict[int, Bucket] = field(default_factory=dict)
+    pending: dict[int, int] = field(default_factory=dict)
+
+
+class QuotaLimiter:
+    """Token-bucket search quotas per user and plan, flushed to the store in batches."""
+
+    def __init__(self, store: Optional[UserDataStore] = None, *, plans: Mapping[str, Optional[int]] = PLANS,
+                 period: float = DAY, flush_interval: float = 5.0, stripes: int = STRIPES,
+                 clock: Callable[[], float] = time.time):
+        self.store = store
+        self.plans = dict(plans)
+        self.period = period
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # The background flusher's latest failure, cleared once a flush succeeds.
+        self.last_error: Optional[Exception] = None
+
+    def __enter__(self) -> 'QuotaLimiter':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _stripe(self, user_id: int) -> _Stripe:
+        return self._stripes[hash(user_id) % len(self._stripes)]
+
+    def _limit(self, plan: str) -> Optional[int]:
+        if plan not in self.plans:
+            raise ValueError(f'unknown subscription {plan!r}')
+        return self.plans[plan]
+
+    def _saved(self, stripe: _Stripe, user_id: int) -> Optional[tuple[float, float]]:
+        """The user's saved bucket, loaded only for users this limiter has not seen yet."""
+        if self.store is None or user_id in stripe.buckets:
+            return None
+        return self.store.search_quota(user_id)
+
+    def _bucket(self, stripe: _Stripe, user_id: int, limit: int, now: float,
+                saved: Optional[tuple[float, float]] = None) -> Bucket:
+        """The user's bucket, refilled up to ``now``; caller holds the stripe lock."""
+        bucket = stripe.buckets.get(user_id)
+        if bucket is None:
+            tokens, updated = saved if saved is not None else (limit, now)
+            bucket = Bucket(min(tokens, limit), min(updated, now), limit, limit / self.period)
+            stripe.buckets[user_id] = bucket
+        elif bucket.capacity != limit:
+            # Plan change: keep what was spent, against the new allowance.
+            bucket.tokens = max(0.0, bucket.tokens + limit - bucket.capacity)
+            bucket.capacity, bucket.rate = limit, limit / self.period
+        if now > bucket.updated:
+            bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+        return bucket
+
+    def acquire(self, user_id: int, plan: str = 'free', cost: int = 1) -> QuotaDecision:
+        """Spend ``cost`` searches if the user has them left."""
+        limit = self._limit(plan)
+        stripe = self._stripe(user_id)
+        saved = self._saved(stripe, user_id) if limit is not None else None
+        with stripe.lock:
+            if limit is not None:
+                bucket = self._bucket(stripe, user_id, limit, self._clock(), saved)
+                if bucket.tokens < cost:
+                    wait = (cost - bucket.tokens) / bucket.rate if bucket.rate else float('inf')
+                    return QuotaDecision(False, max(0, int(bucket.tokens)), wait)
+                bucket.tokens -= cost
+            stripe.pending[user_id] = stripe.pending.get(user_id, 0) + cost
+        return QuotaDecision(True, None if limit is None else int(bucket.tokens))
+
+    def allow(self, user_id: int, plan: str = 'free', cost: int = 1) -> bool:
+        return self.acquire(user_id, plan, cost).allowed
+
+    def remaining(self, user_id: int, plan: str = 'free') -> Optional[int]:
+        limit = self._limit(plan)
+        if limit is None:
+            return None
+        stripe = self._stripe(user_id)
+        saved = self._saved(stripe, user_id)
+        with stripe.lock:
+            return max(0, int(self._bucket(stripe, user_id, limit, self._clock(), saved).tokens))
+
+    def pending(self) -> dict[int, int]:
+        """Searches accepted since the last flush, per user."""
+        counts: dict[int, int] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                counts.update(stripe.pending)
+        return counts
+
+    def flush(self) -> int:
+        """Write pending searches to the store's shared buckets; returns the searches written."""
+        spends: list[tuple[int, int, Optional[float], float]] = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                for user_id, searches in stripe.pending.items():
+                    bucket = stripe.buckets.get(user_id)
+                    capacity, rate = (bucket.capacity, bucket.rate) if bucket is not None else (None, 0.0)
+                    spends.append((user_id, searches, capacity, rate))
+                stripe.pending = {}
+        written = sum(searches for _, searches, _, _ in spends)
+        if not spends or self.store is None:
+            return written
+        now = self._clock()
+        try:
+            levels = self.store.spend_searches(spends, now)
+        except BaseException:
+            for user_id, searches, _, _ in spends:
+                stripe = self._stripe(user_id)
+                with stripe.lock:
+                    stripe.pending[user_id] = stripe.pending.get(user_id, 0) + searches
+            raise
+        for user_id, level in levels.items():
+            stripe = self._stripe(user_id)
+            with stripe.lock:
+                bucket = stripe.buckets.get(user_id)
+                if bucket is not None:
+                    # Searches accepted here since the snapshot are not in the shared level yet.
+                    bucket = self._bucket(stripe, user_id, bucket.capacity, now)
+                    bucket.tokens = min(bucket.tokens, level - stripe.pending.get(user_id, 0))
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as error:
+                # Failed searches are pending again; the next interval retries them.
+                self.last_error = error
+                count('quota.flush_errors')
+            else:
+                self.last_error = None
+
+    def start(self) -> None:
+        """Flush in the background every ``flush_interval`` seconds.
+
+        A failed flush (a locked database, say) is counted as
+        ``quota.flush_errors``, kept in ``last_error`` and retried on the
+        next interval.
+        """
+        if self._flusher is None:
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, name='quota-flush', daemon=True)
+            self._flusher.start()
+
+    def close(self) -> None:
+        """Stop the background flusher and write what is still pending."""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
@@ -0,0 +1,281 @@
+"""Relevance-ranked search with BM25F and block-max pruning.
+
+``BM25Index`` scores title, company, location and description together.
+It uses BM25F: each field's term frequency is length-normalised and
+boosted, and the per-field values are summed before a single saturation
+step, so a term that appears in both the title and the description is not
+counted twice at full weight.
+
+Postings are built from the store's columns. Each distinct value of a
+column is tokenized once and broadcast to its rows through the codes, as
+with the store's filters. Every posting carries its precomputed score
+contribution (its impact). Postings are grouped into blocks of
+``2**BLOCK_BITS`` consecutive rows, and each (term, block) keeps its
+maximum impact.
+
+A query adds up those maxima into an upper bound per block and visits
+blocks from the highest bound down, keeping the best ``k`` rows in a heap.
+Blocks are scored in groups that double in size (one block, then two,
+four, ...), each group in a single vectorized pass. Once the heap is full,
+blocks whose bound cannot beat the current k-th score are skipped, and the
+search stops at the first group where none can (block-max MaxScore). Top-20
+queries with selective terms touch a few blocks rather than every posting.
+Queries made only of terms most postings share cost about as much as
+scoring every posting.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from typing import Any, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .jobs import Job
+from .salary import SALARY_FILTER
+from .search_index import tokenize
+from .store import FILTER_COLUMNS, JobStore
+from .telemetry import timed
+
+FIELD_BOOSTS = {'title': 3.0, 'company': 2.0, 'location': 1.5, 'description': 1.0}
+FIELD_B = {'title': 0.5, 'company': 0.3, 'location': 0.3, 'description': 0.75}
+K1 = 1.2
+BLOCK_BITS = 12
+BUILD_CHUNK = 1 << 17
+MAX_GROUP_BLOCKS = 32
+SNAPSHOT_ARRAYS = ('docs', 'impacts', 'idf', 'term_ptr', 'block_ids', 'block_max', 'block_bounds',
+                   'term_block_ptr')
+
+
+def _distinct(column: pd.Series) -> tuple[np.ndarray, list]:
+    """Codes into a list of distinct values; missing values get ``len(values)``."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, values = column.cat.codes.to_numpy().astype(np.int64), list(column.cat.categories)
+    else:
+        codes, uniques = pd.factorize(column)
+        values = list(uniques)
+    return np.where(codes < 0, len(values), codes), values
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(start, end)`` for each pair, vectorized."""
+    lengths = ends - starts
+    return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+
+def _field_terms(values: list, vocabulary: dict[str, int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """CSR of (term id, tf) per distinct value, plus token counts; one empty row appended."""
+    ptr, terms, tfs, lengths = [0], [], [], []
+    for value in values + [None]:
+        tokens = tokenize(value) if isinstance(value, str) else []
+        for term, tf in Counter(tokens).items():
+            terms.append(vocabulary.setdefault(term, len(vocabulary)))
+            tfs.append(tf)
+        ptr.append(len(terms))
+        lengths.append(len(tokens))
+    return (np.array(ptr, dtype=np.int64), np.array(terms, dtype=np.int32),
+            np.array(tfs, dtype=np.float32), np.array(lengths, dtype=np.float64))
+
+
+class BM25Index:
+    """Impact-scored postings over a ``JobStore`` snapshot."""
+
+    def __init__(self, store: JobStore, boosts: Mapping[str, float] = FIELD_BOOSTS, k1: float = K1,
+                 b: Mapping[str, float] = FIELD_B):
+        self.store = store
+        self.version = store.version
+        self.size = len(store)
+        self.k1 = k1
+        self.vocabulary: dict[str, int] = {}
+        self._build(store.frame, dict(boosts), dict(b))
+
+    @property
+    def stale(self) -> bool:
+        return self.store.version != self.version
+
+    @timed('index.bm25_build')
+    def _build(self, frame: pd.DataFrame, boosts: dict[str, float], b: dict[str, float]) -> None:
+        fields = []
+        for name, boost in boosts.items():
+            codes, values = _distinct(frame[name])
+            ptr, terms, tfs, lengths = _field_terms(values, self.vocabulary)
+            average = float(lengths[codes].mean()) if len(codes) else 0.0
+            norm = boost / (1 - b[name] + b[name] * lengths / average) if average else np.zeros(len(lengths))
+            fields.append((codes, ptr, terms, tfs, norm.astype(np.float32)))
+
+        # Postings are combined across fields a chunk of rows at a time, so
+        # the per-field expansion never exists for the whole store at once.
+        chunks = []
+        for low in range(0, self.size, BUILD_CHUNK):
+            high = min(low + BUILD_CHUNK, self.size)
+            docs, terms, weights = [], [], []
+            for codes, ptr, field_terms, tfs, norm in fields:
+                chunk_codes = codes[low:high]
+                counts = ptr[chunk_codes + 1] - ptr[chunk_codes]
+                offsets = _ranges(ptr[chunk_codes], ptr[chunk_codes + 1])
+                docs.append(np.repeat(np.arange(low, high, dtype=np.int32), counts))
+                terms.append(field_terms[offsets])
+                weights.append(tfs[offsets] * np.repeat(norm[chunk_codes], counts))
+            doc, term, weight = np.concatenate(docs), np.concatenate(terms), np.concatenate(weights)
+            key = term.astype(np.int64) * (high - low) + (doc - low)
+            order = np.argsort(key, kind='stable')
+            key = key[order]
+            starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+            chunks.append((term[order][starts], doc[order][starts], np.add.reduceat(weight[order], starts)))
+
+        term = np.concatenate([chunk[0] for chunk in chunks]) if chunks else np.empty(0, np.int32)
+        order = np.argsort(term, kind='stable')
+        term = term[order]
+        self.docs = np.concatenate([chunk[1] for chunk in chunks])[order] if chunks else np.empty(0, np.int32)
+        tf = np.concatenate([chunk[2] for chunk in chunks])[order] if chunks else np.empty(0, np.float32)
+        del chunks, order
+
+        count = len(self.vocabulary)
+        df = np.bincount(term, minlength=count)
+        self.idf = np.log1p((self.size - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self.impacts = (self.idf[term] * tf * (self.k1 + 1) / (self.k1 + tf)).astype(np.float32)
+        self.term_ptr = np.searchsorted(term, np.arange(count + 1)).astype(np.int64)
+
+        block = self.docs >> BLOCK_BITS
+        starts = np.flatnonzero(np.r_[True, (term[1:] != term[:-1]) | (block[1:] != block[:-1])]) \
+            if len(term) else np.empty(0, np.int64)
+        self.block_ids = block[starts].astype(np.int32)
+        self.block_max = np.maximum.reduceat(self.impacts, starts) if len(starts) else np.empty(0, np.float32)
+        self.block_bounds = np.r_[starts, len(term)].astype(np.int64)
+        self.term_block_ptr = np.searchsorted(term[starts], np.arange(count + 1)).astype(np.int64)
+        self.blocks = (self.size + (1 << BLOCK_BITS) - 1) >> BLOCK_BITS
+
+    def memory_usage(self) -> int:
+        return sum(array.nbytes for array in self.snapshot_arrays()[1].values())
+
+    def snapshot_arrays(self) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+        """JSON-able state and the arrays to rebuild this index with ``from_snapshot``."""
+        state = {'size': self.size, 'k1': self.k1, 'blocks': self.blocks,
+                 'vocabulary': sorted(self.vocabulary, key=self.vocabulary.__getitem__)}
+        arrays = {name: getattr(self, name) for name in SNAPSHOT_ARRAYS}
+        return state, arrays
+
+    @classmethod
+    def from_snapshot(cls, store: JobStore, state: Mapping[str, Any],
+                      arrays: Mapping[str, np.ndarray]) -> 'BM25Index':
+        """An index over ``store`` around saved arrays, without rebuilding or copying them."""
+        if state['size'] != len(store):
+            raise ValueError(f'index covers {state["size"]} postings, store has {len(store)}')
+        index = cls.__new__(cls)
+        index.store = store
+        index.version = store.version
+        index.size = state['size']
+        index.k1 = state['k1']
+        index.blocks = state['blocks']
+        index.vocabulary = {term: term_id for term_id, term in enumerate(state['vocabulary'])}
+        for name in SNAPSHOT_ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    def term_ids(self, query: str) -> list[int]:
+        vocabulary = self.vocabulary
+        return sorted({vocabulary[token] for token in tokenize(query) if token in vocabulary})
+
+    def _filter(self, filters: Optional[Mapping[str, str]]):
+        active = {key: value for key, value in (filters or {}).items()
+                  if (key in FILTER_COLUMNS or key == SALARY_FILTER) and value != 'all'}
+        return self.store.row_predicate('', active) if active else None
+
+    @timed('search.bm25')
+    def search(self, query: str, k: int = 20, filters: Optional[Mapping[str, str]] = None) -> list[tuple[int, float]]:
+        """Top ``k`` ``(row, score)`` pairs, best first.
+
+        Among rows that were scored, ties go to the lower row; rows with a
+        tying score in a skipped block are not considered.
+        """
+        if self.stale:
+            raise RuntimeError('index is older than its store; rebuild it')
+        terms = self.term_ids(query)
+        if not terms or k <= 0:
+            return []
+        predicate = self._filter(filters)
+        bounds = np.zeros(self.blocks, dtype=np.float64)
+        lists = []
+        for term in terms:
+            low, high = self.term_block_ptr[term], self.term_block_ptr[term + 1]
+            bounds[self.block_ids[low:high]] += self.block_max[low:high]
+            lists.append((self.block_ids[low:high], low))
+        candidates = np.flatnonzero(bounds)
+        order = candidates[np.argsort(-bounds[candidates], kind='stable')]
+
+        heap: list[tuple[float, int]] = []  # (score, -row); the root is the weakest kept row
+        threshold = -math.inf
+        position, group = 0, 1
+        while position < len(order):
+            chosen = order[position:position + group]
+            if len(heap) >= k:
+                chosen = chosen[bounds[chosen] > threshold]
+                if not len(chosen):
+                    break
+            position += group
+            group = min(group * 2, MAX_GROUP_BLOCKS)
+            rows, scores = self._score_blocks(chosen, lists)
+            hits = np.flatnonzero(scores > max(threshold, 0.0))
+            if predicate is not None and len(hits):
+                hits = hits[predicate(rows[hits])]
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            for row, score in zip(rows[hits].tolist(), scores[hits].tolist()):
+                item = (score, -row)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+            if len(heap) >= k:
+                threshold = heap[0][0]
+        return [(-negative, score) for score, negative in sorted(heap, reverse=True)]
+
+    def _score_blocks(self, chosen: np.ndarray, lists: list[tuple[np.ndarray, int]]) -> tuple[np.ndarray, np.ndarray]:
+        """Exact scores of every row in the ``chosen`` blocks, as ``(rows, scores)``."""
+        width = 1 << BLOCK_BITS
+        slots, weights = [], []
+        for block_ids, offset in lists:
+            index = np.searchsorted(block_ids, chosen)
+            present = index < len(block_ids)
+            present[present] = block_ids[index[present]] == chosen[present]
+            entries = offset + index[present]
+            positions = _ranges(self.block_bounds[entries], self.block_bounds[entries + 1])
+            # Slot = rank of the block within ``chosen`` * width + offset within the block.
+            rank = np.repeat(np.flatnonzero(present), self.block_bounds[entries + 1] - self.block_bounds[entries])
+            slots.append(rank * width + (self.docs[positions] & (width - 1)))
+            weights.append(self.impacts[positions])
+        scores = np.bincount(np.concatenate(slots), weights=np.concatenate(weights), minlength=len(chosen) * width)
+        rows = (np.repeat(chosen.astype(np.int64) << BLOCK_BITS, width)
+                + np.tile(np.arange(width, dtype=np.int64), len(chosen)))
+        return rows, scores
+
+    def search_exhaustive(self, query: str, k: int = 20,
+                          filters: Optional[Mapping[str, str]] = None) -> list[tuple[int, float]]:
+        """Score every posting of the query terms; the reference for ``search``."""
+        terms = self.term_ids(query)
+        if not terms or k <= 0:
+            return []
+        slices = [slice(self.term_ptr[term], self.term_ptr[term + 1]) for term in terms]
+        scores = np.bincount(np.concatenate([self.docs[part] for part in slices]),
+                             weights=np.concatenate([self.impacts[part].astype(np.float64) for part in slices]),
+                             minlength=self.size)
+        predicate = self._filter(filters)
+        if predicate is not None:
+            scores[~predicate()] = 0.0
+        top = np.flatnonzero(scores)
+        if len(top) > k:
+            kth = np.partition(scores[top], len(top) - k)[len(top) - k]
+            top = top[scores[top] >= kth]
+        top = top[np.lexsort((top, -scores[top]))][:k]
+        return list(zip(top.tolist(), scores[top].tolist()))
+
+    def jobs(self, query: str, k: int = 20, filters: Optional[Mapping[str, str]] = None) -> list[Job]:
+        """Top ``k`` postings with their ``score``."""
+        ranked = self.search(query, k, filters)
+        jobs = JobStore.to_jobs(self.store.frame.iloc[[row for row, _ in ranked]])
+        for job, (_, score) in zip(jobs, ranked):
+            job['score'] = round(score, 4)
+        return jobs
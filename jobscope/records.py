@@ -0,0 +1,274 @@
+"""Compact, array-backed job records for postings held in memory.
+
+A job dict costs over a kilobyte: the dict itself, its own copies of
+``location``, ``postedDate`` and ``id``, and a generated ``description``
+plus a long ``applyLink`` that are only read when a card is opened.
+``JobRecords`` keeps one row per posting instead:
+
+* every low-cardinality field (title, company, location, country,
+  workType, experience, salary, platform, postedDate) is dictionary
+  encoded. Each row holds a one-byte code, widened to two or four bytes
+  only when a field outgrows it;
+* ``rating`` is a packed double and ``id`` lives in a compact UTF-8 heap;
+* ``description`` and ``applyLink`` live out of line in a ``TextHeap``,
+  optionally backed by a file, and are decoded only when a record is
+  read.
+
+``JobRecord`` is a ``__slots__`` view of one row that reads like the job
+dict it came from, so code written against ``Job`` keeps working.
+``JobRecords.filter`` evaluates ``matches_filters`` once per distinct field
+value and then only gathers over the code arrays, so a scan reads a few
+bytes per posting rather than chasing a dict and its strings.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from array import array
+from typing import Any, Iterator, Mapping, Optional
+
+import numpy as np
+
+from .jobs import DEFAULT_FILTERS, Job, role_family
+from .salary import SALARY_FILTER, in_salary_range, parse_salary, parse_salary_range
+
+FIELDS = ('id', 'title', 'company', 'location', 'country', 'workType', 'experience', 'salary',
+          'platform', 'rating', 'postedDate', 'description', 'applyLink')
+CODED_FIELDS = ('title', 'company', 'location', 'country', 'workType', 'experience', 'salary',
+                'platform', 'postedDate')
+TEXT_FIELDS = ('description', 'applyLink')
+SEARCH_FIELDS = ('title', 'company', 'location')
+
+# Code array typecodes in widening order, with the largest code each holds.
+_WIDTHS = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF))
+_MISSING = float('nan')
+
+
+class CodeColumn:
+    """Dictionary-encoded values: one small integer code per row.
+
+    Code 0 stands for a missing value.
+    """
+
+    __slots__ = ('values', 'codes', 'rows', '_width')
+
+    def __init__(self):
+        self.values: list[Any] = [None]
+        self.codes: dict[Any, int] = {}
+        self.rows = array('B')
+        self._width = 0
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            code = 0
+        else:
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+                if code > _WIDTHS[self._width][1]:
+                    self._width += 1
+                    self.rows = array(_WIDTHS[self._width][0], self.rows)
+        self.rows.append(code)
+
+    def table(self, fn) -> np.ndarray:
+        """``fn`` evaluated once per distinct value, indexable by code."""
+        return np.array([fn(value) for value in self.values], dtype=bool)
+
+    def nbytes(self) -> int:
+        return self.rows.itemsize * len(self.rows)
+
+
+class TextHeap:
+    """Append-only strings addressed by number, stored as UTF-8 outside the records.
+
+    With ``path`` the bytes go to that file and each read is one ``pread``,
+    so the heap holds only its offsets in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._ends = array('Q')
+        self._missing: set[int] = set()
+        self._data = bytearray()
+        self._file = open(path, 'w+b') if path is not None else None
+        self._flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def append(self, text: Optional[str]) -> int:
+        index = len(self._ends)
+        encoded = text.encode() if text is not None else b''
+        if text is None:
+            self._missing.add(index)
+        if self._file is not None:
+            self._file.write(encoded)
+            self._ends.append(self._ends[-1] + len(encoded) if index else len(encoded))
+        else:
+            self._data += encoded
+            self._ends.append(len(self._data))
+        return index
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index in self._missing:
+            return None
+        start = self._ends[index - 1] if index else 0
+        end = self._ends[index]
+        if self._file is None:
+            return self._data[start:end].decode()
+        if end > self._flushed:
+            self._file.flush()
+            self._flushed = self._ends[-1]
+        return os.pread(self._file.fileno(), end - start, start).decode()
+
+    def nbytes(self) -> int:
+        """Bytes held in memory: the offsets, plus the text unless it is in a file."""
+        return self._ends.itemsize * len(self._ends) + len(self._data)
+
+    def text_bytes(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.path)
+
+
+class JobRecord(Mapping[str, Any]):
+    """One posting of a ``JobRecords`` table, read like a job dict."""
+
+    __slots__ = ('_records', '_row')
+
+    def __init__(self, records: 'JobRecords', row: int):
+        self._records = records
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __getitem__(self, field: str) -> Any:
+        return self._records.value(self._row, field)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FIELDS
+        yield from self._records.extras.get(self._row, ())
+
+    def __len__(self) -> int:
+        return len(FIELDS) + len(self._records.extras.get(self._row, ()))
+
+    def to_dict(self) -> Job:
+        return self._records.to_dict(self._row)
+
+    def __repr__(self) -> str:
+        return f'JobRecord({self._records.to_dict(self._row)!r})'
+
+
+class JobRecords:
+    """Postings as parallel code arrays, with free text kept out of line.
+
+    Pass ``text_path`` to keep descriptions and apply links in a file
+    rather than in memory. Keys outside ``FIELDS`` are kept per row as
+    given.
+    """
+
+    def __init__(self, text_path: Optional[str] = None):
+        self.columns = {field: CodeColumn() for field in CODED_FIELDS}
+        self.ratings = array('d')
+        self.ids = TextHeap()
+        self.text = TextHeap(text_path)
+        self.extras: dict[int, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    def __getitem__(self, row: int) -> JobRecord:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return JobRecord(self, row)
+
+    def __iter__(self) -> Iterator[JobRecord]:
+        return (JobRecord(self, row) for row in range(len(self)))
+
+    def append(self, job: Mapping[str, Any]) -> int:
+        """Add ``job`` and return its row number."""
+        row = len(self.ratings)
+        self.ids.append(job['id'])
+        for field, column in self.columns.items():
+            column.append(job.get(field))
+        rating = job.get('rating')
+        self.ratings.append(float(rating) if rating is not None else _MISSING)
+        for field in TEXT_FIELDS:
+            self.text.append(job.get(field))
+        extra = {key: value for key, value in job.items() if key not in _FIELD_SET}
+        if extra:
+            self.extras[row] = extra
+        return row
+
+    def value(self, row: int, field: str) -> Any:
+        column = self.columns.get(field)
+        if column is not None:
+            return column.values[column.rows[row]]
+        if field == 'id':
+            return self.ids[row]
+        if field == 'rating':
+            rating = self.ratings[row]
+            return None if rating != rating else rating
+        if field in TEXT_FIELDS:
+            return self.text[row * len(TEXT_FIELDS) + TEXT_FIELDS.index(field)]
+        try:
+            return self.extras[row][field]
+        except KeyError:
+            raise KeyError(field) from None
+
+    def to_dict(self, row: int) -> Job:
+        job = {field: self.value(row, field) for field in FIELDS}
+        job.update(self.extras.get(row, {}))
+        return job
+
+    def _codes(self, field: str) -> np.ndarray:
+        rows = self.columns[field].rows
+        return np.frombuffer(rows, dtype=rows.typecode) if len(rows) else np.empty(0, np.uint8)
+
+    def filter(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None) -> np.ndarray:
+        """Rows passing ``matches_filters(job, search_query, filters)``, ascending."""
+        filters = filters or DEFAULT_FILTERS
+        query = search_query.lower()
+        keep = np.zeros(len(self), dtype=bool)
+        for field in SEARCH_FIELDS:
+            table = self.columns[field].table(lambda value: value is not None and query in value.lower())
+            keep |= table[self._codes(field)]
+        role = filters.get('role', 'all')
+        if role != 'all':
+            table = self.columns['title'].table(lambda value: value is not None and role_family(value) == role)
+            keep &= table[self._codes('title')]
+        for key, field in (('location', 'country'), ('workType', 'workType'), ('experience', 'experience')):
+            wanted = filters.get(key, 'all')
+            if wanted != 'all':
+                keep &= self.columns[field].table(lambda value: value == wanted)[self._codes(field)]
+        salary_range = filters.get(SALARY_FILTER, 'all')
+        if salary_range != 'all':
+            bounds = parse_salary_range(salary_range)
+            table = self.columns['salary'].table(
+                lambda value: value is not None and in_salary_range(parse_salary(value), bounds))
+            keep &= table[self._codes('salary')]
+        return np.flatnonzero(keep)
+
+    def memory_usage(self) -> int:
+        """Bytes held in memory, including the dictionaries and any in-memory text."""
+        dictionaries = sum(sys.getsizeof(column.codes) + sys.getsizeof(column.values)
+                           + sum(sys.getsizeof(value) for value in column.values[1:])
+                           for column in self.columns.values())
+        codes = sum(column.nbytes() for column in self.columns.values())
+        return codes + dictionaries + self.ratings.itemsize * len(self.ratings) + self.ids.nbytes() \
+            + self.text.nbytes()
+
+    def close(self) -> None:
+        """Remove the text file, if there is one."""
+        self.text.close()
+
+
+_FIELD_SET = frozenset(FIELDS)
@@ -0,0 +1,268 @@
+"""Time-partitioned retention for a rolling window of postings.
+
+Feeds only grow, so ``RetentionStore`` keeps postings in one partition per
+posted day and retains the last ``window_days`` of them.
+
+* ``ingest`` converts a batch to columns once and queues it with each
+  row's posted day. The cost depends on the batch, not the data already
+  held.
+* ``expire`` drops every partition older than the window by deleting its
+  dict entry: O(1) per partition, however many postings it holds.
+* ``close_postings`` tombstones postings that a re-crawl found closed.
+  Recording a tombstone is a set insert; the rows are removed at the next
+  compaction.
+
+Readers never see partitions. ``snapshot()`` returns the current compacted
+``JobStore``, which ``JobCache`` and its indexes consume unchanged. It is
+one frame of the live partitions plus the queued batches. The last version
+of an id wins, and rows of tombstoned postings or expired days are left
+out. Rows are ordered by posted day, so each partition is a contiguous
+slice.
+``compact`` builds the next snapshot from references taken under the
+write lock, then does the work without it. It runs ``on_publish`` (for
+example ``JobCache.swap``, which builds indexes for the new snapshot) and
+only then swaps the reference. Readers keep using the previous snapshot
+until the swap and never wait for a compaction.
+
+After the swap, each partition is re-pointed at its slice of the new
+frame. Partitions and snapshot
+therefore share memory, and a dropped partition's rows are released when
+the next snapshot replaces the old one. Writes show up in reads after the
+next compaction, which ``start`` runs in the background every
+``compact_interval`` seconds when something changed.
+
+Wire it up with::
+
+    retention = RetentionStore()
+    cache = JobCache(loader=retention.snapshot, dataset_ttl=None)
+    retention.on_publish = cache.swap
+    retention.start()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .jobs import Job
+from .store import JobStore, concat_frames, jobs_frame
+from .telemetry import observe
+
+WINDOW_DAYS = 90
+COMPACT_INTERVAL = 5.0
+
+
+@dataclass
+class CompactionStats:
+    rows: int
+    partitions: int
+    purged: int
+    seconds: float
+
+
+class RetentionStore:
+    """Postings partitioned by posted day, with a compacted snapshot for readers."""
+
+    def __init__(self, window_days: int = WINDOW_DAYS, *, compact_interval: float = COMPACT_INTERVAL,
+                 on_publish: Optional[Callable[[JobStore], Any]] = None,
+                 today: Callable[[], date] = date.today):
+        self.window_days = window_days
+        self.compact_interval = compact_interval
+        self.on_publish = on_publish
+        self._today = today
+        # Compacted rows per posted day; slices of the snapshot's frame.
+        self._partitions: dict[date, pd.DataFrame] = {}
+        # Batches ingested since the last compaction, with each row's day.
+        self._pending: list[tuple[pd.DataFrame, np.ndarray]] = []
+        self._location: dict[str, date] = {}
+        # Tombstoned id -> close sequence number, so a compaction only
+        # clears tombstones that have not been renewed since it started.
+        self._tombstones: dict[str, int] = {}
+        self._closes = 0
+        # Dropped partitions, whose ids are unmapped at the next compaction.
+        self._dropped: list[tuple[date, pd.DataFrame]] = []
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._snapshot = JobStore()
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'RetentionStore':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Postings visible to readers."""
+        return len(self._snapshot)
+
+    @property
+    def partitions(self) -> list[date]:
+        with self._lock:
+            return sorted(self._partitions)
+
+    @property
+    def tombstones(self) -> int:
+        return len(self._tombstones)
+
+    def horizon(self) -> date:
+        """The oldest posted day still inside the window."""
+        return self._today() - timedelta(days=self.window_days - 1)
+
+    def snapshot(self) -> JobStore:
+        """The latest compacted store; treat it as read-only."""
+        return self._snapshot
+
+    # Writes
+
+    def ingest(self, jobs: Iterable[Job]) -> int:
+        """Upsert postings into their day's partition; return how many were kept.
+
+        Postings older than the window are ignored, and those without a
+        posted date count as posted today. A posting seen again after being
+        closed is reopened.
+        """
+        frame = jobs_frame(jobs)
+        if frame.empty:
+            return 0
+        frame = frame.drop_duplicates('id', keep='last')
+        days = frame['postedDate'].to_numpy(dtype='datetime64[D]')
+        days[np.isnat(days)] = np.datetime64(self._today(), 'D')
+        keep = days >= np.datetime64(self.horizon(), 'D')
+        if not keep.all():
+            frame, days = frame[keep], days[keep]
+        if frame.empty:
+            return 0
+        empty = frame.iloc[:0]
+        with self._lock:
+            self._pending.append((frame, days))
+            for day, job_id in zip(days.tolist(), frame['id'].tolist()):
+                if day not in self._partitions:
+                    self._partitions[day] = empty
+                self._location[job_id] = day
+                self._tombstones.pop(job_id, None)
+            self._dirty = True
+        return len(frame)
+
+    def close_postings(self, job_ids: Iterable[str]) -> int:
+        """Tombstone postings that have closed; return how many were live."""
+        closed = 0
+        with self._lock:
+            for job_id in job_ids:
+                day = self._location.get(job_id)
+                if day in self._partitions and job_id not in self._tombstones:
+                    self._closes += 1
+                    self._tombstones[job_id] = self._closes
+                    closed += 1
+            self._dirty = self._dirty or bool(closed)
+        return closed
+
+    def expire(self) -> list[date]:
+        """Drop every partition older than the window; return their days."""
+        horizon = self.horizon()
+        with self._lock:
+            expired = [day for day in self._partitions if day < horizon]
+            for day in expired:
+                self._dropped.append((day, self._partitions.pop(day)))
+            self._dirty = self._dirty or bool(expired)
+        return expired
+
+    # Compaction
+
+    def compact(self, force: bool = False) -> Optional[CompactionStats]:
+        """Build and publish a new snapshot if anything changed since the last one."""
+        with self._compact_lock:
+            started = time.perf_counter()
+            with self._lock:
+                if not (self._dirty or force):
+                    return None
+                self._dirty = False
+                days = sorted(self._partitions)
+                frames = [self._partitions[day] for day in days]
+                row_days = [np.full(len(frame), np.datetime64(day, 'D')) for day, frame in zip(days, frames)]
+                batches = list(self._pending)
+                tombstones = dict(self._tombstones)
+                dropped, self._dropped = self._dropped, []
+            frames += [frame for frame, _ in batches]
+            row_days += [batch_days for _, batch_days in batches]
+
+            # The slow part runs without the write lock: partitions are only
+            # ever replaced and batches only appended, so these references
+            # stay consistent. Batches come after the partitions in ingest
+            # order, so the last row of an id is its latest version.
+            combined = concat_frames(frames)
+            row_days = np.concatenate(row_days) if row_days else np.empty(0, 'datetime64[D]')
+            ids = combined['id']
+            in_window = np.isin(row_days, np.array(days, dtype='datetime64[D]'))
+            latest = ~ids.duplicated(keep='last').to_numpy()
+            keep = in_window & latest
+            closed = ids.isin(list(tombstones)).to_numpy() if tombstones else np.zeros(len(ids), bool)
+            purged = int((keep & closed).sum())
+            keep &= ~closed
+            order = np.flatnonzero(keep)[np.argsort(row_days[keep], kind='stable')]
+            merged = combined.take(order).reset_index(drop=True)
+            merged_days = row_days[order]
+            expired = list(zip(ids[~in_window].tolist(), row_days[~in_window].tolist()))
+            for day, frame in dropped:
+                expired += [(job_id, day) for job_id in frame['id'].tolist()]
+            del combined, ids
+
+            snapshot = JobStore(merged)
+            if self.on_publish is not None:
+                self.on_publish(snapshot)
+
+            bounds = np.searchsorted(merged_days, np.array(days + [date.max], dtype='datetime64[D]')).tolist()
+            with self._lock:
+                self._snapshot = snapshot
+                for day, low, high in zip(days, bounds[:-1], bounds[1:]):
+                    if day in self._partitions:
+                        self._partitions[day] = merged.iloc[low:high]
+                del self._pending[:len(batches)]
+                for job_id, sequence in tombstones.items():
+                    if self._tombstones.get(job_id) == sequence:
+                        del self._tombstones[job_id]
+                        del self._location[job_id]
+                for job_id, day in expired:
+                    if self._location.get(job_id) == day:
+                        del self._location[job_id]
+                        self._tombstones.pop(job_id, None)
+            stats = CompactionStats(len(merged), len(days), purged, time.perf_counter() - started)
+            observe('retention.compact', stats.seconds)
+            return stats
+
+    def maintain(self) -> Optional[CompactionStats]:
+        """Expire old partitions, then compact if anything changed."""
+        self.expire()
+        return self.compact()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.compact_interval):
+            self.maintain()
+
+    def start(self) -> None:
+        """Expire and compact in the background every ``compact_interval`` seconds."""
+        if self._compactor is None:
+            self._stop.clear()
+            self._compactor = threading.Thread(target=self._run, name='retention-compact', daemon=True)
+            self._compactor.start()
+
+    def close(self) -> None:
+        """Stop the background compactor after a final pass."""
+        if self._compactor is not None:
+            self._stop.set()
+            self._compactor.join()
+            self._compactor = None
+        self.maintain()
+
+    def memory_usage(self) -> int:
+        """Bytes held by the snapshot; partitions share its columns once compacted."""
+        return self._snapshot.memory_usage()
@@ -0,0 +1,220 @@
+"""Salary parsing, currency normalisation and salary aggregates.
+
+Salary strings are parsed once, at ingest, into ``salaryMin``/``salaryMax``
+and a ``salaryCurrency`` code. Grouping separators are ignored wherever
+they fall, so Indian lakh grouping (``₹15,00,000``) parses like any other
+amount. Aggregates convert to one base currency through a local rate table
+before averaging, so rupees, Singapore dollars and euros are never mixed.
+
+The dashboard's ``salaryRange`` filter (``'€60k-80k'``, ``'₹20L+'``) is
+parsed the same way and keeps postings whose range overlaps it.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .telemetry import timed
+
+BASE_CURRENCY = 'USD'
+# Dashboard filter key for a salary range; see ``parse_salary_range``.
+SALARY_FILTER = 'salaryRange'
+
+# Units of BASE_CURRENCY per unit of each currency.
+RATES = {
+    'USD': 1.0,
+    'EUR': 1.08,
+    'GBP': 1.27,
+    'SGD': 0.74,
+    'INR': 0.012,
+}
+
+# Longest symbols first so ``S$`` wins over ``$``.
+CURRENCY_SYMBOLS = (
+    ('S$', 'SGD'),
+    ('SGD', 'SGD'),
+    ('US$', 'USD'),
+    ('USD', 'USD'),
+    ('EUR', 'EUR'),
+    ('INR', 'INR'),
+    ('GBP', 'GBP'),
+    ('Rs', 'INR'),
+    ('₹', 'INR'),
+    ('€', 'EUR'),
+    ('£', 'GBP'),
+    ('$', 'USD'),
+)
+
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+_AMOUNT_RE = re.compile(r'(\d[\d,.]*)\s*(k|lakhs?|lac|l|cr|crores?)?\b', re.IGNORECASE)
+_MULTIPLIERS = {'k': 1e3, 'l': 1e5, 'lac': 1e5, 'lakh': 1e5, 'lakhs': 1e5, 'cr': 1e7, 'crore': 1e7, 'crores': 1e7}
+_THOUSANDS_DOT_RE = re.compile(r'^\d{1,3}(\.\d{3})+$')
+
+
+class ParsedSalary(NamedTuple):
+    min: float
+    max: float
+    currency: Optional[str]
+
+
+def detect_currency(text: str) -> Optional[str]:
+    for symbol, code in CURRENCY_SYMBOLS:
+        if symbol in text:
+            return code
+    return None
+
+
+def _amount(digits: str, unit: Optional[str]) -> float:
+    if _THOUSANDS_DOT_RE.match(digits):
+        digits = digits.replace('.', '')
+    value = float(digits.replace(',', '').rstrip('.') or 'nan')
+    return value * _MULTIPLIERS.get((unit or '').lower(), 1.0)
+
+
+def parse_salary(text: Optional[str]) -> ParsedSalary:
+    """Parse ``'₹15,00,000 - ₹25,00,000'`` into ``(1500000.0, 2500000.0, 'INR')``."""
+    if not text:
+        return ParsedSalary(np.nan, np.nan, None)
+    amounts = [_amount(digits, unit) for digits, unit in _AMOUNT_RE.findall(text)]
+    if not amounts:
+        return ParsedSalary(np.nan, np.nan, detect_currency(text))
+    return ParsedSalary(min(amounts), max(amounts), detect_currency(text))
+
+
+def parse_salary_range(value: str) -> ParsedSalary:
+    """Parse a ``salaryRange`` filter such as ``'€60k-80k'``, ``'₹20L+'`` or ``'100000'``.
+
+    Bounds are in the posting's own currency. A currency symbol limits the
+    filter to postings paid in it, and a trailing ``+`` leaves the top open.
+    """
+    bounds = parse_salary(value)
+    if np.isnan(bounds.min):
+        raise ValueError(f'invalid salary range {value!r}')
+    if value.rstrip().endswith('+'):
+        bounds = bounds._replace(max=np.inf)
+    return bounds
+
+
+def in_salary_range(salary: ParsedSalary, bounds: ParsedSalary) -> bool:
+    """Whether a parsed salary overlaps ``parse_salary_range`` bounds; unparsed salaries never do."""
+    return bool(salary.max >= bounds.min and salary.min <= bounds.max
+                and (bounds.currency is None or salary.currency == bounds.currency))
+
+
+def salary_columns(salary: pd.Series) -> pd.DataFrame:
+    """``salaryMin``/``salaryMax``/``salaryCurrency`` columns for a salary column.
+
+    Each distinct string is parsed once; rows pick up the result through the
+    categorical codes.
+    """
+    salary = salary if isinstance(salary.dtype, pd.CategoricalDtype) else salary.astype('category')
+    parsed = [parse_salary(text) for text in salary.cat.categories] + [parse_salary(None)]
+    codes = salary.cat.codes.to_numpy()
+    bounds = np.array([(item.min, item.max) for item in parsed], dtype='float64')[codes]
+    currencies = [item.currency for item in parsed]
+    categories = sorted({code for code in currencies if code is not None})
+    lookup = np.array([categories.index(code) if code is not None else -1 for code in currencies])
+    currency = pd.Categorical.from_codes(lookup[codes], categories=categories)
+    return pd.DataFrame({'salaryMin': bounds[:, 0], 'salaryMax': bounds[:, 1], 'salaryCurrency': currency},
+                        index=salary.index)
+
+
+def base_midpoints(frame: pd.DataFrame, rates: Optional[dict[str, float]] = None) -> pd.Series:
+    """Salary midpoints converted to the base currency; NaN when unknown."""
+    rates = RATES if rates is None else rates
+    currency = frame['salaryCurrency']
+    rate = pd.Series(_rate_map(currency, rates), index=frame.index)
+    return (frame['salaryMin'] + frame['salaryMax']) / 2 * rate
+
+
+def _rate_map(currency: pd.Series, rates: dict[str, float]) -> np.ndarray:
+    values = np.array([rates.get(code, np.nan) for code in currency.cat.categories] + [np.nan], dtype='float64')
+    return values[currency.cat.codes.to_numpy()]
+
+
+def group_stats(frame: pd.DataFrame, by: str, rates: Optional[dict[str, float]] = None) -> pd.DataFrame:
+    """Count, mean and percentiles of base-currency midpoints per ``by`` value."""
+    midpoints = base_midpoints(frame, rates).rename('salary')
+    valid = midpoints.notna()
+    grouped = midpoints[valid].groupby(frame.loc[valid, by], observed=True)
+    stats = grouped.agg(['count', 'mean'])
+    quantiles = grouped.quantile(list(PERCENTILES)).unstack()
+    quantiles.columns = [f'p{int(q * 100)}' for q in quantiles.columns]
+    return stats.join(quantiles)
+
+
+def local_averages(frame: pd.DataFrame, by: str = 'country') -> pd.DataFrame:
+    """Count and mean midpoint per (``by``, currency), in that currency."""
+    midpoints = (frame['salaryMin'] + frame['salaryMax']) / 2
+    valid = midpoints.notna() & frame['salaryCurrency'].notna()
+    keys = [frame.loc[valid, by], frame.loc[valid, 'salaryCurrency']]
+    stats = midpoints[valid].groupby(keys, observed=True).agg(['count', 'mean'])
+    return stats.rename(columns={'mean': 'avgLocal'}).reset_index()
+
+
+class SalaryInsights:
+    """Salary aggregates over a ``JobStore``, cached until its jobs change."""
+
+    def __init__(self, store, base_currency: str = BASE_CURRENCY, rates: Optional[dict[str, float]] = None):
+        self.store = store
+        self.base_currency = base_currency
+        rates = dict(RATES if rates is None else rates)
+        base_rate = rates[base_currency]
+        self.rates = {code: rate / base_rate for code, rate in rates.items()}
+        self._cache: dict[str, tuple[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key: str, compute):
+        version = self.store.version
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = compute()
+        self._cache[key] = (version, value)
+        return value
+
+    def average(self) -> float:
+        def compute() -> float:
+            midpoints = base_midpoints(self.store.frame, self.rates)
+            return float(midpoints.mean()) if midpoints.notna().any() else 0.0
+        return self._cached('average', compute)
+
+    def by(self, column: str) -> pd.DataFrame:
+        return self._cached(f'by:{column}', lambda: group_stats(self.store.frame, column, self.rates))
+
+    def by_country(self) -> pd.DataFrame:
+        return self.by('country')
+
+    def by_role(self) -> pd.DataFrame:
+        return self.by('title')
+
+    def local_by_country(self) -> pd.DataFrame:
+        return self._cached('local:country', lambda: local_averages(self.store.frame, 'country'))
+
+    def summary(self) -> dict[str, Any]:
+        """The shape ``getSalaryInsights`` returns, with computed trends."""
+        return self._cached('summary', self._summary)
+
+    @timed('salary.summary')
+    def _summary(self) -> dict[str, Any]:
+        if not len(self.store):
+            return {'average': 0, 'currency': self.base_currency, 'trends': []}
+        # A country's local figure uses its most common posting currency.
+        local = (self.local_by_country().sort_values('count', ascending=False)
+                 .drop_duplicates('country').set_index('country'))
+        trends = []
+        for country, row in self.by_country().iterrows():
+            entry = {'country': country, 'avgSalaryBase': round(row['mean']), 'count': int(row['count'])}
+            if country in local.index:
+                entry['avgSalary'] = round(local.at[country, 'avgLocal'])
+                entry['currency'] = local.at[country, 'salaryCurrency']
+            trends.append(entry)
+        return {'average': round(self.average()), 'currency': self.base_currency, 'trends': trends}
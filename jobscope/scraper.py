@@ -0,0 +1,281 @@
+"""Concurrent fetching of job listing pages from the supported platforms.
+
+``CrawlEngine`` expands platform × country × role into listing-page requests
+and fetches them on a bounded thread pool. Each host gets one pooled
+``requests.Session`` so connections are kept alive across pages, each
+platform gets its own rate limiter, and HTTP 429 responses back off (honouring
+``Retry-After``) for every worker hitting that platform, not only the one that
+was throttled.
+
+Pages come back as raw HTML; turning them into job records is the parser's
+job. ``requests`` is imported on the first fetch, so modules that only
+need ``PLATFORMS`` (such as ``jobscope.corpus``) do not pay for it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Mapping, Optional, Sequence
+from urllib.parse import urlencode, urlsplit
+
+from .jobs import COUNTRIES, ROLES
+from .telemetry import count, timed
+
+if TYPE_CHECKING:
+    import requests
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class Platform:
+    name: str
+    base_url: str
+    requests_per_second: float = 2.0
+    countries: Optional[tuple[str, ...]] = None
+
+    def serves(self, country: str) -> bool:
+        return self.countries is None or country in self.countries
+
+
+PLATFORMS = {
+    platform.name: platform for platform in (
+        Platform('LinkedIn', 'https://www.linkedin.com/jobs/search', 1.0),
+        Platform('Indeed', 'https://www.indeed.com/jobs', 2.0),
+        Platform('Glassdoor', 'https://www.glassdoor.com/Job/jobs.htm', 1.0),
+        Platform('JobsDB', 'https://www.jobsdb.com/jobs', 2.0, ('Singapore',)),
+        Platform('MyCareersFuture', 'https://www.mycareersfuture.gov.sg/search', 2.0, ('Singapore',)),
+        Platform('Xing', 'https://www.xing.com/jobs/search', 2.0, ('Germany',)),
+        Platform('StepStone', 'https://www.stepstone.de/jobs', 2.0, ('Germany', 'Netherlands', 'France')),
+    )
+}
+
+
+@dataclass(frozen=True)
+class FetchTask:
+    platform: str
+    country: str
+    role: str
+    url: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Page:
+    task: FetchTask
+    status: int
+    text: str = ''
+    headers: Mapping[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    attempts: int = 1
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttled: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+class RateLimiter:
+    """Spaces requests to one platform at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` after a throttling response."""
+        with self._lock:
+            self._next = max(self._next, self._clock() + seconds)
+
+
+def retry_after(value: Optional[str], default: float) -> float:
+    """Seconds to wait according to a ``Retry-After`` header."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class CrawlEngine:
+    """Fetch listing pages for many platform × country × role combinations."""
+
+    def __init__(
+        self,
+        platforms: Optional[Mapping[str, Platform]] = None,
+        *,
+        max_workers: int = 16,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        user_agent: str = 'JobScope/1.0',
+    ):
+        self.platforms = dict(platforms or PLATFORMS)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.user_agent = user_agent
+        self.stats = CrawlStats()
+        self._limiters = {name: RateLimiter(p.requests_per_second) for name, p in self.platforms.items()}
+        self._sessions: dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self) -> 'CrawlEngine':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def session_for(self, url: str) -> requests.Session:
+        """The shared keep-alive session for ``url``'s host."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        host = urlsplit(url).netloc
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = self.user_agent
+                self._sessions[host] = session
+            return session
+
+    def listing_url(self, platform: str, country: str, role: str, page: int = 1) -> str:
+        query = urlencode({'q': role, 'country': country, 'page': page})
+        return f'{self.platforms[platform].base_url}?{query}'
+
+    def tasks(self, countries: Sequence[str] = COUNTRIES, roles: Sequence[str] = ROLES,
+              platforms: Optional[Iterable[str]] = None) -> list[FetchTask]:
+        tasks = []
+        for name in platforms or self.platforms:
+            platform = self.platforms[name]
+            for country in countries:
+                if not platform.serves(country):
+                    continue
+                for role in roles:
+                    tasks.append(FetchTask(name, country, role, self.listing_url(name, country, role)))
+        return tasks
+
+    def _record(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + delta)
+        for name, delta in deltas.items():
+            count(f'crawl.{name}', delta)
+
+    @timed('crawl.fetch')
+    def fetch(self, task: FetchTask) -> Page:
+        """Fetch one page, retrying throttled and transient failures."""
+        import requests
+
+        limiter = self._limiters[task.platform]
+        session = self.session_for(task.url)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            limiter.acquire()
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            try:
+                response = session.get(task.url, headers=dict(task.headers), timeout=self.timeout)
+            except requests.RequestException as exc:
+                if attempt > self.max_retries:
+                    self._record(pages=1, errors=1)
+                    return Page(task, 0, elapsed=time.perf_counter() - started, attempts=attempt, error=str(exc))
+                self._record(retries=1)
+                time.sleep(delay)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt <= self.max_retries:
+                if response.status_code == 429:
+                    self._record(throttled=1)
+                    limiter.pause(min(self.max_backoff, retry_after(response.headers.get('Retry-After'), delay)))
+                else:
+                    time.sleep(delay)
+                self._record(retries=1)
+                response.close()
+                continue
+            text = response.text
+            page = Page(task, response.status_code, text, dict(response.headers),
+                        time.perf_counter() - started, attempt)
+            if response.status_code >= 400:
+                page.error = f'HTTP {response.status_code}'
+            self._record(pages=1, errors=int(page.error is not None), bytes=len(response.content))
+            return page
+
+    def crawl(self, tasks: Iterable[FetchTask]) -> Iterator[Page]:
+        """Fetch ``tasks`` concurrently, yielding pages as they complete.
+
+        At most ``2 * max_workers`` requests are queued at once, so a long
+        task list is consumed lazily rather than submitted up front.
+        """
+        started = time.perf_counter()
+        pending: deque[Future] = deque()
+        task_iter = iter(tasks)
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix='crawl') as pool:
+            try:
+                for task in task_iter:
+                    pending.append(pool.submit(self.fetch, task))
+                    if len(pending) >= 2 * self.max_workers:
+                        break
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+                        task = next(task_iter, None)
+                        if task is not None:
+                            pending.append(pool.submit(self.fetch, task))
+            finally:
+                for future in pending:
+                    future.cancel()
+                with self._stats_lock:
+                    self.stats.elapsed += time.perf_counter() - started
@@ -0,0 +1,236 @@
+"""Inverted index over job postings for the dashboard search box and filters.
+
+Every posting gets a dense document number. Each text term and each
+categorical facet value maps to a bitmap (a Python ``int`` with bit ``n`` set
+for document ``n``), so a query is a handful of C-level ``&``/``|`` operations
+followed by decoding only the set bits of the result.
+
+Text matching is token based: every query token must appear in one of the
+searched fields, and the last token also matches as a prefix so results
+update sensibly while the user is still typing.
+
+Postings themselves are kept as ``jobscope.records`` rows, not dicts, and
+results come back as ``JobRecord`` views; pass ``text_path`` to keep their
+descriptions and apply links on disk until a result is read.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence
+
+from .jobs import Job, role_family
+from .records import JobRecord, JobRecords
+from .salary import SALARY_FILTER, ParsedSalary, in_salary_range, parse_salary, parse_salary_range
+from .telemetry import span
+
+TEXT_FIELDS = ('title', 'company', 'location', 'description')
+FACETS = ('country', 'workType', 'experience', 'role', 'platform', 'salary')
+
+# Dashboard filter keys and the facet each one selects on.
+FILTER_FACETS = {
+    'role': 'role',
+    'location': 'country',
+    'workType': 'workType',
+    'experience': 'experience',
+    'platform': 'platform',
+}
+
+_TOKEN_RE = re.compile(r'\w+')
+_NONZERO_BYTE_RE = re.compile(rb'[^\x00]')
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def bitmap_positions(bitmap: int) -> Iterator[int]:
+    """Yield the set bit positions of ``bitmap`` in ascending order.
+
+    Zero bytes are skipped by the regex engine, so the Python-level work is
+    proportional to the number of set bits rather than the bitmap width.
+    """
+    if not bitmap:
+        return
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for match in _NONZERO_BYTE_RE.finditer(data):
+        base = match.start() * 8
+        for bit in _BYTE_BITS[data[base >> 3]]:
+            yield base + bit
+
+
+def bitmap_from_positions(positions: Sequence[int]) -> int:
+    """Build a bitmap with the given bits set."""
+    if len(positions) < 64:
+        bitmap = 0
+        for position in positions:
+            bitmap |= 1 << position
+        return bitmap
+    data = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, 'little')
+
+
+def facet_value(job: Mapping[str, Any], facet: str) -> Optional[str]:
+    if facet == 'role':
+        return role_family(job['title'])
+    return job.get(facet)
+
+
+class JobSearchIndex:
+    """Token and facet bitmaps over a growing list of postings."""
+
+    def __init__(self, jobs: Iterable[Job] = (), text_path: Optional[str] = None):
+        self._records = JobRecords(text_path)
+        self._doc_by_id: dict[str, int] = {}
+        self._terms: dict[str, dict[str, int]] = {field: {} for field in TEXT_FIELDS}
+        self._facets: dict[str, dict[str, int]] = {facet: {} for facet in FACETS}
+        self._vocabulary: Optional[list[str]] = None
+        # Salary text -> parsed bounds, for the ``salaryRange`` filter.
+        self._salaries: dict[str, ParsedSalary] = {}
+        self._live = 0
+        # Document numbers added since the last query, keyed by the posting
+        # list they belong to. OR-ing one bit at a time into a wide int is
+        # O(corpus) per add, so additions are batched and folded in on read.
+        self._pending: dict[tuple[str, str, str], list[int]] = {}
+        self._pending_live: list[int] = []
+        for job in jobs:
+            self.add(job)
+
+    def __len__(self) -> int:
+        self._flush()
+        return self._live.bit_count()
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._doc_by_id
+
+    def add(self, job: Job) -> int:
+        """Index ``job`` and return its document number.
+
+        Re-adding a posting with a known ``id`` replaces the old version.
+        """
+        self.remove(job['id'])
+        doc = self._records.append(job)
+        pending = self._pending
+        self._doc_by_id[job['id']] = doc
+        self._pending_live.append(doc)
+        for field in TEXT_FIELDS:
+            postings = self._terms[field]
+            for term in set(tokenize(job.get(field) or '')):
+                if term not in postings:
+                    postings[term] = 0
+                    self._vocabulary = None
+                pending.setdefault(('t', field, term), []).append(doc)
+        for facet in FACETS:
+            value = facet_value(job, facet)
+            if value is not None:
+                self._facets[facet].setdefault(value, 0)
+                pending.setdefault(('f', facet, value), []).append(doc)
+        return doc
+
+    def _flush(self) -> None:
+        if not self._pending_live:
+            return
+        with span('index.flush'):
+            for (kind, name, key), docs in self._pending.items():
+                table = self._terms[name] if kind == 't' else self._facets[name]
+                table[key] |= bitmap_from_positions(docs)
+            self._live |= bitmap_from_positions(self._pending_live)
+        self._pending.clear()
+        self._pending_live.clear()
+
+    def remove(self, job_id: str) -> bool:
+        """Drop a posting from all future results."""
+        doc = self._doc_by_id.pop(job_id, None)
+        if doc is None:
+            return False
+        self._flush()
+        self._live &= ~(1 << doc)
+        return True
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        doc = self._doc_by_id.get(job_id)
+        return None if doc is None else self._records[doc]
+
+    def memory_usage(self) -> int:
+        """Bytes held by the stored postings; see ``JobRecords.memory_usage``."""
+        return self._records.memory_usage()
+
+    def facet_values(self, facet: str) -> list[str]:
+        self._flush()
+        return sorted(value for value, bitmap in self._facets[facet].items() if bitmap & self._live)
+
+    def _salary_bitmap(self, value: str) -> int:
+        """Documents whose salary overlaps the ``salaryRange`` value; one check per distinct salary text."""
+        bounds = parse_salary_range(value)
+        bitmap = 0
+        for text, docs in self._facets['salary'].items():
+            salary = self._salaries.get(text)
+            if salary is None:
+                salary = self._salaries[text] = parse_salary(text)
+            if in_salary_range(salary, bounds):
+                bitmap |= docs
+        return bitmap
+
+    def _term_bitmap(self, token: str, fields: Sequence[str], prefix: bool) -> int:
+        bitmap = 0
+        if prefix:
+            if self._vocabulary is None:
+                self._vocabulary = sorted({term for field in TEXT_FIELDS for term in self._terms[field]})
+            vocabulary = self._vocabulary
+            start = bisect.bisect_left(vocabulary, token)
+            end = bisect.bisect_left(vocabulary, token + '\U0010ffff', start)
+            terms = vocabulary[start:end]
+        else:
+            terms = [token]
+        for field in fields:
+            postings = self._terms[field]
+            for term in terms:
+                bitmap |= postings.get(term, 0)
+        return bitmap
+
+    def match(self, query: str = '', filters: Optional[Mapping[str, str]] = None,
+              fields: Sequence[str] = TEXT_FIELDS) -> int:
+        """Return the bitmap of documents matching ``query`` and ``filters``.
+
+        ``filters`` uses the dashboard keys (``role``, ``location``,
+        ``workType``, ``experience``, ``salaryRange``); ``'all'`` or a
+        missing key means no restriction on that facet. Other keys raise
+        ``ValueError`` rather than being ignored.
+        """
+        self._flush()
+        result = self._live
+        for key, value in (filters or {}).items():
+            if value == 'all':
+                continue
+            if key == SALARY_FILTER:
+                result &= self._salary_bitmap(value)
+            elif key in FILTER_FACETS:
+                result &= self._facets[FILTER_FACETS[key]].get(value, 0)
+            else:
+                raise ValueError(f'unknown filter {key!r}')
+            if not result:
+                return 0
+        tokens = tokenize(query)
+        for position, token in enumerate(tokens):
+            result &= self._term_bitmap(token, fields, prefix=position == len(tokens) - 1)
+            if not result:
+                return 0
+        return result
+
+    def search_docs(self, query: str = '', filters: Optional[Mapping[str, str]] = None,
+                    fields: Sequence[str] = TEXT_FIELDS) -> Iterator[int]:
+        return bitmap_positions(self.match(query, filters, fields))
+
+    def search(self, query: str = '', filters: Optional[Mapping[str, str]] = None,
+               fields: Sequence[str] = TEXT_FIELDS) -> list[JobRecord]:
+        """Matching postings in insertion order, like ``filteredJobs``."""
+        return [JobRecord(self._records, doc) for doc in self.search_docs(query, filters, fields)]
+
+    def count(self, query: str = '', filters: Optional[Mapping[str, str]] = None,
+              fields: Sequence[str] = TEXT_FIELDS) -> int:
+        return self.match(query, filters, fields).bit_count()
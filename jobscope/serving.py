@@ -0,0 +1,211 @@
+"""Multi-process serving: one writer publishes corpus segments, many readers map them.
+
+Each Streamlit worker holding its own ``JobStore`` and indexes costs a
+full copy per worker. Instead, one writer process owns ingestion and
+publishes every new dataset as an immutable segment: a ``jobscope.snapshot``
+file named after a monotonically increasing version. Readers map the
+current segment read-only, so every worker's columns and index arrays are
+views of the same page-cache pages, and per-worker memory is only the small
+Python structures rebuilt around them.
+
+Publishing is two atomic steps:
+
+1. the segment is written under a temporary name, synced and renamed to
+   ``segment-<version>.snap``; it is never modified afterwards;
+2. the ``CURRENT`` pointer file naming that segment is replaced the same
+   way.
+
+A reader that sees the new pointer therefore always finds a complete
+segment, and one that read the old pointer still opens the old, complete
+file. ``SegmentReader.refresh`` attaches to a new version and installs it
+with ``JobCache.swap``, so requests already running keep the store they
+started with. The writer keeps the newest ``keep`` segments; deleting an
+older one does not disturb readers that still map it, since the pages stay
+valid until they unmap.
+
+Wire it up with::
+
+    # writer process
+    publisher = SegmentPublisher('segments')
+    retention = RetentionStore(on_publish=publisher.publish)
+    retention.start()
+
+    # each worker
+    reader = SegmentReader('segments')
+    reader.start()
+    cache = reader.cache
+
+Reader caches are ``read_only``: ``upsert`` and ``expire`` belong to the
+writer and raise ``RuntimeError`` in a worker, which would otherwise drift
+from the published data until the next swap.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .cache import JobCache
+from .snapshot import open_snapshot, save_cache
+from .store import JobStore
+from .telemetry import count, observe
+
+CURRENT = 'CURRENT'
+SEGMENT_NAME = 'segment-{version:08d}.snap'
+SEGMENT_PATTERN = re.compile(r'segment-(\d{8})\.snap$')
+KEEP_SEGMENTS = 3
+POLL_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class Segment:
+    version: int
+    path: str
+    rows: int
+    seconds: float
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        handle = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(handle)
+    finally:
+        os.close(handle)
+
+
+def segment_versions(directory: str) -> list[int]:
+    """Versions of the segments present in ``directory``, oldest first."""
+    return sorted(int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(directory)) if match)
+
+
+def current_segment(directory: str) -> Optional[tuple[int, str]]:
+    """The published version and its segment path, or ``None`` before the first publish."""
+    try:
+        with open(os.path.join(directory, CURRENT)) as handle:
+            pointer = json.load(handle)
+    except FileNotFoundError:
+        return None
+    return pointer['version'], os.path.join(directory, pointer['segment'])
+
+
+class SegmentPublisher:
+    """The writer side: turns each new dataset into an immutable, versioned segment."""
+
+    def __init__(self, directory: str, keep: int = KEEP_SEGMENTS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.version = max(segment_versions(directory), default=0)
+        self._lock = threading.Lock()
+
+    def publish(self, store: JobStore) -> Segment:
+        """Build ``store``'s indexes, write them as the next segment and point readers at it.
+
+        Matches ``RetentionStore.on_publish``, so compactions publish
+        directly.
+        """
+        started = time.perf_counter()
+        cache = JobCache(loader=lambda: store, dataset_ttl=None, analytics_ttl=None)
+        with self._lock:
+            version = self.version + 1
+            name = SEGMENT_NAME.format(version=version)
+            path = os.path.join(self.directory, name)
+            save_cache(cache, path, label=f'v{version}')
+            pointer = os.path.join(self.directory, CURRENT)
+            temporary = f'{pointer}.{os.getpid()}.tmp'
+            with open(temporary, 'w') as handle:
+                json.dump({'version': version, 'segment': name, 'rows': len(store)}, handle)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, pointer)
+            _fsync_directory(self.directory)
+            self.version = version
+            self._prune()
+        segment = Segment(version, path, len(store), time.perf_counter() - started)
+        observe('serving.publish', segment.seconds)
+        return segment
+
+    def _prune(self) -> None:
+        for version in segment_versions(self.directory)[:-self.keep]:
+            try:
+                os.remove(os.path.join(self.directory, SEGMENT_NAME.format(version=version)))
+            except FileNotFoundError:
+                pass
+
+
+class SegmentReader:
+    """A worker's view of the published segments, swapped in as new versions appear.
+
+    ``cache_options`` go to the reader's ``JobCache``. The dataset and the
+    restored indexes never expire; they change only when ``refresh`` finds
+    a newer version.
+    """
+
+    def __init__(self, directory: str, *, poll_interval: float = POLL_INTERVAL, **cache_options: Any):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.version = 0
+        options = {'dataset_ttl': None, 'analytics_ttl': None, **cache_options, 'read_only': True}
+        self.cache = JobCache(loader=JobStore, **options)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self.refresh()
+
+    def __enter__(self) -> 'SegmentReader':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def refresh(self) -> bool:
+        """Attach to the published version if it is newer; return whether it was."""
+        with self._lock:
+            missing = None
+            while True:
+                pointer = current_segment(self.directory)
+                if pointer is None or pointer[0] <= self.version:
+                    return False
+                version, path = pointer
+                if version == missing:
+                    # The pointer names a segment that is not there; keep the
+                    # attached version and try again on the next poll.
+                    count('serving.missing_segments')
+                    return False
+                try:
+                    snapshot = open_snapshot(path, mode='r')
+                except FileNotFoundError:
+                    # Usually pruned between reading the pointer and opening
+                    # it, with a newer pointer already in place.
+                    missing = version
+                    continue
+                snapshot.install(self.cache)
+                self.version = version
+                count('serving.swaps')
+                return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def start(self) -> None:
+        """Check for new versions in the background every ``poll_interval`` seconds."""
+        if self._poller is None:
+            self._stop.clear()
+            self._poller = threading.Thread(target=self._run, name='segment-poll', daemon=True)
+            self._poller.start()
+
+    def close(self) -> None:
+        if self._poller is not None:
+            self._stop.set()
+            self._poller.join()
+            self._poller = None
@@ -0,0 +1,343 @@
+"""Versioned on-disk snapshots of the store and its indexes, loaded by mapping them.
+
+A cold dashboard process would otherwise rebuild everything it shows first:
+the store's columns, the page orders, the analytics cube, the
+BM25 postings and the salary summary. ``write_snapshot`` saves all of them
+to one file. ``open_snapshot`` maps that file and rebuilds each component
+around views of the mapping, so loading costs the header parse plus a few
+small Python structures, and pages are read from disk only when touched.
+
+Layout: a fixed prelude (magic, format version, header offset and length),
+then every array at a 64-byte aligned offset, then a JSON header that names
+each array's dtype, shape and offset and holds the components' small state.
+
+* Numeric and datetime columns are stored as their raw values.
+* Categoricals are stored as their codes plus their categories.
+* Text is stored as Arrow string buffers (offsets, UTF-8 data and a
+  validity bitmap when there are missing values). With pyarrow installed,
+  they come back as Arrow strings over the mapping without a copy.
+
+The file is written to a temporary name, synced and renamed into place, so
+readers see either the previous snapshot or the complete new one. A
+snapshot with a different ``SNAPSHOT_FORMAT`` is refused rather than
+misread; rebuild it from the source data instead.
+
+``save_cache`` and ``load_cache`` snapshot and restore a ``JobCache``::
+
+    save_cache(cache, 'jobs.snap')
+    cache = load_cache('jobs.snap')   # in the dashboard process
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import struct
+import threading
+from typing import Any, BinaryIO, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .analytics import AnalyticsCube
+from .cache import JobCache
+from .pagination import SORT_FIELDS, Paginator, SortedView
+from .ranking import BM25Index
+from .store import TEXT_DTYPE, JobStore
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+SNAPSHOT_FORMAT = 1
+MAGIC = b'JOBSNAP\0'
+ALIGNMENT = 64
+# magic, format, reserved, header offset, header length
+PRELUDE = struct.Struct('<8sIIQQ')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f'cannot store {type(value).__name__} in a snapshot header')
+
+
+class _Writer:
+    """Appends aligned arrays to an open file and records where each one went."""
+
+    def __init__(self, handle: BinaryIO):
+        self.handle = handle
+        self.arrays: dict[str, dict[str, Any]] = {}
+        self._columns: dict[int, tuple[Any, dict[str, Any]]] = {}
+        handle.write(b'\0' * PRELUDE.size)
+
+    def array(self, name: str, values: np.ndarray) -> str:
+        values = np.ascontiguousarray(values)
+        if values.dtype.hasobject:
+            raise TypeError(f'{name}: object arrays cannot be stored raw')
+        offset = -self.handle.tell() % ALIGNMENT
+        self.handle.write(b'\0' * offset)
+        self.arrays[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': self.handle.tell()}
+        self.handle.write(memoryview(values.reshape(-1).view(np.uint8)))
+        return name
+
+    def column(self, name: str, values: Any) -> dict[str, Any]:
+        """Store a column (or a list of strings) and return the spec that restores it."""
+        if not isinstance(values, (pd.Series, pd.Index)):
+            values = pd.Series(values, dtype=TEXT_DTYPE if not isinstance(values, np.ndarray) else None)
+        # Columns shared between components (the store's ids are the cube's
+        # posting ids) are written once.
+        key = id(values.array)
+        if key in self._columns:
+            return self._columns[key][1]
+        dtype = values.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            spec = {'kind': 'category', 'ordered': bool(dtype.ordered),
+                    'codes': self.array(f'{name}/codes', values.array.codes),
+                    'categories': self.column(f'{name}/categories', pd.Series(dtype.categories))}
+        elif isinstance(dtype, np.dtype) and not dtype.hasobject:
+            spec = {'kind': 'array', 'values': self.array(name, values.to_numpy())}
+        else:
+            spec = {'kind': 'text', 'dtype': str(dtype), **self._text(name, values)}
+        # Holding the array keeps its id from being reused by a later column.
+        self._columns[key] = (values.array, spec)
+        return spec
+
+    def _text(self, name: str, values: Any) -> dict[str, Any]:
+        if pa is not None:
+            strings = pa.array(values.array if isinstance(values, pd.Series) else values, from_pandas=True)
+            if isinstance(strings, pa.ChunkedArray):
+                strings = strings.combine_chunks()
+            if not (pa.types.is_string(strings.type) or pa.types.is_large_string(strings.type)):
+                strings = strings.cast(pa.large_string())
+            width = np.int64 if pa.types.is_large_string(strings.type) else np.int32
+            _, offsets, data = strings.buffers()
+            offsets = np.frombuffer(offsets, dtype=width)[strings.offset:strings.offset + len(strings) + 1]
+            data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, np.uint8)
+            data = data[offsets[0]:offsets[-1]]
+            offsets = offsets - offsets[0]
+            valid = strings.is_valid().to_numpy(zero_copy_only=False) if strings.null_count else None
+        else:
+            encoded = [None if pd.isna(value) else str(value).encode() for value in values]
+            lengths = np.fromiter((len(value or b'') for value in encoded), dtype=np.int64, count=len(encoded))
+            offsets = np.concatenate([[0], np.cumsum(lengths)])
+            data = np.frombuffer(b''.join(value or b'' for value in encoded), dtype=np.uint8)
+            valid = np.fromiter((value is not None for value in encoded), dtype=bool, count=len(encoded))
+            valid = valid if not valid.all() else None
+        spec = {'length': len(offsets) - 1, 'offsets': self.array(f'{name}/offsets', offsets),
+                'data': self.array(f'{name}/data', data)}
+        if valid is not None:
+            spec['nulls'] = int(len(valid) - valid.sum())
+            spec['valid'] = self.array(f'{name}/valid', np.packbits(valid, bitorder='little'))
+        return spec
+
+    def group(self, prefix: str, values: Mapping[str, Any]) -> dict[str, Any]:
+        """Store a component's arrays; plain arrays stay arrays, anything else becomes a column."""
+        specs = {}
+        for name, value in values.items():
+            if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+                specs[name] = {'kind': 'array', 'values': self.array(f'{prefix}/{name}', value)}
+            else:
+                specs[name] = self.column(f'{prefix}/{name}', value)
+        return specs
+
+
+def write_snapshot(path: str, store: JobStore, *, bm25: Optional[BM25Index] = None,
+                   cube: Optional[AnalyticsCube] = None,
+                   views: Optional[Mapping[tuple[str, bool], SortedView]] = None,
+                   salary_summary: Optional[Mapping[str, Any]] = None,
+                   label: Optional[str] = None) -> dict[str, Any]:
+    """Write ``store`` and the given indexes to ``path`` atomically; return the manifest.
+
+    ``views`` maps ``(sort, descending)`` to a ``Paginator`` view of
+    ``store``. Everything passed must describe the same version of
+    ``store``.
+    """
+    frame = store.frame
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0:
+        raise ValueError('snapshots need a store frame with a default index')
+    created = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    header: dict[str, Any] = {
+        'manifest': {'format': SNAPSHOT_FORMAT, 'label': label or created, 'created': created,
+                     'rows': len(frame), 'components': ['store']},
+    }
+    temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temporary, 'wb') as handle:
+            writer = _Writer(handle)
+            header['store'] = [[name, writer.column(f'store/{name}', frame[name])] for name in frame.columns]
+            if views:
+                header['views'] = [[sort, descending, writer.group(f'views/{sort}/{int(descending)}', {
+                    'order': view.order, 'keys': view.keys, 'id_ranks': view.id_ranks,
+                    'ids': pd.Series(view.ids, dtype=TEXT_DTYPE)})]
+                    for (sort, descending), view in views.items()]
+            if bm25 is not None:
+                state, arrays = bm25.snapshot_arrays()
+                header['bm25'] = {'state': state, 'arrays': writer.group('bm25', arrays)}
+            if cube is not None:
+                state, arrays = cube.snapshot_arrays()
+                header['cube'] = {'state': state, 'arrays': writer.group('cube', arrays)}
+            if salary_summary is not None:
+                header['salary_summary'] = salary_summary
+            header['manifest']['components'] += [name for name in ('views', 'bm25', 'cube', 'salary_summary')
+                                                 if name in header]
+            header['arrays'] = writer.arrays
+            encoded = json.dumps(header, default=_json_default, separators=(',', ':')).encode()
+            offset = handle.tell()
+            handle.write(encoded)
+            handle.seek(0)
+            handle.write(PRELUDE.pack(MAGIC, SNAPSHOT_FORMAT, 0, offset, len(encoded)))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return header['manifest']
+
+
+class Snapshot:
+    """A snapshot file mapped into memory; each component is rebuilt on first use.
+
+    ``mode='c'`` maps the file copy-on-write, so the restored store and cube
+    accept writes that stay private to this process. ``mode='r'`` maps it
+    read-only, for processes that only serve reads and should share the
+    file's pages.
+    """
+
+    def __init__(self, path: str, mode: str = 'c'):
+        self.path = path
+        self.buffer = np.memmap(path, dtype=np.uint8, mode=mode)
+        magic, version, _, offset, length = PRELUDE.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a job snapshot')
+        if version != SNAPSHOT_FORMAT:
+            raise ValueError(f'{path} has snapshot format {version}, expected {SNAPSHOT_FORMAT}')
+        self.header = json.loads(bytes(self.buffer[offset:offset + length]))
+        self._lock = threading.RLock()
+        self._built: dict[str, Any] = {}
+
+    @property
+    def manifest(self) -> dict[str, Any]:
+        return self.header['manifest']
+
+    def array(self, name: str) -> np.ndarray:
+        """A view of one stored array over the mapping."""
+        spec = self.header['arrays'][name]
+        dtype = np.dtype(spec['dtype'])
+        size = int(np.prod(spec['shape'], dtype=np.int64)) * dtype.itemsize
+        values = self.buffer[spec['offset']:spec['offset'] + size]
+        return np.ndarray(spec['shape'], dtype=dtype, buffer=values)
+
+    def column(self, spec: Mapping[str, Any]) -> Any:
+        if spec['kind'] == 'array':
+            return self.array(spec['values'])
+        if spec['kind'] == 'category':
+            categories = pd.Index(self.column(spec['categories']))
+            dtype = pd.CategoricalDtype(categories, ordered=spec['ordered'])
+            return pd.Categorical.from_codes(self.array(spec['codes']), dtype=dtype, validate=False)
+        return self._text(spec)
+
+    def _text(self, spec: Mapping[str, Any]) -> Any:
+        offsets, data = self.array(spec['offsets']), self.array(spec['data'])
+        valid = self.array(spec['valid']) if 'valid' in spec else None
+        if pa is not None:
+            kind = pa.large_string() if offsets.dtype == np.int64 else pa.string()
+            buffers = [pa.py_buffer(valid) if valid is not None else None, pa.py_buffer(offsets), pa.py_buffer(data)]
+            strings = pa.Array.from_buffers(kind, spec['length'], buffers, spec.get('nulls', 0))
+            values = pd.arrays.ArrowStringArray(pa.chunked_array([strings]))
+        else:
+            raw = data.tobytes()
+            values = np.array([raw[start:end].decode() for start, end in zip(offsets[:-1].tolist(),
+                                                                             offsets[1:].tolist())], dtype=object)
+            if valid is not None:
+                values[~np.unpackbits(valid, count=spec['length'], bitorder='little').astype(bool)] = None
+        return values if spec['dtype'] == str(values.dtype) else pd.array(values).astype(spec['dtype'])
+
+    def _group(self, specs: Mapping[str, Any]) -> dict[str, Any]:
+        return {name: self.column(spec) for name, spec in specs.items()}
+
+    def _once(self, name: str, build) -> Any:
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = build()
+            return self._built[name]
+
+    def store(self) -> JobStore:
+        """The saved store, its columns backed by the mapping."""
+        def build() -> JobStore:
+            columns = {name: self.column(spec) for name, spec in self.header['store']}
+            return JobStore(pd.DataFrame(columns, copy=False))
+        return self._once('store', build)
+
+    def paginator(self) -> Paginator:
+        """A paginator over ``store()`` with the saved page orders installed."""
+        def build() -> Paginator:
+            store = self.store()
+            paginator = Paginator(store)
+            for sort, descending, specs in self.header.get('views', ()):
+                arrays = self._group(specs)
+                paginator.add_view(sort, descending, SortedView(arrays['order'], arrays['keys'], arrays['id_ranks'],
+                                                                store.frame['id'], arrays.get('ids')))
+            return paginator
+        return self._once('paginator', build)
+
+    def bm25(self) -> Optional[BM25Index]:
+        if 'bm25' not in self.header:
+            return None
+        saved = self.header['bm25']
+        return self._once('bm25', lambda: BM25Index.from_snapshot(self.store(), saved['state'],
+                                                                  self._group(saved['arrays'])))
+
+    def cube(self) -> Optional[AnalyticsCube]:
+        if 'cube' not in self.header:
+            return None
+        saved = self.header['cube']
+        return self._once('cube', lambda: AnalyticsCube.from_snapshot(saved['state'], self._group(saved['arrays'])))
+
+    @property
+    def salary_summary(self) -> Optional[dict[str, Any]]:
+        return self.header.get('salary_summary')
+
+    def install(self, cache: JobCache) -> None:
+        """Publish this snapshot as ``cache``'s dataset, with its indexes prebuilt."""
+        built = {'paginator': self.paginator(), 'cube': self.cube(), 'bm25': self.bm25(),
+                 'salary-summary': self.salary_summary}
+        cache.swap(self.store(), warm=(), built={name: value for name, value in built.items() if value is not None})
+
+
+def open_snapshot(path: str, mode: str = 'c') -> Snapshot:
+    """Map the snapshot at ``path``; see ``Snapshot`` for ``mode``."""
+    return Snapshot(path, mode)
+
+
+def save_cache(cache: JobCache, path: str, label: Optional[str] = None) -> dict[str, Any]:
+    """Snapshot ``cache``'s dataset with its page orders, cube, BM25 index and salary summary.
+
+    Every sort field's descending order is saved, as those are the orders
+    the dashboard offers.
+    """
+    store = cache.store()
+    paginator = cache.paginator()
+    return write_snapshot(path, store, bm25=cache.bm25(), cube=cache.analytics_cube(),
+                          views={(sort, True): paginator.view(sort, True) for sort in SORT_FIELDS},
+                          salary_summary=cache.salary_summary(), label=label)
+
+
+def load_cache(path: str, mode: str = 'c', **options: Any) -> JobCache:
+    """A ``JobCache`` serving the snapshot at ``path`` until something swaps in a new dataset.
+
+    ``options`` go to ``JobCache``; by default neither the dataset nor the
+    restored indexes expire, since rebuilding them is what the snapshot
+    avoids, and a ``mode='r'`` cache is ``read_only``.
+    """
+    snapshot = open_snapshot(path, mode)
+    options = {'dataset_ttl': None, 'analytics_ttl': None, 'read_only': mode == 'r', **options}
+    cache = JobCache(loader=snapshot.store, **options)
+    snapshot.install(cache)
+    return cache
@@ -0,0 +1,216 @@
+"""Columnar job store on a pandas DataFrame.
+
+Low-cardinality fields (country, workType, experience, platform, company,
+title, ...) are categoricals, so each posting holds a small integer code per
+field instead of its own string. ``rating`` and ``postedDate`` are numeric
+columns, and the salary text is parsed into ``salaryMin``/``salaryMax``/
+``salaryCurrency`` at ingest (see ``jobscope.salary``).
+Free text (``id``, ``applyLink``, ``description``) is dictionary-encoded when
+it repeats and stored as Arrow strings otherwise.
+
+Predicates on categorical columns are evaluated once per category and then
+broadcast through the codes, so a filter touches each distinct value once
+and each row only as an integer lookup.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .jobs import DEFAULT_FILTERS, Job, role_family
+from .salary import SALARY_FILTER, in_salary_range, parse_salary, parse_salary_range, salary_columns
+from .telemetry import timed
+
+CATEGORICAL_COLUMNS = ('title', 'company', 'location', 'country', 'workType', 'experience',
+                       'platform', 'role', 'salary')
+TEXT_COLUMNS = ('id', 'applyLink', 'description')
+SEARCH_COLUMNS = ('title', 'company', 'location')
+JOB_COLUMNS = ('id', 'title', 'company', 'location', 'country', 'workType', 'experience', 'salary',
+               'platform', 'rating', 'postedDate', 'description', 'applyLink')
+
+# Dashboard filter keys and the column each one selects on.
+FILTER_COLUMNS = {
+    'role': 'role',
+    'location': 'country',
+    'workType': 'workType',
+    'experience': 'experience',
+    'platform': 'platform',
+}
+SORT_KEYS = ('postedDate', 'rating', 'salaryMax', 'salaryMin')
+
+# Text columns whose distinct values cover at most this share of the rows
+# are stored as categoricals as well.
+DICTIONARY_RATIO = 0.5
+
+try:
+    TEXT_DTYPE: Any = pd.StringDtype('pyarrow')
+except ImportError:  # pragma: no cover - pyarrow is optional
+    TEXT_DTYPE = pd.StringDtype()
+
+
+def _category_table(column: pd.Series, fn) -> tuple[np.ndarray, np.ndarray]:
+    """``fn`` evaluated once per category, plus the codes to broadcast it with.
+
+    The table has one extra trailing entry for missing values, which code
+    ``-1`` indexes.
+    """
+    table = np.array([fn(category) for category in column.cat.categories] + [fn(None)])
+    return column.cat.codes.to_numpy(), table
+
+
+def _encode_text(values: pd.Series) -> pd.Series:
+    if len(values) and values.nunique() <= DICTIONARY_RATIO * len(values):
+        return values.astype('category')
+    return values.astype(TEXT_DTYPE)
+
+
+def jobs_frame(jobs: Iterable[Job]) -> pd.DataFrame:
+    """Build the store's column layout from job records."""
+    frame = pd.DataFrame.from_records(list(jobs), columns=list(JOB_COLUMNS))
+    frame['role'] = frame['title'].map(role_family)
+    for column in CATEGORICAL_COLUMNS:
+        frame[column] = frame[column].astype('category')
+    for column in TEXT_COLUMNS:
+        frame[column] = _encode_text(frame[column])
+    frame['rating'] = pd.to_numeric(frame['rating'], errors='coerce').astype('float32')
+    frame['postedDate'] = pd.to_datetime(frame['postedDate'], errors='coerce').astype('datetime64[s]')
+    return frame.join(salary_columns(frame['salary']))
+
+
+def _align_categories(frames: Sequence[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Give every categorical column the same categories so ``concat`` keeps the dtype."""
+    frames = [frame.copy(deep=False) for frame in frames]
+    for column in frames[0].columns:
+        if not all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            continue
+        categories = pd.Index(frames[0][column].cat.categories)
+        for frame in frames[1:]:
+            categories = categories.union(frame[column].cat.categories, sort=False)
+        for frame in frames:
+            frame[column] = frame[column].cat.set_categories(categories)
+    return frames
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Stack store frames, keeping categoricals and the text dtype."""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return jobs_frame([])
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    merged = pd.concat(_align_categories(frames), ignore_index=True)
+    for column in TEXT_COLUMNS:
+        if not isinstance(merged[column].dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype(TEXT_DTYPE)
+    return merged
+
+
+class JobStore:
+    """Job postings held column-wise, with vectorized filters and sorts."""
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        self.frame = frame if frame is not None else jobs_frame([])
+        # Bumped on every write so derived views know when to recompute.
+        self.version = 0
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[Job]) -> 'JobStore':
+        return cls(jobs_frame(jobs))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def memory_usage(self) -> int:
+        """Bytes held by the columns, including string payloads."""
+        return int(self.frame.memory_usage(deep=True, index=True).sum())
+
+    def upsert(self, jobs: Iterable[Job]) -> int:
+        """Insert or replace postings by ``id``; return how many were written.
+
+        Each call rewrites the columns, so pass postings in batches.
+        """
+        incoming = jobs_frame(jobs)
+        if incoming.empty:
+            return 0
+        incoming = incoming.drop_duplicates('id', keep='last')
+        kept = self.frame[~self.frame['id'].isin(incoming['id'])]
+        self.frame = concat_frames([kept, incoming])
+        self.version += 1
+        return len(incoming)
+
+    def remove(self, job_ids: Iterable[str]) -> int:
+        drop = self.frame['id'].isin(list(job_ids))
+        removed = int(drop.sum())
+        if removed:
+            self.frame = self.frame[~drop].reset_index(drop=True)
+            self.version += 1
+        return removed
+
+    def row_predicate(self, search_query: str = '',
+                      filters: Optional[Mapping[str, str]] = None) -> Callable[[Optional[np.ndarray]], np.ndarray]:
+        """Compile the search box and filters into a predicate over row positions.
+
+        Each clause is resolved to a boolean table over its column's
+        categories up front, so evaluating a batch of rows costs one integer
+        lookup per row and clause. Pass ``None`` to evaluate every row.
+        """
+        frame = self.frame
+        clauses = []
+        for key, value in (filters or DEFAULT_FILTERS).items():
+            column = FILTER_COLUMNS.get(key)
+            if column is not None and value != 'all':
+                clauses.append([_category_table(frame[column], lambda category: category == value)])
+            elif key == SALARY_FILTER and value != 'all':
+                bounds = parse_salary_range(value)
+                clauses.append([_category_table(
+                    frame['salary'],
+                    lambda category: category is not None and in_salary_range(parse_salary(category), bounds))])
+        query = search_query.lower()
+        if query:
+            clauses.append([_category_table(frame[column],
+                                            lambda category: category is not None and query in category.lower())
+                            for column in SEARCH_COLUMNS])
+
+        def predicate(rows: Optional[np.ndarray] = None) -> np.ndarray:
+            size = len(frame) if rows is None else len(rows)
+            result = np.ones(size, dtype=bool)
+            for clause in clauses:
+                hit = np.zeros(size, dtype=bool)
+                for codes, table in clause:
+                    hit |= table[codes if rows is None else codes[rows]]
+                result &= hit
+            return result
+
+        return predicate
+
+    def mask(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None) -> np.ndarray:
+        """Boolean row mask for the dashboard search box and filters."""
+        return self.row_predicate(search_query, filters)()
+
+    @timed('store.filter')
+    def filter(self, search_query: str = '', filters: Optional[Mapping[str, str]] = None,
+               sort_by: Optional[str] = None, ascending: bool = False) -> pd.DataFrame:
+        result = self.frame[self.mask(search_query, filters)]
+        if sort_by is not None:
+            result = self.sort(result, sort_by, ascending)
+        return result
+
+    @staticmethod
+    def sort(frame: pd.DataFrame, by: str = 'postedDate', ascending: bool = False) -> pd.DataFrame:
+        """Sort by one of ``SORT_KEYS``; ties keep their store order."""
+        if by not in SORT_KEYS:
+            raise ValueError(f'cannot sort by {by!r}; expected one of {SORT_KEYS}')
+        return frame.sort_values(by, ascending=ascending, kind='stable', na_position='last')
+
+    @staticmethod
+    def to_jobs(frame: pd.DataFrame) -> list[Job]:
+        """Convert rows back to the dashboard's job dicts."""
+        columns = {column: frame[column].tolist() for column in JOB_COLUMNS}
+        columns['postedDate'] = frame['postedDate'].dt.strftime('%Y-%m-%d').tolist()
+        columns['rating'] = [round(rating, 1) for rating in frame['rating'].astype(float).tolist()]
+        rows = zip(*(columns[column] for column in JOB_COLUMNS))
+        return [{column: None if value != value else value for column, value in zip(JOB_COLUMNS, row)}
+                for row in rows]
@@ -0,0 +1,413 @@
+"""Span timers, counters and a sampling profiler for the pipeline's hot paths.
+
+The dashboard used to hide all of its latency behind a fixed one-second
+``setTimeout``, so nobody could tell whether a slow load was scraping,
+parsing, filtering or salary math. The modules on those paths now time
+themselves here:
+
+* ``span(name)`` and the ``timed(name)`` decorator record wall time into a
+  per-name ``Histogram``. Buckets are fixed and log-spaced from 1 µs to
+  about a minute, at √2 apart, so recording a sample is a bisect and an
+  increment, and quantiles are read back to within one bucket.
+* ``count(name, n)`` adds to a monotonic counter.
+
+Everything aggregates in memory in a process-wide ``Telemetry``.
+``prometheus_text`` renders it in the Prometheus text exposition format,
+and ``render_admin`` draws it on a Streamlit admin page. Spans sit around
+whole operations (a page fetch, a filter, a salary summary, a database
+transaction), never per row. A span costs a couple of microseconds and
+takes no lock, so recording stays far below the operations it measures;
+``disable()`` reduces it to one attribute check.
+
+``SamplingProfiler`` is opt-in. A daemon thread snapshots every thread's
+Python stack through ``sys._current_frames`` every ``interval`` seconds.
+It writes the samples as collapsed stacks (``a;b;c count`` per line),
+which ``flamegraph.pl``, speedscope and inferno read directly.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from threading import get_ident
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Upper bounds in seconds: 1 µs * √2^i, up to about 67 s.
+BUCKETS = tuple(1e-6 * math.sqrt(2) ** index for index in range(53))
+QUANTILES = (0.5, 0.95, 0.99)
+PROFILE_INTERVAL = 0.01
+
+
+@dataclass
+class SpanStats:
+    name: str
+    count: int
+    total: float
+    max: float
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Histogram:
+    """Counts of durations per fixed log-spaced bucket, plus their sum and max.
+
+    Each thread writes to its own shard, so recording takes no lock; readers
+    add the shards up.
+    """
+
+    __slots__ = ('_shards', '_lock')
+
+    def __init__(self):
+        # Thread id -> bucket counts followed by the total and the maximum.
+        self._shards: dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list:
+        with self._lock:
+            return self._shards.setdefault(get_ident(), [0] * (len(BUCKETS) + 1) + [0.0, 0.0])
+
+    def observe(self, seconds: float) -> None:
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[bisect_left(BUCKETS, seconds)] += 1
+        shard[-2] += seconds
+        if seconds > shard[-1]:
+            shard[-1] = seconds
+
+    def snapshot(self) -> tuple[list[int], int, float, float]:
+        """Bucket counts, sample count, total and maximum across threads."""
+        with self._lock:
+            shards = [list(shard) for shard in self._shards.values()]
+        counts = [sum(column) for column in zip(*(shard[:-2] for shard in shards))] or [0] * (len(BUCKETS) + 1)
+        return (counts, sum(counts), sum(shard[-2] for shard in shards),
+                max((shard[-1] for shard in shards), default=0.0))
+
+    @property
+    def count(self) -> int:
+        return self.snapshot()[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shards = {}
+
+    def quantile(self, q: float) -> float:
+        counts, count, _, largest = self.snapshot()
+        return _quantile(counts, count, largest, q)
+
+
+def _quantile(counts: list[int], count: int, largest: float, q: float) -> float:
+    """Interpolate within the bucket holding the ``q``-th sample, as Prometheus does."""
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0
+    for index, bucket in enumerate(counts):
+        if bucket and seen + bucket >= rank:
+            low = BUCKETS[index - 1] if index else 0.0
+            high = BUCKETS[index] if index < len(BUCKETS) else largest
+            return min(low + (high - low) * (rank - seen) / bucket, largest)
+        seen += bucket
+    return largest
+
+
+class _Span:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self) -> '_Span':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Telemetry:
+    """Named span histograms and counters for one process."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        # Private, so sampling never advances a seeded global ``random`` sequence.
+        self._random = random.Random()
+
+    def histogram(self, name: str) -> Histogram:
+        """The histogram for ``name``; it stays valid across ``reset``."""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def span(self, name: str):
+        """Context manager timing its block into the ``name`` histogram."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self.histogram(name))
+
+    def sampled(self, share: float) -> bool:
+        """Whether to time this call, for roughly ``share`` of calls while enabled."""
+        return self.enabled and self._random.random() < share
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled and value:
+            with self._lock:
+                self._counters[name] += value
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator form of ``span``."""
+        def decorate(fn: F) -> F:
+            histogram = self.histogram(name)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def spans(self) -> list[SpanStats]:
+        """Per-span totals and quantiles, slowest total first."""
+        stats = []
+        for name, histogram in list(self._histograms.items()):
+            counts, count, total, largest = histogram.snapshot()
+            if count:
+                stats.append(SpanStats(name, count, total, largest,
+                                       *(_quantile(counts, count, largest, q) for q in QUANTILES)))
+        return sorted(stats, key=lambda entry: entry.total, reverse=True)
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            histograms = list(self._histograms.values())
+            self._counters.clear()
+            self.started = time.time()
+        for histogram in histograms:
+            histogram.clear()
+
+    def prometheus_text(self, prefix: str = 'jobscope') -> str:
+        """Spans as one ``<prefix>_span_seconds`` histogram family, counters as ``_total`` series."""
+        lines = [f'# HELP {prefix}_span_seconds Wall time of instrumented operations.',
+                 f'# TYPE {prefix}_span_seconds histogram']
+        for name, histogram in sorted(self._histograms.items()):
+            counts, count, total, _ = histogram.snapshot()
+            label = _label(name)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, counts):
+                cumulative += bucket
+                lines.append(f'{prefix}_span_seconds_bucket{{span="{label}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{prefix}_span_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {total:.9g}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {count}')
+        for name, value in self.counters().items():
+            metric = f'{prefix}_{_metric_name(name)}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(name: str) -> str:
+    return ''.join(char if char.isalnum() else '_' for char in name)
+
+
+TELEMETRY = Telemetry()
+span = TELEMETRY.span
+observe = TELEMETRY.observe
+count = TELEMETRY.count
+timed = TELEMETRY.timed
+
+
+def enable() -> None:
+    TELEMETRY.enabled = True
+
+
+def disable() -> None:
+    TELEMETRY.enabled = False
+
+
+def prometheus_text() -> str:
+    return TELEMETRY.prometheus_text()
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack on a timer and aggregates collapsed stacks."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, *, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.busy = 0.0
+        self._elapsed = 0.0
+        # (thread name, code objects root first) -> samples; labels are only
+        # formatted when the stacks are written out.
+        self._stacks: Counter[tuple] = Counter()
+        self._threads: dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running, including the current run."""
+        return self._elapsed + (time.perf_counter() - self._started if self.running else 0.0)
+
+    @property
+    def overhead(self) -> float:
+        """Share of wall time spent taking samples, which holds the GIL."""
+        return self.busy / self.elapsed if self.elapsed else 0.0
+
+    @staticmethod
+    def _label(code) -> str:
+        module = code.co_filename.rsplit('/', 1)[-1]
+        return f'{getattr(code, "co_qualname", code.co_name)} ({module}:{code.co_firstlineno})'
+
+    def sample(self) -> None:
+        """Record the current stack of every other thread once."""
+        own = get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            name = self._threads.get(ident)
+            if name is None:
+                self._threads = {thread.ident: thread.name for thread in threading.enumerate()}
+                name = self._threads.get(ident, f'thread-{ident}')
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.append(name)
+            self._stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            self.sample()
+            self.busy += time.perf_counter() - start
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._elapsed += time.perf_counter() - self._started
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest stack first."""
+        labels: dict[Any, str] = {}
+        lines = []
+        for (thread, *codes), samples in self._stacks.most_common():
+            frames = [labels.get(code) or labels.setdefault(code, self._label(code)) for code in codes]
+            lines.append(f'{";".join([thread, *frames])} {samples}\n')
+        return ''.join(lines)
+
+    def write(self, path: str) -> int:
+        """Write the collapsed stacks to ``path``; return how many distinct stacks."""
+        with open(path, 'w') as handle:
+            handle.write(self.collapsed())
+        return len(self._stacks)
+
+
+# Started and stopped from the admin page; idle until then.
+PROFILER = SamplingProfiler()
+
+
+def render_admin(telemetry: Telemetry = TELEMETRY, profiler: Optional[SamplingProfiler] = PROFILER) -> None:
+    """Draw span latencies, counters, the Prometheus dump and profiler controls in Streamlit."""
+    import pandas as pd
+    import streamlit as st
+
+    st.subheader('Pipeline timings')
+    telemetry.enabled = st.toggle('Record spans', value=telemetry.enabled)
+    st.caption(f'Since {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(telemetry.started))}.')
+    rows = [{'span': entry.name, 'count': entry.count, 'total s': round(entry.total, 3),
+             'mean ms': round(entry.mean * 1e3, 3), 'p50 ms': round(entry.p50 * 1e3, 3),
+             'p95 ms': round(entry.p95 * 1e3, 3), 'p99 ms': round(entry.p99 * 1e3, 3),
+             'max ms': round(entry.max * 1e3, 3)} for entry in telemetry.spans()]
+    st.dataframe(pd.DataFrame(rows), hide_index=True, width='stretch')
+    counters = telemetry.counters()
+    if counters:
+        st.dataframe(pd.DataFrame({'counter': list(counters), 'value': list(counters.values())}),
+                     hide_index=True)
+    left, right = st.columns(2)
+    if left.button('Reset'):
+        telemetry.reset()
+    right.download_button('Prometheus metrics', telemetry.prometheus_text(), 'metrics.txt', 'text/plain')
+    with st.expander('Prometheus text'):
+        st.code(telemetry.prometheus_text(), language='text')
+
+    if profiler is not None:
+        st.subheader('Sampling profiler')
+        if st.toggle('Sample stacks', value=profiler.running):
+            profiler.start()
+        else:
+            profiler.stop()
+        st.caption(f'{profiler.samples:,} samples over {profiler.elapsed:.1f} s at '
+                   f'{1 / profiler.interval:.0f} Hz, {profiler.overhead:.1%} of wall time spent sampling.')
+        if profiler.samples:
+            st.download_button('Collapsed stacks', profiler.collapsed(), 'profile.folded', 'text/plain')
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from jobscope.crawl_state import CrawlState, IncrementalCrawler
+from jobscope.scraper import FetchTask, Page
+
+
+class _Listings:
+    """A stand-in crawl engine serving JSON listing pages from a dict."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def tasks(self):
+        return [FetchTask(platform, 'Germany', 'all', url) for platform, url in self.pages]
+
+    def crawl(self, tasks):
+        for task in tasks:
+            jobs = [{'id': job_id, 'title': f'Role {job_id}'} for job_id in self.pages[task.platform, task.url]]
+            yield Page(task, 200, json.dumps(jobs))
+
+
+def _crawler(pages):
+    engine = _Listings(pages)
+    return engine, IncrementalCrawler(engine, CrawlState(), parse=lambda text, platform: json.loads(text))
+
+
+def test_posting_moved_to_another_page_stays_open():
+    engine, crawler = _crawler({('LinkedIn', 'p1'): ['a', 'b', 'c'], ('LinkedIn', 'p2'): ['d', 'e']})
+    assert len(crawler.refresh().upserted) == 5
+
+    # A new posting pushes 'c' onto page 2; 'e' is gone. Page 1 is crawled first.
+    engine.pages = {('LinkedIn', 'p1'): ['x', 'a', 'b'], ('LinkedIn', 'p2'): ['c', 'd']}
+    closed = []
+    result = crawler.refresh(close=closed.extend)
+    assert [job['id'] for job in result.upserted] == ['x']
+    assert result.closed == closed == ['e']
+    assert crawler.refresh().parsed == 0
+
+
+def test_closures_are_per_platform():
+    engine, crawler = _crawler({('LinkedIn', 'li-1'): ['a'], ('Xing', 'xing-1'): ['b']})
+    crawler.refresh()
+    engine.pages = {('LinkedIn', 'li-1'): [], ('Xing', 'xing-1'): ['b', 'c']}
+    result = crawler.refresh()
+    assert result.closed == ['a']
+    assert [job['id'] for job in result.upserted] == ['c']
+
+
+def test_failed_close_leaves_pages_to_reparse():
+    engine, crawler = _crawler({('LinkedIn', 'p1'): ['a', 'b']})
+    crawler.refresh()
+    engine.pages = {('LinkedIn', 'p1'): ['a']}
+
+    def fail(ids):
+        raise RuntimeError('retention store down')
+
+    with pytest.raises(RuntimeError):
+        crawler.refresh(close=fail)
+    assert crawler.refresh().closed == ['b']
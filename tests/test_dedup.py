@@ -0,0 +1,17 @@
+from benchmarks.bench_dedup import labeled_corpus, pair_scores
+from jobscope.dedup import THRESHOLD, cluster_labels, dedupe
+
+
+def test_labeled_corpus_precision_and_recall():
+    jobs, truth, hard_copies = labeled_corpus(2000, duplicate_share=0.3, hard_share=0.3, seed=3)
+    predicted = cluster_labels(jobs, threshold=THRESHOLD).tolist()
+    precision, recall = pair_scores(predicted, truth)
+    hard_recall = sum(predicted[original] == predicted[copy] for original, copy in hard_copies) / len(hard_copies)
+    assert precision >= 0.99
+    assert recall >= 0.99
+    assert hard_recall >= 0.98
+
+
+def test_dedupe_keeps_one_posting_per_label():
+    jobs, truth, _ = labeled_corpus(300, duplicate_share=0.5, hard_share=0.0, seed=5)
+    assert len(dedupe(jobs)) == len(set(truth))
@@ -0,0 +1,41 @@
+import pytest
+
+from jobscope.alerts import AlertEngine
+from jobscope.jobs import generate_job_data, matches_filters
+from jobscope.persistence import SavedSearch
+from jobscope.search_index import JobSearchIndex
+from jobscope.store import JobStore
+
+JOBS = generate_job_data(2000, seed=4)
+
+
+@pytest.mark.parametrize('salary_range', ['€60k-80k', '₹20L+', 'S$150,000', '100000-130000'])
+def test_salary_range_agrees_across_filter_paths(salary_range):
+    filters = {'salaryRange': salary_range, 'workType': 'Remote'}
+    expected = {job['id'] for job in JOBS if matches_filters(job, '', filters)}
+    assert expected
+    assert {record['id'] for record in JobSearchIndex(JOBS).search('', filters)} == expected
+    assert set(JobStore.from_jobs(JOBS).filter('', filters)['id']) == expected
+    engine = AlertEngine([SavedSearch(1, 1, '', filters)])
+    assert {job['id'] for job in JOBS if engine.match_ids(job)} == expected
+
+
+def _job(salary):
+    return {'title': 'Developer', 'company': 'Acme', 'location': 'Berlin', 'country': 'Germany',
+            'workType': 'Remote', 'experience': 'Entry Level', 'salary': salary}
+
+
+def test_salary_range_bounds():
+    assert matches_filters(_job('€60,000 - €80,000'), filters={'salaryRange': '€80k+'})
+    assert not matches_filters(_job('€60,000 - €79,000'), filters={'salaryRange': '€80k+'})
+    assert not matches_filters(_job('₹15,00,000 - ₹25,00,000'), filters={'salaryRange': '€80k+'})
+    assert matches_filters(_job('₹15,00,000 - ₹25,00,000'), filters={'salaryRange': '20L-30L'})
+    assert not matches_filters(_job('Competitive'), filters={'salaryRange': '0+'})
+
+
+def test_index_rejects_unknown_filters():
+    index = JobSearchIndex(JOBS[:10])
+    with pytest.raises(ValueError):
+        index.count('', {'salaryRange': 'plenty'})
+    with pytest.raises(ValueError):
+        index.count('', {'salary': '€60k'})
@@ -0,0 +1,23 @@
+from jobscope.persistence import UserDataStore
+from jobscope.pipeline import PipelineAnalytics
+
+JOBS = {'job-1': {'company': 'Grab', 'title': 'Data Engineer', 'country': 'Singapore'}}
+
+
+def test_events_are_folded_once_across_ingest_and_sync():
+    store = UserDataStore()
+    user = store.create_user('pipeline@example.com')
+    ids = store.track_applications([(user.id, 'job-1', 'applied', '2026-01-05', '')] * 3)
+    store.update_statuses([(ids[0], 'interviewing', '2026-01-09')])
+
+    analytics = PipelineAnalytics(JOBS.get)
+    assert analytics.ingest(store.application_events()) == 4
+    assert analytics.sync(store) == 0
+    assert analytics.ingest(store.application_events()) == 0
+
+    store.update_statuses([(ids[0], 'offer', '2026-01-20')])
+    assert analytics.sync(store) == 1
+    funnel = analytics.funnel(company='Grab')
+    assert funnel['applications'] == 3
+    assert [stage['count'] for stage in funnel['stages']] == [3, 1, 1]
+    assert analytics.time_in_stage()['interviewing']['count'] == 1
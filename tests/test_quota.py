@@ -0,0 +1,114 @@
+import random
+import sqlite3
+import threading
+import time
+
+from jobscope.persistence import PLANS, UserDataStore
+from jobscope.quota import QuotaLimiter
+
+PLAN_MIX = ('free', 'free', 'free', 'premium', 'enterprise')
+
+
+def _users(store: UserDataStore, count: int) -> list[tuple[int, str, str]]:
+    with store.transaction():
+        return [(store.create_user(f'user{i}@example.com', plan).id, plan, f'user{i}@example.com')
+                for i, plan in zip(range(count), PLAN_MIX * count)]
+
+
+def test_concurrent_checks_accept_exactly_the_limit():
+    store = UserDataStore()
+    users = _users(store, 200)
+    attempts, threads = 60, 16
+    limiter = QuotaLimiter(store, clock=lambda: 0.0, flush_interval=0.01)
+    accepted = [0] * threads
+    barrier = threading.Barrier(threads)
+    work = [(user_id, plan) for user_id, plan, _ in users for _ in range(attempts)]
+    random.Random(7).shuffle(work)
+
+    def hammer(index: int) -> None:
+        barrier.wait()
+        for user_id, plan in work[index::threads]:
+            accepted[index] += limiter.allow(user_id, plan)
+
+    with limiter:
+        workers = [threading.Thread(target=hammer, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    expected = {email: min(attempts, PLANS[plan] or attempts) for _, plan, email in users}
+    assert sum(accepted) == sum(expected.values())
+    assert {email: store.get_user(email).searches_used for email in expected} == expected
+    for user_id, plan, _ in users:
+        limit = PLANS[plan]
+        assert limiter.remaining(user_id, plan) == (None if limit is None else limit - min(attempts, limit))
+
+
+def test_quota_survives_restart():
+    store = UserDataStore()
+    user = store.create_user('restart@example.com')
+    with QuotaLimiter(store, clock=lambda: 0.0) as limiter:
+        assert sum(limiter.allow(user.id) for _ in range(7)) == 7
+
+    restarted = QuotaLimiter(store, clock=lambda: 0.0)
+    assert restarted.remaining(user.id) == PLANS['free'] - 7
+    assert sum(restarted.allow(user.id) for _ in range(10)) == PLANS['free'] - 7
+
+
+def test_saved_bucket_refills_while_down():
+    store = UserDataStore()
+    user = store.create_user('refill@example.com')
+    with QuotaLimiter(store, clock=lambda: 0.0, period=100.0) as limiter:
+        assert sum(limiter.allow(user.id) for _ in range(10)) == 10
+
+    restarted = QuotaLimiter(store, clock=lambda: 30.0, period=100.0)
+    assert restarted.remaining(user.id) == 3
+
+
+def test_workers_share_one_allowance():
+    store = UserDataStore()
+    user = store.create_user('workers@example.com')
+    first = QuotaLimiter(store, clock=lambda: 0.0)
+    second = QuotaLimiter(store, clock=lambda: 0.0)
+
+    assert sum(first.allow(user.id) for _ in range(6)) == 6
+    first.flush()
+    assert sum(second.allow(user.id) for _ in range(10)) == 4
+
+    # Both saw the user before the other flushed: each over-grants until its next flush.
+    other = store.create_user('stale@example.com')
+    first.remaining(other.id)
+    second.remaining(other.id)
+    assert sum(first.allow(other.id) for _ in range(10)) == 10
+    assert sum(second.allow(other.id) for _ in range(3)) == 3
+    first.flush()
+    second.flush()
+    assert not first.allow(other.id)
+    assert not second.allow(other.id)
+    assert first.remaining(other.id) == second.remaining(other.id) == 0
+
+
+class _FlakyStore(UserDataStore):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def spend_searches(self, spends, now):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError('database is locked')
+        return super().spend_searches(spends, now)
+
+
+def test_background_flush_survives_store_errors():
+    store = _FlakyStore(failures=2)
+    user = store.create_user('flaky@example.com')
+    with QuotaLimiter(store, clock=lambda: 0.0, flush_interval=0.01) as limiter:
+        assert sum(limiter.allow(user.id) for _ in range(4)) == 4
+        deadline = time.monotonic() + 5
+        while store.get_user(user.email).searches_used != 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert limiter.last_error is None
+    assert store.failures == 0
+    assert store.get_user(user.email).searches_used == 4
@@ -0,0 +1,29 @@
+import json
+import os
+import threading
+
+from jobscope.corpus import generate_corpus
+from jobscope.serving import CURRENT, SegmentPublisher, SegmentReader
+
+
+def test_refresh_gives_up_on_a_missing_segment(tmp_path):
+    publisher = SegmentPublisher(str(tmp_path))
+    publisher.publish(generate_corpus(200, seed=1))
+    reader = SegmentReader(str(tmp_path))
+    assert reader.version == 1
+    rows = len(reader.cache.store())
+
+    with open(os.path.join(tmp_path, CURRENT), 'w') as handle:
+        json.dump({'version': 2, 'segment': 'segment-00000002.snap', 'rows': 200}, handle)
+    refreshed = []
+    worker = threading.Thread(target=lambda: refreshed.append(reader.refresh()), daemon=True)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert refreshed == [False]
+    assert reader.version == 1
+    assert len(reader.cache.store()) == rows
+
+    publisher.publish(generate_corpus(300, seed=2))
+    assert reader.refresh()
+    assert len(reader.cache.store()) == 300